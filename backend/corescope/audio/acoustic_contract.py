@@ -73,8 +73,22 @@ class AcousticAnalysisResponse(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0)
     failure_reason: Optional[str] = None
     features: List[AcousticFeatureMeasurement] = Field(default_factory=list)
+    segment_features: List[AcousticFeatureMeasurement] = Field(default_factory=list)
     vad_segments: List[VadSegment] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
     evidence_ledger: Optional[EvidenceLedger] = None
     engine_versions: Optional[EngineVersions] = None
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+class StreamingFeatureSnapshot(BaseModel):
+    """Provisional capture feedback; never persisted as canonical measurements."""
+
+    stream_id: str
+    source_capture_id: str
+    capture_kind: CaptureKind
+    provisional: bool = True
+    received_ms: int
+    features: Dict[str, Optional[float]] = Field(default_factory=dict)
+    vad: Dict[str, Any] = Field(default_factory=dict)
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
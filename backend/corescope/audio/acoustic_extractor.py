@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
 import math
-from uuid import uuid4
+import struct
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 import parselmouth
@@ -24,6 +28,13 @@ from .acoustic_contract import (
     QualityLevel,
     VadSegment,
 )
+from .scheduler import AnalysisStage, default_analysis_executor, run_stages
+from .retention import DEFAULT_RETRY_HOURS
+from .feature_plan import FEATURE_PLANS, PRAAT_STAGES, plan_levels
+from .pitch_range import DEFAULT_PITCH_RANGE, PitchRange, estimate_pitch_range, resolve_pitch_range
+from .storage import CANONICAL_SUFFIX, CanonicalAudioStore, LocalShardedStore, capture_manifest_path
+from .shared_audio import SharedAudioBuffer, shared_stage
+from corescope.engine.baselines import BaselineStore
 from corescope.engine.evidence import build_acoustic_evidence_ledger
 from corescope.engine.versions import CURRENT_ENGINE_VERSIONS
 
@@ -33,6 +44,9 @@ MAX_DURATION_SECONDS = 90
 MIN_DURATION_SECONDS = 2
 MAX_UPLOAD_BYTES = 24 * 1024 * 1024
 MIN_UPLOAD_BYTES = 2048
+# Praat needs several pitch periods per analysis window; shorter speech
+# segments are left to the aggregate rather than measured on their own.
+MIN_SEGMENT_MS = 150
 
 SUSTAINED_VOWEL_FEATURES = {
     "voice.jitter.local",
@@ -56,10 +70,37 @@ class DecodedAudio:
     sample_rate: int
     channel_count: int
     duration_ms: int
-    canonical_path: Path
+    canonical_path: Optional[Path]
     clipping_ratio: float = 0.0
 
 
+@dataclass
+class SharedDecodedAudio(DecodedAudio):
+    """DecodedAudio whose samples live in shared memory for process-pool workers."""
+
+    buffer: Optional[SharedAudioBuffer] = None
+
+
+@contextmanager
+def share_decoded_audio(decoded: DecodedAudio) -> Iterator[SharedDecodedAudio]:
+    """Copy samples into shared memory once for the lifetime of a request."""
+    with SharedAudioBuffer(decoded.samples) as buffer:
+        shared = SharedDecodedAudio(
+            buffer.array,
+            decoded.sample_rate,
+            decoded.channel_count,
+            decoded.duration_ms,
+            decoded.canonical_path,
+            decoded.clipping_ratio,
+            buffer,
+        )
+        try:
+            yield shared
+        finally:
+            # The block can only be unmapped once no view of it is left.
+            shared.samples = np.empty(0, dtype=decoded.samples.dtype)
+
+
 def _quality_from_confidence(confidence: float) -> QualityLevel:
     if confidence >= 0.86:
         return "high"
@@ -102,12 +143,37 @@ def _linear_resample(samples: np.ndarray, source_sr: int, target_sr: int) -> np.
     return np.interp(target_x, source_x, samples).astype(np.float32)
 
 
-def decode_audio_to_canonical_wav(input_path: Path, output_path: Path) -> DecodedAudio:
+def decode_audio_to_canonical_wav(input_path: Path, output_path: Optional[Path], *, capture_limits: bool = True) -> DecodedAudio:
     samples, sample_rate = sf.read(str(input_path), always_2d=True)
     if samples.size == 0:
         raise ValueError("audio_empty")
     channel_count = samples.shape[1]
     mono = samples.mean(axis=1).astype(np.float32)
+    return write_canonical_wav(mono, sample_rate, output_path, channel_count=channel_count, capture_limits=capture_limits)
+
+
+def decode_audio(input_path: Path) -> DecodedAudio:
+    """Canonical samples for a one-off analysis, kept in memory and never retained.
+
+    The capture duration limits do not apply; they guard uploads and retention.
+    """
+    return decode_audio_to_canonical_wav(input_path, None, capture_limits=False)
+
+
+def write_canonical_wav(
+    mono: np.ndarray,
+    sample_rate: int,
+    output_path: Optional[Path],
+    *,
+    channel_count: int = 1,
+    capture_limits: bool = True,
+) -> DecodedAudio:
+    """Validate mono samples and persist them as the canonical 16 kHz PCM_16 WAV (unless ``output_path`` is None).
+
+    ``capture_limits`` enforces the ``MIN_DURATION_SECONDS``/``MAX_DURATION_SECONDS`` capture bounds.
+    """
+    if mono.size == 0:
+        raise ValueError("audio_empty")
     if not np.any(np.abs(mono) > 1e-5):
         raise ValueError("audio_silent")
     clipping_ratio = float(np.mean(np.abs(mono) >= 0.999))
@@ -116,13 +182,62 @@ def decode_audio_to_canonical_wav(input_path: Path, output_path: Path) -> Decode
     if peak > 1:
         mono = mono / peak
     duration_ms = int(round(len(mono) / TARGET_SAMPLE_RATE * 1000))
+    if capture_limits and duration_ms < MIN_DURATION_SECONDS * 1000:
+        raise ValueError("audio_too_short")
+    if capture_limits and duration_ms > MAX_DURATION_SECONDS * 1000:
+        raise ValueError("audio_too_long")
+    if output_path is not None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(str(output_path), mono, TARGET_SAMPLE_RATE, subtype="PCM_16")
+    return DecodedAudio(mono, TARGET_SAMPLE_RATE, channel_count, duration_ms, output_path, clipping_ratio)
+
+
+def _canonical_data_chunk(path: Path) -> Tuple[int, int]:
+    """Validate a canonical WAV header and return (data offset, sample count)."""
+    with path.open("rb") as handle:
+        header = handle.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError("canonical_wav_invalid_header")
+        fmt = None
+        while True:
+            chunk = handle.read(8)
+            if len(chunk) < 8:
+                raise ValueError("canonical_wav_missing_data")
+            chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", handle.read(16))
+                handle.seek(chunk_size - 16 + (chunk_size % 2), 1)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("canonical_wav_invalid_header")
+                audio_format, channels, sample_rate, _, block_align, bits = fmt
+                if audio_format != 1 or channels != 1 or sample_rate != TARGET_SAMPLE_RATE or bits != 16 or block_align != 2:
+                    raise ValueError("canonical_wav_not_canonical_format")
+                available = path.stat().st_size - handle.tell()
+                return handle.tell(), min(chunk_size, available) // 2
+            else:
+                handle.seek(chunk_size + (chunk_size % 2), 1)
+
+
+def load_canonical_wav(path: Path) -> DecodedAudio:
+    """Memory-map a retained canonical WAV without decoding or resampling it."""
+    if path.is_symlink() or not path.name.endswith(CANONICAL_SUFFIX):
+        raise ValueError("canonical_wav_path_rejected")
+    offset, sample_count = _canonical_data_chunk(path)
+    if sample_count == 0:
+        raise ValueError("audio_empty")
+    pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(sample_count,))
+    samples = np.multiply(pcm, 1 / 32768, dtype=np.float32)
+    del pcm
+    duration_ms = int(round(sample_count / TARGET_SAMPLE_RATE * 1000))
     if duration_ms < MIN_DURATION_SECONDS * 1000:
         raise ValueError("audio_too_short")
     if duration_ms > MAX_DURATION_SECONDS * 1000:
         raise ValueError("audio_too_long")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    sf.write(str(output_path), mono, TARGET_SAMPLE_RATE, subtype="PCM_16")
-    return DecodedAudio(mono, TARGET_SAMPLE_RATE, channel_count, duration_ms, output_path, clipping_ratio)
+    # The canonical file is already peak-limited, so this is the post-decode
+    # clipping ratio; the original upload's channel count is not retained.
+    clipping_ratio = float(np.mean(np.abs(samples) >= 0.999))
+    return DecodedAudio(samples, TARGET_SAMPLE_RATE, 1, duration_ms, path, clipping_ratio)
 
 
 def _frame_audio(samples: np.ndarray, sr: int, frame_ms: int = 30) -> Tuple[np.ndarray, int]:
@@ -257,25 +372,43 @@ def _spectral_features(samples: np.ndarray, sr: int) -> Dict[str, Optional[float
         "voice.zero_crossing_rate": zcr,
         "voice.rms_energy": rms,
         "voice.harmonic_richness": harmonic_richness,
-        "voice.cepstral_peak_prominence_proxy": _cpp_proxy(samples, sr),
     }
 
 
-def _formant_summary(formant: Any, duration_s: float) -> Dict[str, Optional[float]]:
+@dataclass
+class PraatFrames:
+    """Frame-level Praat output for one span of audio, before summarising."""
+
+    duration_s: float
+    pitch_values: np.ndarray
+    formant_values: Dict[int, np.ndarray]
+    formant_frame_count: int
+    hnr_mean: Optional[float]
+    cycle_features: Dict[str, Optional[float]]
+
+
+def _formant_values(formant: Any, duration_s: float) -> Tuple[Dict[int, np.ndarray], int]:
     times = np.arange(0.025, max(0.026, duration_s), 0.01)
-    output: Dict[str, Optional[float]] = {}
+    output: Dict[int, np.ndarray] = {}
     for index in (1, 2, 3):
         values = []
         for time in times:
             value = _safe_float(call(formant, "Get value at time", index, float(time), "Hertz", "Linear"))
             if value and 90 <= value <= 5000:
                 values.append(value)
-        arr = np.array(values)
+        output[index] = np.array(values)
+    return output, len(times)
+
+
+def _formant_summary(values: Dict[int, np.ndarray], frame_count: int) -> Dict[str, Optional[float]]:
+    output: Dict[str, Optional[float]] = {}
+    for index in (1, 2, 3):
+        arr = values.get(index, np.array([]))
         prefix = f"voice.formant.f{index}"
         output[f"{prefix}.median"] = _safe_float(np.median(arr)) if arr.size else None
         output[f"{prefix}.sd"] = _safe_float(np.std(arr)) if arr.size else None
         output[f"{prefix}.iqr"] = _safe_float(np.percentile(arr, 75) - np.percentile(arr, 25)) if arr.size else None
-        output[f"{prefix}.valid_frame_ratio"] = float(arr.size / max(1, len(times)))
+        output[f"{prefix}.valid_frame_ratio"] = float(arr.size / max(1, frame_count))
     f1_sd = output.get("voice.formant.f1.sd")
     f2_sd = output.get("voice.formant.f2.sd")
     output["voice.formant_stability"] = None if f1_sd is None or f2_sd is None else max(0.0, min(1.0, 1 - ((f1_sd + f2_sd) / 900)))
@@ -283,11 +416,132 @@ def _formant_summary(formant: Any, duration_s: float) -> Dict[str, Optional[floa
     return output
 
 
-def _pitch_and_praat_features(samples: np.ndarray, sr: int, capture_kind: CaptureKind, floor: float, ceiling: float) -> Dict[str, Optional[float]]:
-    sound = parselmouth.Sound(samples, sampling_frequency=sr)
-    duration_s = sound.get_total_duration()
-    pitch = call(sound, "To Pitch", 0.0, floor, ceiling)
-    pitch_values = np.asarray(pitch.selected_array["frequency"], dtype=float)
+def _praat_sound(samples: np.ndarray, sr: int) -> Any:
+    return parselmouth.Sound(samples, sampling_frequency=sr)
+
+
+def _pitch_stage(samples: np.ndarray, sr: int, floor: float, ceiling: float) -> np.ndarray:
+    pitch = call(_praat_sound(samples, sr), "To Pitch", 0.0, floor, ceiling)
+    return np.asarray(pitch.selected_array["frequency"], dtype=float)
+
+
+def _harmonicity_stage(samples: np.ndarray, sr: int, floor: float) -> Optional[float]:
+    harmonicity = call(_praat_sound(samples, sr), "To Harmonicity (cc)", 0.01, floor, 0.1, 1.0)
+    return _safe_float(call(harmonicity, "Get mean", 0.0, 0.0))
+
+
+def _cycle_stage(samples: np.ndarray, sr: int, capture_kind: CaptureKind, floor: float, ceiling: float) -> Dict[str, Optional[float]]:
+    cycle_features: Dict[str, Optional[float]] = {}
+    if capture_kind != "sustained_vowel":
+        return cycle_features
+    sound = _praat_sound(samples, sr)
+    try:
+        point_process = call(sound, "To PointProcess (periodic, cc)", floor, ceiling)
+    except Exception:
+        return cycle_features
+    # Praat PointProcess uses period bounds, not pitch bounds, for these
+    # cycle-level measurements. Shimmer additionally receives the maximum
+    # amplitude-factor parameter and therefore uses two Praat objects.
+    jitter_args = (0.0, 0.0, 1.0 / ceiling, 1.0 / floor, 1.3)
+    shimmer_args = (0.0, 0.0, 1.0 / ceiling, 1.0 / floor, 1.3, 1.6)
+    praat_calls = {
+        "voice.jitter.local": ("Get jitter (local)", jitter_args),
+        "voice.jitter.local_absolute": ("Get jitter (local, absolute)", jitter_args),
+        "voice.jitter.rap": ("Get jitter (rap)", jitter_args),
+        "voice.jitter.ppq5": ("Get jitter (ppq5)", jitter_args),
+        "voice.jitter.ddp": ("Get jitter (ddp)", jitter_args),
+        "voice.shimmer.local": ("Get shimmer (local)", shimmer_args),
+        "voice.shimmer.local_db": ("Get shimmer (local_dB)", shimmer_args),
+        "voice.shimmer.apq3": ("Get shimmer (apq3)", shimmer_args),
+        "voice.shimmer.apq5": ("Get shimmer (apq5)", shimmer_args),
+        "voice.shimmer.apq11": ("Get shimmer (apq11)", shimmer_args),
+        "voice.shimmer.dda": ("Get shimmer (dda)", shimmer_args),
+    }
+    for feature_id, (command, args) in praat_calls.items():
+        try:
+            objects = point_process if command.startswith("Get jitter") else [sound, point_process]
+            cycle_features[feature_id] = _safe_float(call(objects, command, *args))
+        except Exception:
+            cycle_features[feature_id] = None
+    return cycle_features
+
+
+def _formant_stage(samples: np.ndarray, sr: int) -> Tuple[Dict[int, np.ndarray], int]:
+    sound = _praat_sound(samples, sr)
+    formant = call(sound, "To Formant (burg)", 0.0, 5, 5500, 0.025, 50)
+    return _formant_values(formant, sound.get_total_duration())
+
+
+def _praat_stages(
+    samples: np.ndarray,
+    sr: int,
+    capture_kind: CaptureKind,
+    floor: float,
+    ceiling: float,
+    enabled: Tuple[str, ...] = PRAAT_STAGES,
+) -> List[AnalysisStage]:
+    stages = [
+        AnalysisStage("pitch", _pitch_stage, (samples, sr, floor, ceiling)),
+        AnalysisStage("harmonicity", _harmonicity_stage, (samples, sr, floor)),
+        AnalysisStage("cycle", _cycle_stage, (samples, sr, capture_kind, floor, ceiling)),
+        AnalysisStage("formant", _formant_stage, (samples, sr)),
+    ]
+    return [stage for stage in stages if stage.name in enabled]
+
+
+def _frames_from_stages(results: Dict[str, Any], duration_s: float) -> PraatFrames:
+    """Frames from stage results; a stage outside the plan contributes no frames."""
+    for name in PRAAT_STAGES:
+        if isinstance(results.get(name), Exception):
+            raise results[name]
+    formant_values, formant_frame_count = results.get("formant", ({index: np.array([]) for index in (1, 2, 3)}, 0))
+    return PraatFrames(
+        duration_s,
+        results.get("pitch", np.array([])),
+        formant_values,
+        formant_frame_count,
+        results.get("harmonicity"),
+        results.get("cycle", {}),
+    )
+
+
+def _praat_frames(
+    samples: np.ndarray,
+    sr: int,
+    capture_kind: CaptureKind,
+    floor: float,
+    ceiling: float,
+    executor: Optional[Executor] = None,
+    enabled: Tuple[str, ...] = PRAAT_STAGES,
+) -> PraatFrames:
+    results = run_stages(_praat_stages(samples, sr, capture_kind, floor, ceiling, enabled), executor)
+    return _frames_from_stages(results, len(samples) / sr)
+
+
+def _praat_frames_or_none(
+    samples: np.ndarray,
+    sr: int,
+    capture_kind: CaptureKind,
+    floor: float,
+    ceiling: float,
+    enabled: Tuple[str, ...] = PRAAT_STAGES,
+) -> Optional[PraatFrames]:
+    try:
+        return _praat_frames(samples, sr, capture_kind, floor, ceiling, enabled=enabled)
+    except Exception:
+        return None
+
+
+def _weighted_mean(pairs: Iterable[Tuple[Optional[float], float]]) -> Optional[float]:
+    usable = [(value, weight) for value, weight in pairs if value is not None and weight > 0]
+    if not usable:
+        return None
+    return _safe_float(sum(value * weight for value, weight in usable) / sum(weight for _, weight in usable))
+
+
+def _praat_summary(frames: List[PraatFrames], floor: float, ceiling: float) -> Dict[str, Optional[float]]:
+    """Summarise one or more spans; a single span reproduces whole-capture output."""
+    pitch_values = np.concatenate([item.pitch_values for item in frames]) if frames else np.array([])
     voiced = pitch_values[pitch_values > 0]
     low = _percentile(voiced, 20)
     high = _percentile(voiced, 80)
@@ -307,45 +561,59 @@ def _pitch_and_praat_features(samples: np.ndarray, sr: int, capture_kind: Captur
         result["voice.pitch_clarity"] = max(0.0, min(1.0, float(voiced.size / max(1, pitch_values.size))))
         result["voice.pitch_stability"] = max(0.0, min(1.0, 1 - float(np.std(voiced) / max(1e-6, np.mean(voiced)))))
 
-    harmonicity = call(sound, "To Harmonicity (cc)", 0.01, floor, 0.1, 1.0)
-    result["voice.hnr.mean"] = _safe_float(call(harmonicity, "Get mean", 0.0, 0.0))
+    result["voice.hnr.mean"] = _weighted_mean((item.hnr_mean, item.duration_s) for item in frames)
+    cycle_ids = sorted({feature_id for item in frames for feature_id in item.cycle_features})
+    for feature_id in cycle_ids:
+        result[feature_id] = _weighted_mean((item.cycle_features.get(feature_id), item.duration_s) for item in frames)
 
-    point_process = None
-    try:
-        point_process = call(sound, "To PointProcess (periodic, cc)", floor, ceiling)
-    except Exception:
-        point_process = None
-    if capture_kind == "sustained_vowel" and point_process is not None:
-        # Praat PointProcess uses period bounds, not pitch bounds, for these
-        # cycle-level measurements. Shimmer additionally receives the maximum
-        # amplitude-factor parameter and therefore uses two Praat objects.
-        jitter_args = (0.0, 0.0, 1.0 / ceiling, 1.0 / floor, 1.3)
-        shimmer_args = (0.0, 0.0, 1.0 / ceiling, 1.0 / floor, 1.3, 1.6)
-        praat_calls = {
-            "voice.jitter.local": ("Get jitter (local)", jitter_args),
-            "voice.jitter.local_absolute": ("Get jitter (local, absolute)", jitter_args),
-            "voice.jitter.rap": ("Get jitter (rap)", jitter_args),
-            "voice.jitter.ppq5": ("Get jitter (ppq5)", jitter_args),
-            "voice.jitter.ddp": ("Get jitter (ddp)", jitter_args),
-            "voice.shimmer.local": ("Get shimmer (local)", shimmer_args),
-            "voice.shimmer.local_db": ("Get shimmer (local_dB)", shimmer_args),
-            "voice.shimmer.apq3": ("Get shimmer (apq3)", shimmer_args),
-            "voice.shimmer.apq5": ("Get shimmer (apq5)", shimmer_args),
-            "voice.shimmer.apq11": ("Get shimmer (apq11)", shimmer_args),
-            "voice.shimmer.dda": ("Get shimmer (dda)", shimmer_args),
-        }
-        for feature_id, (command, args) in praat_calls.items():
-            try:
-                objects = point_process if command.startswith("Get jitter") else [sound, point_process]
-                result[feature_id] = _safe_float(call(objects, command, *args))
-            except Exception:
-                result[feature_id] = None
-
-    formant = call(sound, "To Formant (burg)", 0.0, 5, 5500, 0.025, 50)
-    result.update(_formant_summary(formant, duration_s))
+    formant_values = {
+        index: np.concatenate([item.formant_values[index] for item in frames]) if frames else np.array([])
+        for index in (1, 2, 3)
+    }
+    result.update(_formant_summary(formant_values, sum(item.formant_frame_count for item in frames)))
     return result
 
 
+def _speech_spans(vad_segments: Iterable[VadSegment], sr: int, min_segment_ms: int) -> List[Tuple[VadSegment, int, int]]:
+    return [
+        (segment, int(segment.start_ms * sr / 1000), int(segment.end_ms * sr / 1000))
+        for segment in vad_segments
+        if segment.kind == "speech" and segment.end_ms - segment.start_ms >= min_segment_ms
+    ]
+
+
+def _segment_stages(
+    samples: np.ndarray,
+    sr: int,
+    capture_kind: CaptureKind,
+    floor: float,
+    ceiling: float,
+    spans: List[Tuple[VadSegment, int, int]],
+    enabled: Tuple[str, ...] = PRAAT_STAGES,
+) -> List[AnalysisStage]:
+    return [
+        AnalysisStage(f"segment:{index}", _praat_frames_or_none, (samples[start:end], sr, capture_kind, floor, ceiling, enabled))
+        for index, (_, start, end) in enumerate(spans)
+    ]
+
+
+def _segment_summaries(
+    spans: List[Tuple[VadSegment, int, int]],
+    results: Dict[str, Any],
+    floor: float,
+    ceiling: float,
+) -> Tuple[Dict[str, Optional[float]], List[Tuple[VadSegment, Dict[str, Optional[float]]]]]:
+    """Summarise each speech span and pool the frame-level output into an aggregate."""
+    per_span = [results[f"segment:{index}"] for index in range(len(spans))]
+    per_span = [frames if isinstance(frames, PraatFrames) else None for frames in per_span]
+    segment_results = [
+        (segment, _praat_summary([frames], floor, ceiling) if frames is not None else {"voice.f0.median": None, "voice.hnr.mean": None})
+        for (segment, _, _), frames in zip(spans, per_span)
+    ]
+    aggregate = _praat_summary([frames for frames in per_span if frames is not None], floor, ceiling)
+    return aggregate, segment_results
+
+
 def _feature_unit(feature_id: str) -> Optional[str]:
     if feature_id.endswith("range_semitones"):
         return "semitones"
@@ -391,12 +659,13 @@ def _measurement(
     value: Optional[float],
     source_capture_id: str,
     capture_kind: CaptureKind,
-    duration_ms: int,
+    segment_end_ms: int,
     quality: QualityLevel,
     confidence: float,
     parameters: Dict[str, Any],
     device_metadata: Dict[str, Any],
     rejection_reason: Optional[str] = None,
+    segment_start_ms: int = 0,
 ) -> AcousticFeatureMeasurement:
     if value is None and rejection_reason is None:
         rejection_reason = "insufficient_reliable_signal"
@@ -407,8 +676,8 @@ def _measurement(
         method=_method(feature_id),
         source_capture_id=source_capture_id,
         capture_kind=capture_kind,
-        segment_start_ms=0,
-        segment_end_ms=duration_ms,
+        segment_start_ms=segment_start_ms,
+        segment_end_ms=segment_end_ms,
         quality=quality if value is not None else "poor",
         confidence=confidence if value is not None else 0.0,
         rejection_reason=rejection_reason,
@@ -434,6 +703,40 @@ def _syllable_proxy(samples: np.ndarray, sr: int, vad_segments: Iterable[VadSegm
     return float(len(peaks) / max(1e-6, minutes))
 
 
+def _level_stages(
+    level: Tuple[str, ...],
+    results: Dict[str, Any],
+    samples: np.ndarray,
+    sr: int,
+    capture_kind: CaptureKind,
+    floor: float,
+    ceiling: float,
+    vad_segments: List[VadSegment],
+    spans: List[Tuple[VadSegment, int, int]],
+    praat_enabled: Tuple[str, ...],
+) -> List[AnalysisStage]:
+    """Stages for one plan level; Praat stages become one stage per speech span when segmented."""
+    stages: List[AnalysisStage] = []
+    pending = [name for name in level if name not in results]
+    praat_level = tuple(name for name in pending if name in praat_enabled)
+    if praat_level and spans:
+        stages.extend(_segment_stages(samples, sr, capture_kind, floor, ceiling, spans, praat_level))
+    elif praat_level:
+        stages.extend(_praat_stages(samples, sr, capture_kind, floor, ceiling, praat_level))
+    for name in pending:
+        if name == "vad":
+            stages.append(AnalysisStage("vad", _run_vad, (samples, sr)))
+        elif name == "pitch_range":
+            stages.append(AnalysisStage("pitch_range", estimate_pitch_range, (samples, sr)))
+        elif name == "spectral":
+            stages.append(AnalysisStage("spectral", _spectral_features, (samples, sr)))
+        elif name == "cpp":
+            stages.append(AnalysisStage("cpp", _cpp_proxy, (samples, sr)))
+        elif name == "syllable":
+            stages.append(AnalysisStage("syllable", _syllable_proxy, (samples, sr, vad_segments)))
+    return stages
+
+
 def analyze_canonical_audio(
     decoded: DecodedAudio,
     *,
@@ -444,26 +747,119 @@ def analyze_canonical_audio(
     original_content_type: str,
     storage_path: Optional[str],
     device_metadata: Dict[str, Any],
-    pitch_floor_hz: float = 60.0,
-    pitch_ceiling_hz: float = 400.0,
+    pitch_floor_hz: Optional[float] = None,
+    pitch_ceiling_hz: Optional[float] = None,
+    prior_pitch_range: Optional[Tuple[float, float]] = None,
+    vad: Optional[Tuple[List[VadSegment], Dict[str, float]]] = None,
+    segmented: bool = False,
+    min_segment_ms: int = MIN_SEGMENT_MS,
+    executor: Optional[Executor] = None,
+    baseline_store: Optional[BaselineStore] = None,
 ) -> AcousticAnalysisResponse:
+    """Measure one canonical capture.
+
+    The stages in ``FEATURE_PLANS[capture_kind]`` run level by level: VAD,
+    the pitch-range pre-pass, spectral summary and CPP first, then the Praat stages and the syllable
+    proxy, which need the VAD segments. Stages within a level run on
+    ``executor`` (default: the process-wide analysis executor) and are merged
+    in a fixed order. Features of stages outside the plan are emitted as
+    explicit null measurements.
+
+    Praat pitch bounds are ``pitch_floor_hz``/``pitch_ceiling_hz`` when given,
+    else ``prior_pitch_range`` (a range from an earlier capture of the same
+    user), else the YIN pre-pass estimate. ``parameters`` records the bounds
+    used and where they came from.
+
+    With ``baseline_store`` evidence is read against the user's baselines for
+    this capture kind, and the available measurements are then added to them
+    once per ``source_capture_id``, so a retried upload is not counted twice.
+    Re-analysis leaves it unset.
+
+    With ``segmented=True`` Praat analysis runs only over VAD speech segments
+    (in parallel), the aggregate measurements cover the speech span and
+    ``segment_features`` carries per-segment values.
+    """
+    plan = FEATURE_PLANS[capture_kind]
+    praat_enabled = tuple(stage for stage in PRAAT_STAGES if plan.runs(stage))
     parameters = {
         "target_sample_rate_hz": TARGET_SAMPLE_RATE,
-        "pitch_floor_hz": pitch_floor_hz,
-        "pitch_ceiling_hz": pitch_ceiling_hz,
         "formant_ceiling_hz": 5500,
         "vad": "webrtc_vad_2.0.14_with_energy_fallback",
+        "extraction_mode": "whole_capture",
+        "feature_plan": sorted(plan.stages),
     }
-    vad_segments, vad_stats = _run_vad(decoded.samples, decoded.sample_rate)
+    executor = executor if executor is not None else default_analysis_executor()
+    # Process-pool stages receive shared-memory handles instead of pickled
+    # samples; a buffer created here lives only for this call.
+    buffer = decoded.buffer if isinstance(decoded, SharedDecodedAudio) else None
+    owns_buffer = buffer is None and isinstance(executor, ProcessPoolExecutor)
+    if owns_buffer:
+        buffer = SharedAudioBuffer(decoded.samples)
+    samples, sr = (buffer.array if buffer is not None else decoded.samples), decoded.sample_rate
+    # Everything read from ``samples`` after the stages is taken now: an owned
+    # buffer is unmapped before the summaries run.
+    sample_seconds = len(samples) / sr
+    # Streaming sessions compute VAD incrementally while audio arrives and pass
+    # the finished result in; uploads run the batch detector as a stage.
+    results: Dict[str, Any] = {"vad": vad} if vad is not None else {}
+    fixed_range = resolve_pitch_range(pitch_floor_hz, pitch_ceiling_hz, prior_pitch_range)
+    if fixed_range is not None:
+        results["pitch_range"] = fixed_range
+    pitch_range: PitchRange = fixed_range or PitchRange(*DEFAULT_PITCH_RANGE, "default")
+    vad_segments: List[VadSegment] = []
+    spans: List[Tuple[VadSegment, int, int]] = []
+    praat_span = (0, decoded.duration_ms)
+    stages: List[AnalysisStage] = []
+    try:
+        for level in plan_levels(plan.stages):
+            stages = _level_stages(
+                level, results, samples, sr, capture_kind, pitch_range.floor_hz, pitch_range.ceiling_hz, vad_segments, spans, praat_enabled
+            )
+            if buffer is not None and isinstance(executor, ProcessPoolExecutor):
+                stages = [shared_stage(stage, buffer) for stage in stages]
+            results.update(run_stages(stages, executor, return_exceptions=True))
+            if "vad" in level:
+                if isinstance(results["vad"], Exception):
+                    raise results["vad"]
+                vad_segments = results["vad"][0]
+                spans = _speech_spans(vad_segments, sr, min_segment_ms) if segmented else []
+            if "pitch_range" in level:
+                if isinstance(results["pitch_range"], Exception):
+                    raise results["pitch_range"]
+                pitch_range = results["pitch_range"]
+    finally:
+        if owns_buffer:
+            del samples, stages
+            # Suppresses a BufferError only while another exception propagates.
+            buffer.__exit__(*sys.exc_info())
+    vad_segments, vad_stats = results["vad"]
+    pitch_floor_hz, pitch_ceiling_hz = pitch_range.floor_hz, pitch_range.ceiling_hz
+    parameters.update(pitch_floor_hz=pitch_floor_hz, pitch_ceiling_hz=pitch_ceiling_hz, pitch_range_source=pitch_range.source)
     confidence = max(0.0, min(1.0, (vad_stats.get("phonation_time_ratio", 0.0) * 0.65) + 0.28))
     quality = _quality_from_confidence(confidence)
     feature_values: Dict[str, Optional[float]] = {}
+    segment_values: List[Tuple[VadSegment, Dict[str, Optional[float]]]] = []
+    if spans:
+        parameters["extraction_mode"] = "vad_segments"
+        parameters["min_segment_ms"] = min_segment_ms
+        praat_span = (spans[0][0].start_ms, spans[-1][0].end_ms)
     try:
-        feature_values.update(_pitch_and_praat_features(decoded.samples, decoded.sample_rate, capture_kind, pitch_floor_hz, pitch_ceiling_hz))
+        if spans:
+            praat_values, segment_values = _segment_summaries(spans, results, pitch_floor_hz, pitch_ceiling_hz)
+        else:
+            # Without usable speech segments the whole capture is analysed, so
+            # segmented mode never yields less than the default extraction.
+            praat_values = _praat_summary([_frames_from_stages(results, sample_seconds)], pitch_floor_hz, pitch_ceiling_hz)
     except Exception:
-        feature_values["voice.f0.median"] = None
-        feature_values["voice.hnr.mean"] = None
-    feature_values.update(_spectral_features(decoded.samples, decoded.sample_rate))
+        praat_values = {"voice.f0.median": None, "voice.hnr.mean": None}
+    feature_values.update(praat_values)
+    praat_feature_ids = set(praat_values)
+    for name, feature_id in (("spectral", None), ("cpp", "voice.cepstral_peak_prominence_proxy"), ("syllable", "voice.syllable_nuclei_rate")):
+        if name not in results:
+            continue
+        if isinstance(results[name], Exception):
+            raise results[name]
+        feature_values.update(results[name] if feature_id is None else {feature_id: results[name]})
     feature_values.update(
         {
             "voice.speech_to_silence_ratio": vad_stats.get("speech_to_silence_ratio"),
@@ -474,24 +870,61 @@ def analyze_canonical_audio(
             "voice.pause.duration_max": vad_stats.get("maximum_pause_ms"),
             "voice.pause.density": vad_stats.get("pause_density_per_min"),
             "voice.phonation_time_ratio": vad_stats.get("phonation_time_ratio"),
-            "voice.syllable_nuclei_rate": _syllable_proxy(decoded.samples, decoded.sample_rate, vad_segments),
             "voice.clipping_ratio": decoded.clipping_ratio,
         }
     )
-    # Keep ineligible cycle-level values explicit and null rather than omitting
-    # them or coercing them to zero. This preserves task eligibility in storage.
+    # Keep ineligible and unplanned values explicit and null rather than
+    # omitting them or coercing them to zero. This preserves task eligibility
+    # in storage and gives every capture kind the same feature set.
     if capture_kind != "sustained_vowel":
         for feature_id in SUSTAINED_VOWEL_FEATURES:
             feature_values.setdefault(feature_id, None)
+    for feature_id in plan.skipped_features:
+        feature_values[feature_id] = None
     features = [
-        _measurement(feature_id, _safe_float(value), source_capture_id, capture_kind, decoded.duration_ms, quality, confidence, parameters, device_metadata)
+        _measurement(
+            feature_id,
+            _safe_float(value),
+            source_capture_id,
+            capture_kind,
+            praat_span[1] if feature_id in praat_feature_ids else decoded.duration_ms,
+            quality,
+            confidence,
+            parameters,
+            device_metadata,
+            segment_start_ms=praat_span[0] if feature_id in praat_feature_ids else 0,
+        )
         for feature_id, value in sorted(feature_values.items())
     ]
+    segment_features = [
+        _measurement(
+            feature_id,
+            _safe_float(value),
+            source_capture_id,
+            capture_kind,
+            segment.end_ms,
+            quality,
+            confidence,
+            parameters,
+            device_metadata,
+            segment_start_ms=segment.start_ms,
+        )
+        for segment, values in segment_values
+        for feature_id, value in sorted(values.items())
+    ]
     evidence_ledger = build_acoustic_evidence_ledger(
         scan_id=scan_id,
         source_capture_id=source_capture_id,
         measurements=features,
+        baselines=baseline_store.get(user_id, capture_kind) if baseline_store is not None else None,
     )
+    if baseline_store is not None:
+        baseline_store.update(
+            user_id,
+            capture_kind,
+            source_capture_id,
+            {item.feature_id: item.value for item in features if item.value is not None and item.rejection_reason is None},
+        )
     return AcousticAnalysisResponse(
         scan_id=scan_id,
         user_id=user_id,
@@ -507,6 +940,7 @@ def analyze_canonical_audio(
         quality=quality,
         confidence=confidence,
         features=features,
+        segment_features=segment_features,
         evidence_ledger=evidence_ledger,
         engine_versions=CURRENT_ENGINE_VERSIONS,
         vad_segments=vad_segments,
@@ -524,6 +958,44 @@ def analyze_canonical_audio(
     )
 
 
+def write_capture_manifest(
+    canonical_path: Path,
+    *,
+    user_id: str,
+    scan_id: str,
+    source_capture_id: str,
+    capture_kind: CaptureKind,
+    device_metadata: Dict[str, Any],
+) -> Path:
+    """Record what a retained canonical WAV is so retries and backfills can re-run it."""
+    manifest_path = capture_manifest_path(canonical_path)
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "user_id": user_id,
+                "scan_id": scan_id,
+                "source_capture_id": source_capture_id,
+                "capture_kind": capture_kind,
+                "device_metadata": device_metadata,
+            },
+            sort_keys=True,
+        ),
+        encoding="utf-8",
+    )
+    return manifest_path
+
+
+def read_capture_manifest(canonical_path: Path) -> Optional[Dict[str, Any]]:
+    manifest_path = capture_manifest_path(canonical_path)
+    if manifest_path.is_symlink() or not manifest_path.exists():
+        return None
+    try:
+        payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
 def analyze_upload_file(
     upload_bytes: bytes,
     *,
@@ -535,20 +1007,33 @@ def analyze_upload_file(
     source_capture_id: str,
     capture_kind: CaptureKind,
     device_metadata: Dict[str, Any],
+    segmented: bool = False,
+    store: Optional[CanonicalAudioStore] = None,
+    prior_pitch_range: Optional[Tuple[float, float]] = None,
+    baseline_store: Optional[BaselineStore] = None,
 ) -> AcousticAnalysisResponse:
     if len(upload_bytes) < MIN_UPLOAD_BYTES:
         raise ValueError("audio_file_too_small")
     if len(upload_bytes) > MAX_UPLOAD_BYTES:
         raise ValueError("audio_file_too_large")
-    safe_capture = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in source_capture_id)
-    capture_dir = private_root / user_id / scan_id
-    capture_dir.mkdir(parents=True, exist_ok=True)
-    unique_capture = f"{safe_capture}-{uuid4().hex}"
-    original_path = capture_dir / f"{unique_capture}.upload"
-    canonical_path = capture_dir / f"{unique_capture}.canonical.wav"
+    store = store or LocalShardedStore(private_root)
+    location = store.allocate(user_id, scan_id, source_capture_id)
+    canonical_path = location.local_path
+    # Register before writing so a crash mid-request cannot orphan the file.
+    store.retention_index.register(location.key)
+    original_path = canonical_path.with_name(canonical_path.name.replace(CANONICAL_SUFFIX, ".upload"))
     original_path.write_bytes(upload_bytes)
     try:
         decoded = decode_audio_to_canonical_wav(original_path, canonical_path)
+        write_capture_manifest(
+            canonical_path,
+            user_id=user_id,
+            scan_id=scan_id,
+            source_capture_id=source_capture_id,
+            capture_kind=capture_kind,
+            device_metadata=device_metadata,
+        )
+        storage_path = store.persist(location)
         return analyze_canonical_audio(
             decoded,
             scan_id=scan_id,
@@ -556,8 +1041,11 @@ def analyze_upload_file(
             source_capture_id=source_capture_id,
             capture_kind=capture_kind,
             original_content_type=content_type,
-            storage_path=str(canonical_path),
+            storage_path=storage_path,
             device_metadata=device_metadata,
+            segmented=segmented,
+            prior_pitch_range=prior_pitch_range,
+            baseline_store=baseline_store,
         )
     except (RuntimeError, OSError) as exc:
         raise ValueError("audio_unsupported_or_corrupt") from exc
@@ -565,19 +1053,98 @@ def analyze_upload_file(
         # The original upload is never retained. The canonical WAV remains only
         # for the documented retry window and is removed by maintenance cleanup.
         original_path.unlink(missing_ok=True)
+        store.release(location)
 
 
-def cleanup_expired_private_audio(private_root: Path, *, now=None, retry_hours: int = 24) -> int:
-    """Remove canonical files older than the retry window; never follows symlinks."""
+def reanalyze_canonical_file(
+    canonical_path: Path,
+    *,
+    scan_id: str,
+    user_id: str,
+    source_capture_id: str,
+    capture_kind: CaptureKind,
+    device_metadata: Dict[str, Any],
+    private_root: Optional[Path] = None,
+    storage_path: Optional[str] = None,
+    **analysis_options: Any,
+) -> AcousticAnalysisResponse:
+    """Re-run analysis on a retained canonical WAV for retries and version backfills."""
+    if private_root is not None and not canonical_path.resolve().is_relative_to(private_root.resolve()):
+        raise ValueError("canonical_wav_path_rejected")
+    decoded = load_canonical_wav(canonical_path)
+    return analyze_canonical_audio(
+        decoded,
+        scan_id=scan_id,
+        user_id=user_id,
+        source_capture_id=source_capture_id,
+        capture_kind=capture_kind,
+        original_content_type="audio/wav",
+        storage_path=storage_path or str(canonical_path),
+        device_metadata=device_metadata,
+        **analysis_options,
+    )
+
+
+def reanalyze_stored_capture(store: CanonicalAudioStore, key: str, **analysis_options: Any) -> AcousticAnalysisResponse:
+    """Re-run analysis on a capture in any store, using its manifest for identity."""
+    with store.materialize(key) as canonical_path:
+        manifest = read_capture_manifest(canonical_path)
+        if manifest is None:
+            raise ValueError("capture_manifest_missing")
+        return reanalyze_canonical_file(
+            canonical_path,
+            scan_id=str(manifest["scan_id"]),
+            user_id=str(manifest["user_id"]),
+            source_capture_id=str(manifest["source_capture_id"]),
+            capture_kind=manifest["capture_kind"],
+            device_metadata=dict(manifest.get("device_metadata") or {}),
+            # The same path an upload of this capture reported.
+            storage_path=store.storage_path(key),
+            **analysis_options,
+        )
+
+
+def cleanup_expired_private_audio(
+    private_root: Path,
+    *,
+    now=None,
+    retry_hours: int = DEFAULT_RETRY_HOURS,
+    full_scan: bool = False,
+    batch_size: int = 1000,
+    store: Optional[CanonicalAudioStore] = None,
+) -> int:
+    """Remove canonical files older than the retry window; never follows symlinks.
+
+    Indexed captures are popped from the store's retention index and deleted
+    through the store without walking the tree. ``full_scan`` also walks the
+    local root by mtime to catch files written before the index existed; it is
+    the only mode when no index has been created yet.
+    """
     import time
     cutoff = (now.timestamp() if now else time.time()) - retry_hours * 60 * 60
     removed = 0
     if not private_root.exists():
         return removed
-    for path in private_root.glob("**/*.canonical.wav"):
-        if path.is_symlink():
-            continue
-        if path.stat().st_mtime < cutoff:
-            path.unlink(missing_ok=True)
-            removed += 1
+    store = store or LocalShardedStore(private_root)
+    index = store.retention_index
+    indexed = index.exists()
+    while indexed:
+        expired = index.expired(cutoff, limit=batch_size)
+        if not expired:
+            break
+        for key in expired:
+            if store.delete(key):
+                removed += 1
+        index.forget(expired)
+    if full_scan or not indexed:
+        local = store if isinstance(store, LocalShardedStore) and store.root == private_root else LocalShardedStore(private_root)
+        for path in list(private_root.glob(f"**/*{CANONICAL_SUFFIX}")):
+            if path.is_symlink():
+                continue
+            if path.stat().st_mtime < cutoff:
+                key = path.relative_to(private_root).as_posix()
+                local.delete(key)
+                if indexed:
+                    index.forget([key])
+                removed += 1
     return removed
@@ -0,0 +1,297 @@
+"""Bulk re-extraction of retained canonical captures at the current extractor version.
+
+Canonical WAVs are sharded across a process pool, re-analysed through
+``reanalyze_canonical_file`` and written in batches to JSONL (one analysis per
+line) or Parquet part files (one measurement per row). After every batch is
+durably written, one checkpoint line records its paths, keyed by extractor and
+feature version, together with the output size (bytes of JSONL, or Parquet
+parts) that includes it. An interrupted run resumes where it stopped and a
+version bump starts a fresh pass. Resume first cuts the output back to the
+last recorded size, so rows written just before a crash but never
+checkpointed are not written twice. Only successful analyses reach the output;
+failures go to a sidecar JSONL that each run rewrites, since resume retries
+them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Set, Tuple
+
+from .acoustic_contract import PRAAT_EXTRACTOR_VERSION
+from .acoustic_extractor import CANONICAL_SUFFIX, read_capture_manifest, reanalyze_canonical_file
+from .scheduler import use_serial_analysis
+from corescope.engine.versions import FEATURE_VERSION
+
+
+OutputFormat = Literal["jsonl", "parquet"]
+PARQUET_COLUMNS = (
+    "canonical_path",
+    "user_id",
+    "scan_id",
+    "source_capture_id",
+    "capture_kind",
+    "feature_id",
+    "value",
+    "unit",
+    "quality",
+    "confidence",
+    "rejection_reason",
+    "extractor_version",
+    "feature_version",
+)
+
+
+@dataclass(frozen=True)
+class BackfillTask:
+    canonical_path: str
+    user_id: str
+    scan_id: str
+    source_capture_id: str
+    capture_kind: str
+    device_metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BackfillSummary:
+    discovered: int = 0
+    skipped_checkpointed: int = 0
+    skipped_unlabelled: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def captures_per_second(self) -> float:
+        return (self.succeeded + self.failed) / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def checkpoint_key() -> str:
+    return f"{PRAAT_EXTRACTOR_VERSION}|{FEATURE_VERSION}"
+
+
+def discover_backfill_tasks(private_root: Path, *, default_capture_kind: Optional[str] = None) -> Iterator[Optional[BackfillTask]]:
+    """Yield one task per retained canonical WAV, in a stable order.
+
+    Captures without a manifest yield ``None`` unless ``default_capture_kind``
+    is given, in which case identifiers are recovered from the
+    ``user/scan/<capture>-<uuid>.canonical.wav`` layout.
+    """
+    for path in sorted(private_root.glob(f"**/*{CANONICAL_SUFFIX}")):
+        if path.is_symlink():
+            continue
+        manifest = read_capture_manifest(path)
+        if manifest is not None:
+            yield BackfillTask(
+                canonical_path=str(path),
+                user_id=str(manifest["user_id"]),
+                scan_id=str(manifest["scan_id"]),
+                source_capture_id=str(manifest["source_capture_id"]),
+                capture_kind=str(manifest["capture_kind"]),
+                device_metadata=dict(manifest.get("device_metadata") or {}),
+            )
+            continue
+        relative = path.relative_to(private_root).parts
+        if default_capture_kind is None or len(relative) < 3:
+            yield None
+            continue
+        capture = path.name[: -len(CANONICAL_SUFFIX)].rsplit("-", 1)[0]
+        yield BackfillTask(str(path), relative[-3], relative[-2], capture, default_capture_kind)
+
+
+def run_backfill_task(task: BackfillTask, private_root: Optional[str] = None) -> Dict[str, Any]:
+    """Worker entry point; never raises so one bad capture cannot stop a shard."""
+    row: Dict[str, Any] = {
+        **asdict(task),
+        "extractor_version": PRAAT_EXTRACTOR_VERSION,
+        "feature_version": FEATURE_VERSION,
+    }
+    try:
+        response = reanalyze_canonical_file(
+            Path(task.canonical_path),
+            scan_id=task.scan_id,
+            user_id=task.user_id,
+            source_capture_id=task.source_capture_id,
+            capture_kind=task.capture_kind,  # type: ignore[arg-type]
+            device_metadata=task.device_metadata,
+            private_root=Path(private_root) if private_root else None,
+        )
+    except Exception as exc:
+        row.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        return row
+    row.update(status="ok", error=None, response=response.model_dump(mode="json"))
+    return row
+
+
+def _read_checkpoint(path: Path) -> Tuple[Set[str], Optional[int]]:
+    """Paths done at the current versions, and the output size last recorded."""
+    if not path.exists():
+        return set(), None
+    done: Set[str] = set()
+    size: Optional[int] = None
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            # A line cut short by a crash; its batch is redone.
+            continue
+        size = entry["output_size"]
+        if entry["key"] == checkpoint_key():
+            done.update(entry["paths"])
+    return done, size
+
+
+def _append_checkpoint(path: Path, paths: List[str], output_size: int) -> None:
+    entry = {"key": checkpoint_key(), "output_size": output_size, "paths": paths}
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entry) + "\n")
+        handle.flush()
+        os.fsync(handle.fileno())
+
+
+def _measurement_rows(row: Dict[str, Any]) -> List[Dict[str, Any]]:
+    identity = {key: row[key] for key in ("canonical_path", "user_id", "scan_id", "source_capture_id", "capture_kind")}
+    if row["status"] != "ok":
+        return []
+    return [
+        {
+            **identity,
+            "feature_id": item["feature_id"],
+            "value": item["value"],
+            "unit": item["unit"],
+            "quality": item["quality"],
+            "confidence": item["confidence"],
+            "rejection_reason": item["rejection_reason"],
+            "extractor_version": item["extractor_version"],
+            "feature_version": item["feature_version"],
+        }
+        for item in row["response"]["features"]
+    ]
+
+
+class _BatchWriter:
+    def __init__(self, output: Path, output_format: OutputFormat) -> None:
+        self.output = output
+        self.output_format = output_format
+        if output_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+                import pyarrow.parquet  # noqa: F401
+            except ImportError as exc:
+                raise RuntimeError("parquet output requires pyarrow; use --format jsonl or install pyarrow") from exc
+            output.mkdir(parents=True, exist_ok=True)
+        else:
+            output.parent.mkdir(parents=True, exist_ok=True)
+
+    def size(self) -> int:
+        if self.output_format == "jsonl":
+            return self.output.stat().st_size if self.output.exists() else 0
+        return len(list(self.output.glob("part-*.parquet")))
+
+    def truncate(self, size: int) -> None:
+        """Drop whatever was written after the output was ``size`` long."""
+        if self.output_format == "jsonl":
+            if self.output.exists() and self.output.stat().st_size > size:
+                with self.output.open("r+b") as handle:
+                    handle.truncate(size)
+            return
+        for part in sorted(self.output.glob("part-*.parquet"))[size:]:
+            part.unlink()
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if self.output_format == "jsonl":
+            with self.output.open("a", encoding="utf-8") as handle:
+                for row in rows:
+                    handle.write(json.dumps(row, sort_keys=True) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        measurements = [item for row in rows for item in _measurement_rows(row)]
+        if not measurements:
+            return
+        table = pa.table({column: [item[column] for item in measurements] for column in PARQUET_COLUMNS})
+        part = len(list(self.output.glob("part-*.parquet")))
+        pq.write_table(table, self.output / f"part-{part:05d}.parquet")
+
+
+def _batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_backfill(
+    private_root: Path,
+    output: Path,
+    *,
+    checkpoint: Optional[Path] = None,
+    failures: Optional[Path] = None,
+    output_format: OutputFormat = "jsonl",
+    workers: int = 1,
+    batch_size: int = 32,
+    default_capture_kind: Optional[str] = None,
+    report: Optional[Callable[[BackfillSummary], None]] = None,
+) -> BackfillSummary:
+    """Re-extract every retained capture not yet checkpointed at the current versions."""
+    checkpoint = checkpoint or output.with_name(f"{output.name}.checkpoint")
+    failures = failures or output.with_name(f"{output.name}.failures.jsonl")
+    done, recorded_size = _read_checkpoint(checkpoint)
+    summary = BackfillSummary()
+    pending: List[BackfillTask] = []
+    for task in discover_backfill_tasks(private_root, default_capture_kind=default_capture_kind):
+        summary.discovered += 1
+        if task is None:
+            summary.skipped_unlabelled += 1
+        elif task.canonical_path in done:
+            summary.skipped_checkpointed += 1
+        else:
+            pending.append(task)
+    writer = _BatchWriter(output, output_format)
+    if recorded_size is not None:
+        writer.truncate(recorded_size)
+    # Anchor this run's starting size so even its first batch can be rolled back.
+    _append_checkpoint(checkpoint, [], writer.size())
+    failure_writer = _BatchWriter(failures, "jsonl")
+    failures.write_text("", encoding="utf-8")
+    started = time.perf_counter()
+    # Shards already use every core; their stages run serially.
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=use_serial_analysis) if workers > 1 else None
+    roots = [str(private_root)] * len(pending)
+    try:
+        # map() keeps every worker busy across batch boundaries while still
+        # yielding rows in discovery order, so output is deterministic.
+        rows = (
+            executor.map(run_backfill_task, pending, roots, chunksize=max(1, batch_size // (workers * 2)))
+            if executor
+            else map(run_backfill_task, pending, roots)
+        )
+        for batch in _batched(rows, batch_size):
+            succeeded = [row for row in batch if row["status"] == "ok"]
+            failed = [row for row in batch if row["status"] != "ok"]
+            writer.write(succeeded)
+            failure_writer.write(failed)
+            # Only successes are checkpointed; failures are retried on resume.
+            _append_checkpoint(checkpoint, [row["canonical_path"] for row in succeeded], writer.size())
+            summary.succeeded += len(succeeded)
+            summary.failed += len(failed)
+            summary.elapsed_seconds = time.perf_counter() - started
+            if report:
+                report(summary)
+    finally:
+        if executor:
+            executor.shutdown()
+    summary.elapsed_seconds = time.perf_counter() - started
+    return summary
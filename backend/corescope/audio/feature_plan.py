@@ -0,0 +1,158 @@
+"""Which analysis stages each capture kind runs.
+
+A ``FeaturePlan`` names the stages a capture kind needs. ``plan_levels``
+adds their dependencies and orders them into levels: every stage in a level
+depends only on earlier levels, so one level runs at a time and its stages run
+side by side on the analysis executor. Features of stages outside the plan are
+still emitted, as explicit null measurements, so stored results keep the same
+feature set for every kind.
+
+* ``sustained_vowel`` runs everything except the syllable-rate proxy, which
+  means nothing for a single held vowel.
+* ``guided_speech`` runs everything except the cycle-level jitter/shimmer
+  stage, which is only valid on sustained vowels.
+* The ``neutral_baseline``, ``challenge_response`` and ``recovery_response``
+  reactivity clips are compared on pitch, voice quality, spectral balance,
+  pauses and rate. Formant tracking (the most expensive Praat stage) and the
+  CPP proxy are skipped.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Literal, Tuple
+
+from .acoustic_contract import CaptureKind
+
+
+StageName = Literal["vad", "pitch_range", "pitch", "harmonicity", "cycle", "formant", "spectral", "cpp", "syllable"]
+
+PRAAT_STAGES: Tuple[StageName, ...] = ("pitch", "harmonicity", "cycle", "formant")
+
+# Praat stages wait for VAD because segmented extraction measures its speech
+# spans, and the pitch-dependent ones for the pre-pass that sets their bounds.
+STAGE_DEPENDENCIES: Dict[StageName, Tuple[StageName, ...]] = {
+    "vad": (),
+    "pitch_range": (),
+    "pitch": ("vad", "pitch_range"),
+    "harmonicity": ("vad", "pitch_range"),
+    "cycle": ("vad", "pitch_range"),
+    "formant": ("vad",),
+    "spectral": (),
+    "cpp": (),
+    "syllable": ("vad",),
+}
+
+_FORMANT_FEATURES = tuple(
+    f"voice.formant.f{index}.{stat}" for index in (1, 2, 3) for stat in ("median", "sd", "iqr", "valid_frame_ratio")
+) + ("voice.formant_stability", "voice.formant_dynamics")
+
+STAGE_FEATURES: Dict[StageName, Tuple[str, ...]] = {
+    "vad": (),
+    "pitch_range": (),
+    "pitch": (
+        "voice.f0.mean",
+        "voice.f0.median",
+        "voice.f0.sd",
+        "voice.f0.p20",
+        "voice.f0.p80",
+        "voice.f0.range_hz",
+        "voice.f0.range_semitones",
+        "voice.voiced_frame_ratio",
+        "voice.pitch_floor_used",
+        "voice.pitch_ceiling_used",
+        "voice.pitch_clarity",
+        "voice.pitch_stability",
+    ),
+    "harmonicity": ("voice.hnr.mean",),
+    "cycle": (
+        "voice.jitter.local",
+        "voice.jitter.local_absolute",
+        "voice.jitter.rap",
+        "voice.jitter.ppq5",
+        "voice.jitter.ddp",
+        "voice.shimmer.local",
+        "voice.shimmer.local_db",
+        "voice.shimmer.apq3",
+        "voice.shimmer.apq5",
+        "voice.shimmer.apq11",
+        "voice.shimmer.dda",
+    ),
+    "formant": _FORMANT_FEATURES,
+    "spectral": (
+        "voice.spectral_centroid",
+        "voice.spectral_flatness",
+        "voice.spectral_rolloff_85",
+        "voice.spectral_slope",
+        "voice.zero_crossing_rate",
+        "voice.rms_energy",
+        "voice.harmonic_richness",
+    ),
+    "cpp": ("voice.cepstral_peak_prominence_proxy",),
+    "syllable": ("voice.syllable_nuclei_rate",),
+}
+
+
+@dataclass(frozen=True)
+class FeaturePlan:
+    capture_kind: CaptureKind
+    stages: FrozenSet[StageName]
+
+    def runs(self, stage: StageName) -> bool:
+        return stage in self.stages
+
+    @property
+    def skipped_features(self) -> Tuple[str, ...]:
+        return tuple(
+            feature_id
+            for stage, feature_ids in STAGE_FEATURES.items()
+            if stage not in self.stages
+            for feature_id in feature_ids
+        )
+
+
+_ALL_STAGES: FrozenSet[StageName] = frozenset(STAGE_DEPENDENCIES)
+_REACTIVITY_STAGES: FrozenSet[StageName] = frozenset({"vad", "pitch_range", "pitch", "harmonicity", "spectral", "syllable"})
+
+FEATURE_PLANS: Dict[CaptureKind, FeaturePlan] = {
+    "sustained_vowel": FeaturePlan("sustained_vowel", _ALL_STAGES - {"syllable"}),
+    "guided_speech": FeaturePlan("guided_speech", _ALL_STAGES - {"cycle"}),
+    "neutral_baseline": FeaturePlan("neutral_baseline", _REACTIVITY_STAGES),
+    "challenge_response": FeaturePlan("challenge_response", _REACTIVITY_STAGES),
+    "recovery_response": FeaturePlan("recovery_response", _REACTIVITY_STAGES),
+}
+
+
+def plan_levels(stages: Iterable[StageName]) -> List[Tuple[StageName, ...]]:
+    """Stages plus their dependencies, grouped into dependency levels in a stable order."""
+    pending = set()
+    frontier = list(stages)
+    while frontier:
+        stage = frontier.pop()
+        if stage not in STAGE_DEPENDENCIES:
+            raise ValueError(f"unknown_analysis_stage:{stage}")
+        if stage not in pending:
+            pending.add(stage)
+            frontier.extend(STAGE_DEPENDENCIES[stage])
+    order = list(STAGE_DEPENDENCIES)
+    levels: List[Tuple[StageName, ...]] = []
+    done: set = set()
+    while pending:
+        ready = tuple(stage for stage in order if stage in pending and set(STAGE_DEPENDENCIES[stage]) <= done)
+        if not ready:
+            raise ValueError("analysis_stage_cycle")
+        levels.append(ready)
+        done.update(ready)
+        pending.difference_update(ready)
+    return levels
+
+
+__all__ = [
+    "FEATURE_PLANS",
+    "PRAAT_STAGES",
+    "STAGE_DEPENDENCIES",
+    "STAGE_FEATURES",
+    "FeaturePlan",
+    "StageName",
+    "plan_levels",
+]
@@ -0,0 +1,131 @@
+"""Per-capture pitch floor and ceiling from a cheap YIN pre-pass.
+
+Praat's "To Pitch" window length is set by the pitch floor, so a floor far
+below the speaker's voice makes the analysis slower. A ceiling far above it
+invites octave errors. ``estimate_pitch_range`` runs YIN (de Cheveigné &
+Kawahara, 2002) over a 4 kHz decimated copy of the capture and derives the
+bounds from the voiced-frame quartiles as ``0.75 * q25`` and ``1.5 * q75``
+(Hirst, 2011). Captures with too few voiced frames keep the default bounds.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import decimate
+
+
+PitchRangeSource = Literal["adaptive", "default", "fixed", "prior"]
+
+DEFAULT_PITCH_RANGE: Tuple[float, float] = (60.0, 400.0)
+PREPASS_SAMPLE_RATE = 4000
+PREPASS_FRAME_MS = 40
+PREPASS_HOP_MS = 10
+YIN_THRESHOLD = 0.15
+# Search band of the pre-pass and the outer limits of any derived or prior range.
+SEARCH_FLOOR_HZ = 50.0
+SEARCH_CEILING_HZ = 700.0
+MIN_VOICED_FRAMES = 10
+
+
+@dataclass(frozen=True)
+class PitchRange:
+    floor_hz: float
+    ceiling_hz: float
+    source: PitchRangeSource
+
+
+def validated_pitch_range(floor_hz: float, ceiling_hz: float, source: PitchRangeSource) -> PitchRange:
+    if not (SEARCH_FLOOR_HZ <= floor_hz < ceiling_hz <= SEARCH_CEILING_HZ):
+        raise ValueError("pitch_range_invalid")
+    return PitchRange(float(floor_hz), float(ceiling_hz), source)
+
+
+def yin_f0(samples: np.ndarray, sr: int) -> np.ndarray:
+    """F0 per 10 ms frame of a decimated copy; NaN for unvoiced or quiet frames."""
+    factor = max(1, sr // PREPASS_SAMPLE_RATE)
+    signal = decimate(samples.astype(np.float64), factor, ftype="fir") if factor > 1 else samples.astype(np.float64)
+    rate = sr / factor
+    min_lag = int(rate / SEARCH_CEILING_HZ)
+    max_lag = int(np.ceil(rate / SEARCH_FLOOR_HZ))
+    frame = int(rate * PREPASS_FRAME_MS / 1000)
+    width = frame - max_lag
+    if width <= 0 or signal.size < frame:
+        return np.array([])
+    frames = sliding_window_view(signal, frame)[:: int(rate * PREPASS_HOP_MS / 1000)]
+    head = frames[:, :width]
+    diff = np.empty((frames.shape[0], max_lag + 1))
+    diff[:, 0] = 0.0
+    for lag in range(1, max_lag + 1):
+        diff[:, lag] = np.sum((head - frames[:, lag : lag + width]) ** 2, axis=1)
+    lags = np.arange(max_lag + 1)
+    cumulative = np.cumsum(diff[:, 1:], axis=1)
+    cmnd = np.ones_like(diff)
+    cmnd[:, 1:] = diff[:, 1:] * lags[1:] / np.maximum(cumulative, 1e-12)
+    # Take the minimum of the first dip below threshold, as YIN does, so the
+    # period wins over its multiples.
+    band = lags >= min_lag
+    below = (cmnd < YIN_THRESHOLD) & band
+    first = np.argmax(below, axis=1)
+    after_first = lags >= first[:, None]
+    in_dip = below & after_first & (np.cumsum(~below & after_first, axis=1) == 0)
+    lag = np.argmin(np.where(in_dip, cmnd, np.inf), axis=1)
+    rows = np.arange(frames.shape[0])
+    inner = (lag > 1) & (lag < max_lag)
+    left = cmnd[rows, np.clip(lag - 1, 0, max_lag)]
+    centre = cmnd[rows, lag]
+    right = cmnd[rows, np.clip(lag + 1, 0, max_lag)]
+    curvature = left - 2 * centre + right
+    shift = np.where(inner & (np.abs(curvature) > 1e-12), 0.5 * (left - right) / np.where(curvature == 0, 1, curvature), 0.0)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    loud = rms > 0.1 * np.percentile(rms, 95)
+    voiced = below.any(axis=1) & loud
+    period = np.where(voiced, lag + np.clip(shift, -0.5, 0.5), np.nan)
+    return rate / period
+
+
+def estimate_pitch_range(
+    samples: np.ndarray,
+    sr: int,
+    default: Tuple[float, float] = DEFAULT_PITCH_RANGE,
+) -> PitchRange:
+    f0 = yin_f0(samples, sr)
+    voiced = f0[np.isfinite(f0)]
+    if voiced.size < MIN_VOICED_FRAMES:
+        return PitchRange(default[0], default[1], "default")
+    q25, q75 = np.percentile(voiced, [25, 75])
+    floor = max(SEARCH_FLOOR_HZ, float(np.floor(0.75 * q25)))
+    # Keep at least an octave between the bounds so vibrato and intonation fit.
+    ceiling = min(SEARCH_CEILING_HZ, max(float(np.ceil(1.5 * q75)), 2 * floor))
+    return PitchRange(floor, ceiling, "adaptive")
+
+
+def resolve_pitch_range(
+    floor_hz: Optional[float],
+    ceiling_hz: Optional[float],
+    prior: Optional[Tuple[float, float]],
+) -> Optional[PitchRange]:
+    """Bounds fixed by the caller, if any; ``None`` means run the pre-pass."""
+    if floor_hz is not None or ceiling_hz is not None:
+        return PitchRange(
+            float(floor_hz if floor_hz is not None else DEFAULT_PITCH_RANGE[0]),
+            float(ceiling_hz if ceiling_hz is not None else DEFAULT_PITCH_RANGE[1]),
+            "fixed",
+        )
+    if prior is not None:
+        return validated_pitch_range(prior[0], prior[1], "prior")
+    return None
+
+
+__all__ = [
+    "DEFAULT_PITCH_RANGE",
+    "PitchRange",
+    "PitchRangeSource",
+    "estimate_pitch_range",
+    "resolve_pitch_range",
+    "validated_pitch_range",
+    "yin_f0",
+]
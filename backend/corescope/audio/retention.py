@@ -0,0 +1,88 @@
+"""Retention index for private canonical audio.
+
+Every retained canonical WAV is registered by its storage key in a small SQLite
+index at the root of the private audio store when it is written. Cleanup pops
+only entries older than the retry window and deletes them through the audio
+store instead of walking and stat-ing the whole tree. SQLite's file locking
+keeps the index safe to share between uvicorn workers on one host.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+
+RETENTION_INDEX_NAME = ".retention.sqlite3"
+DEFAULT_RETRY_HOURS = 24
+
+
+class RetentionIndex:
+    def __init__(self, private_root: Path) -> None:
+        self.private_root = private_root
+        self.path = private_root / RETENTION_INDEX_NAME
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.private_root.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=10.0)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS retained_audio ("
+                " path TEXT PRIMARY KEY,"
+                " retained_at REAL NOT NULL"
+                ")"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS retained_audio_retained_at_idx ON retained_audio (retained_at)")
+            with connection:
+                yield connection
+
+    def register(self, key: str, *, retained_at: Optional[float] = None) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO retained_audio (path, retained_at) VALUES (?, ?)",
+                (key, time.time() if retained_at is None else retained_at),
+            )
+
+    def expired(self, cutoff: float, *, limit: int = 1000) -> List[str]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT path FROM retained_audio WHERE retained_at < ? ORDER BY retained_at LIMIT ?",
+                (cutoff, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def forget(self, keys: Iterable[str]) -> None:
+        rows = [(key,) for key in keys]
+        if not rows:
+            return
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM retained_audio WHERE path = ?", rows)
+
+    def __len__(self) -> int:
+        if not self.exists():
+            return 0
+        with self._connect() as connection:
+            return int(connection.execute("SELECT COUNT(*) FROM retained_audio").fetchone()[0])
+
+
+def prune_empty_dirs(private_root: Path, start: Path, *, keep_depth: int = 0) -> None:
+    """Remove ``start`` and its parents while empty.
+
+    Stops at the private root, or at ``keep_depth`` levels below it so that
+    permanent shard directories survive.
+    """
+    root = private_root.resolve()
+    current = start
+    while current.resolve().is_relative_to(root) and len(current.resolve().relative_to(root).parts) > keep_depth:
+        try:
+            current.rmdir()
+        except OSError:
+            return
+        current = current.parent
@@ -0,0 +1,106 @@
+"""Concurrent execution of independent acoustic analysis stages.
+
+Pitch, harmonicity, point-process and formant extraction all read the same
+canonical samples and never depend on each other, so they can run side by side.
+Parselmouth holds the GIL inside Praat routines, which makes threads useful
+only for the NumPy stages; deployments that want Praat on several cores select
+the process executor. Results are always merged in stage declaration order, so
+the output never depends on completion order.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Literal, Optional, Sequence, Tuple
+
+
+ANALYSIS_EXECUTOR_ENV = "SOULSCOPE_ANALYSIS_EXECUTOR"
+ANALYSIS_WORKERS_ENV = "SOULSCOPE_ANALYSIS_WORKERS"
+
+ExecutorKind = Literal["serial", "thread", "process"]
+
+
+@dataclass(frozen=True)
+class AnalysisStage:
+    """One independent unit of work. ``func`` must be module-level to be picklable."""
+
+    name: str
+    func: Callable[..., Any]
+    args: Tuple[Any, ...] = ()
+
+
+def run_stages(
+    stages: Sequence[AnalysisStage],
+    executor: Optional[Executor] = None,
+    *,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    """Run stages (concurrently when an executor is given) and merge by name in order."""
+    if executor is None:
+        results: Dict[str, Any] = {}
+        for stage in stages:
+            try:
+                results[stage.name] = stage.func(*stage.args)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                results[stage.name] = exc
+        return results
+    futures = [(stage.name, executor.submit(stage.func, *stage.args)) for stage in stages]
+    results = {}
+    for name, future in futures:
+        try:
+            results[name] = future.result()
+        except Exception as exc:
+            if not return_exceptions:
+                raise
+            results[name] = exc
+    return results
+
+
+def build_analysis_executor(kind: ExecutorKind, workers: Optional[int] = None) -> Optional[Executor]:
+    workers = max(1, workers or os.cpu_count() or 1)
+    if kind == "serial":
+        return None
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="acoustic-analysis")
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"unknown_analysis_executor:{kind}")
+
+
+_default_executor: Optional[Executor] = None
+_default_configured = False
+
+
+def default_analysis_executor() -> Optional[Executor]:
+    """Process-wide executor configured by ``SOULSCOPE_ANALYSIS_EXECUTOR``; serial by default."""
+    global _default_executor, _default_configured
+    if not _default_configured:
+        kind = os.getenv(ANALYSIS_EXECUTOR_ENV, "serial").strip().lower() or "serial"
+        workers_value = os.getenv(ANALYSIS_WORKERS_ENV, "").strip()
+        _default_executor = build_analysis_executor(kind, int(workers_value) if workers_value else None)  # type: ignore[arg-type]
+        _default_configured = True
+    return _default_executor
+
+
+def use_serial_analysis() -> None:
+    """Pin this process's default executor to serial.
+
+    Initializer for processes that are themselves pool workers (such as
+    backfill shards), so ``SOULSCOPE_ANALYSIS_EXECUTOR=process`` never nests a
+    pool inside every worker.
+    """
+    global _default_executor, _default_configured
+    _default_executor = None
+    _default_configured = True
+
+
+def shutdown_analysis_executor() -> None:
+    global _default_executor, _default_configured
+    if _default_executor is not None:
+        _default_executor.shutdown(wait=True)
+    _default_executor = None
+    _default_configured = False
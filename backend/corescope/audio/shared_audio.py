@@ -0,0 +1,128 @@
+"""Zero-copy sample transport for process-pool analysis workers.
+
+Pickling the canonical float32 samples into every process-pool stage would copy
+up to 5.7 MB per stage per capture. Instead the parent copies the samples once
+into a ``multiprocessing.shared_memory`` block and stages receive a tiny handle
+(block name plus sample range); workers attach, analyse the view in place and
+detach before returning. The parent unlinks the block when the request ends.
+
+Arrays are built with ``np.frombuffer`` over the block's memoryview, so every
+view derived from them holds a buffer export on the mapping and Python refuses
+to unmap it (``BufferError``) while any such view is alive, however it was
+sliced.
+"""
+
+from __future__ import annotations
+
+import sys
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+
+from .scheduler import AnalysisStage
+
+
+@dataclass(frozen=True)
+class SharedSamplesHandle:
+    """Picklable reference to a contiguous range of samples in a shared block."""
+
+    name: str
+    dtype: str
+    start: int
+    stop: int
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the block with the resource tracker that
+    # workers share with the parent; the parent's unlink unregisters it.
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedAudioBuffer:
+    """Owns one shared-memory copy of a capture's samples for a single request."""
+
+    def __init__(self, samples: np.ndarray) -> None:
+        source = np.ascontiguousarray(samples)
+        self._shm: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(create=True, size=max(1, source.nbytes))
+        self._linked = True
+        self.dtype = source.dtype
+        self.array = np.frombuffer(self._shm.buf, dtype=source.dtype, count=source.size).reshape(source.shape)
+        self.array[...] = source
+
+    @property
+    def name(self) -> str:
+        if self._shm is None:
+            raise ValueError("shared_audio_closed")
+        return self._shm.name
+
+    def handle_for(self, samples: np.ndarray) -> SharedSamplesHandle:
+        """Describe ``samples``, which must be a contiguous view of ``self.array``."""
+        if samples.dtype != self.dtype or not samples.flags.c_contiguous or not np.shares_memory(samples, self.array):
+            raise ValueError("samples_not_in_shared_buffer")
+        start = (samples.ctypes.data - self.array.ctypes.data) // self.dtype.itemsize
+        return SharedSamplesHandle(self.name, self.dtype.str, int(start), int(start + samples.size))
+
+    def close(self) -> None:
+        """Unlink and unmap the block.
+
+        Raises ``BufferError`` while a view of ``array`` is still alive; the
+        name is already unlinked then, and a later ``close`` unmaps the block.
+        """
+        if self._shm is None:
+            return
+        if self._linked:
+            self._shm.unlink()
+            self._linked = False
+        self.array = np.empty(0, dtype=self.dtype)
+        try:
+            self._shm.close()
+        except BufferError as exc:
+            raise BufferError("shared_audio_view_alive") from exc
+        self._shm = None
+
+    def __enter__(self) -> "SharedAudioBuffer":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Frames of the propagating traceback may still hold views; a
+        # BufferError here would hide the real error.
+        with suppress(BufferError):
+            self.close()
+
+
+@contextmanager
+def attached_samples(handle: SharedSamplesHandle) -> Iterator[np.ndarray]:
+    """Attach to a shared block in a worker and yield the referenced samples."""
+    shm = _attach(handle.name)
+    dtype = np.dtype(handle.dtype)
+    samples = np.frombuffer(shm.buf, dtype=dtype, count=handle.stop - handle.start, offset=handle.start * dtype.itemsize)
+    try:
+        yield samples
+    finally:
+        del samples
+        try:
+            shm.close()
+        except BufferError:
+            # The caller kept a view (e.g. in its result); the mapping stays
+            # valid and is unmapped once that view is freed.
+            pass
+
+
+def run_with_shared_samples(func: Callable[..., Any], handle: SharedSamplesHandle, *args: Any) -> Any:
+    """Worker entry point: resolve the handle, then call ``func(samples, *args)``."""
+    with attached_samples(handle) as samples:
+        return func(samples, *args)
+
+
+def shared_stage(stage: AnalysisStage, buffer: SharedAudioBuffer) -> AnalysisStage:
+    """Swap a stage's leading sample array for a handle into ``buffer``."""
+    samples, *rest = stage.args
+    return AnalysisStage(stage.name, run_with_shared_samples, (stage.func, buffer.handle_for(samples), *rest))
@@ -0,0 +1,243 @@
+"""Storage backends for retained canonical audio.
+
+Analysis always reads and writes a local working path; a store decides where
+that path lives and where the canonical WAV and its manifest are retained. The
+local store hash-shards captures into a fixed set of directories created once
+in a batch, so requests never create user/scan directory trees and no single
+directory grows with the number of users. The S3-compatible store stages files
+locally, uploads them, and materialises them again for re-analysis; any client
+exposing boto3's ``upload_file``/``download_file``/``head_object``/``delete_object``
+works.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterator, Set
+from uuid import uuid4
+
+from .retention import RetentionIndex, prune_empty_dirs
+
+
+CANONICAL_SUFFIX = ".canonical.wav"
+CAPTURE_MANIFEST_SUFFIX = ".capture.json"
+AUDIO_STORE_ENV = "SOULSCOPE_AUDIO_STORE"
+MISSING_OBJECT_CODES = {"404", "NoSuchKey", "NotFound"}
+
+
+def capture_manifest_path(canonical_path: Path) -> Path:
+    return canonical_path.with_name(canonical_path.name.replace(CANONICAL_SUFFIX, CAPTURE_MANIFEST_SUFFIX))
+
+
+def _safe_component(value: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in value)
+
+
+def sharded_key(user_id: str, scan_id: str, source_capture_id: str, *, levels: int = 1, width: int = 2) -> str:
+    """Storage key for a new capture; captures of one scan share a shard."""
+    digest = hashlib.sha256(f"{user_id}/{scan_id}".encode("utf-8")).hexdigest()
+    shards = [digest[index * width : (index + 1) * width] for index in range(levels)]
+    name = f"{_safe_component(user_id)}.{_safe_component(scan_id)}.{_safe_component(source_capture_id)}-{uuid4().hex}{CANONICAL_SUFFIX}"
+    return str(PurePosixPath(*shards, name))
+
+
+@dataclass(frozen=True)
+class CaptureLocation:
+    key: str
+    local_path: Path
+
+
+class CanonicalAudioStore(ABC):
+    """Where canonical WAVs and their manifests are retained."""
+
+    index_root: Path
+
+    @property
+    def retention_index(self) -> RetentionIndex:
+        return RetentionIndex(self.index_root)
+
+    def prepare(self) -> None:
+        """One-time setup before serving requests (directories, staging)."""
+
+    @abstractmethod
+    def allocate(self, user_id: str, scan_id: str, source_capture_id: str) -> CaptureLocation:
+        """Reserve a key and a local working path for a new capture."""
+
+    @abstractmethod
+    def persist(self, location: CaptureLocation) -> str:
+        """Retain the written WAV (and manifest, if any); return ``storage_path(location.key)``."""
+
+    @abstractmethod
+    def storage_path(self, key: str) -> str:
+        """The storage path reported for a retained capture."""
+
+    def release(self, location: CaptureLocation) -> None:
+        """Drop local working copies once a request no longer needs them."""
+
+    @abstractmethod
+    @contextmanager
+    def materialize(self, key: str) -> Iterator[Path]:
+        """Yield a local path holding the retained WAV and its manifest."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove a retained capture; return whether a WAV was removed."""
+
+
+class LocalShardedStore(CanonicalAudioStore):
+    def __init__(self, root: Path, *, levels: int = 1, width: int = 2) -> None:
+        self.root = root
+        self.index_root = root
+        self.levels = levels
+        self.width = width
+        self._ready_dirs: Set[Path] = set()
+
+    def prepare(self) -> None:
+        """Create every shard directory in one pass (256 with the defaults)."""
+        alphabet = "0123456789abcdef"
+        for parts in product(("".join(chars) for chars in product(alphabet, repeat=self.width)), repeat=self.levels):
+            directory = self.root.joinpath(*parts)
+            directory.mkdir(parents=True, exist_ok=True)
+            self._ready_dirs.add(directory)
+
+    def allocate(self, user_id: str, scan_id: str, source_capture_id: str) -> CaptureLocation:
+        key = sharded_key(user_id, scan_id, source_capture_id, levels=self.levels, width=self.width)
+        path = self.root / key
+        if path.parent not in self._ready_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._ready_dirs.add(path.parent)
+        return CaptureLocation(key, path)
+
+    def persist(self, location: CaptureLocation) -> str:
+        return self.storage_path(location.key)
+
+    def storage_path(self, key: str) -> str:
+        return str(self.root / key)
+
+    @contextmanager
+    def materialize(self, key: str) -> Iterator[Path]:
+        yield self.root / key
+
+    def delete(self, key: str) -> bool:
+        path = self.root / key
+        existed = not path.is_symlink() and path.exists()
+        if existed:
+            path.unlink(missing_ok=True)
+        capture_manifest_path(path).unlink(missing_ok=True)
+        # Shard directories are permanent; only legacy user/scan trees are pruned.
+        prune_empty_dirs(self.root, path.parent, keep_depth=self.levels)
+        return existed
+
+
+class S3CanonicalStore(CanonicalAudioStore):
+    def __init__(self, client: Any, bucket: str, *, work_root: Path, prefix: str = "", levels: int = 1, width: int = 2) -> None:
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.work_root = work_root
+        self.index_root = work_root
+        self.levels = levels
+        self.width = width
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def prepare(self) -> None:
+        (self.work_root / "staging").mkdir(parents=True, exist_ok=True)
+
+    def allocate(self, user_id: str, scan_id: str, source_capture_id: str) -> CaptureLocation:
+        key = sharded_key(user_id, scan_id, source_capture_id, levels=self.levels, width=self.width)
+        staging = self.work_root / "staging"
+        staging.mkdir(parents=True, exist_ok=True)
+        return CaptureLocation(key, staging / PurePosixPath(key).name)
+
+    def persist(self, location: CaptureLocation) -> str:
+        object_key = self._object_key(location.key)
+        manifest = capture_manifest_path(location.local_path)
+        if manifest.exists():
+            self.client.upload_file(str(manifest), self.bucket, capture_manifest_path(Path(object_key)).as_posix())
+        self.client.upload_file(str(location.local_path), self.bucket, object_key)
+        return self.storage_path(location.key)
+
+    def storage_path(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._object_key(key)}"
+
+    def release(self, location: CaptureLocation) -> None:
+        location.local_path.unlink(missing_ok=True)
+        capture_manifest_path(location.local_path).unlink(missing_ok=True)
+
+    @contextmanager
+    def materialize(self, key: str) -> Iterator[Path]:
+        object_key = self._object_key(key)
+        path = self.work_root / "staging" / f"{uuid4().hex}-{PurePosixPath(key).name}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.client.download_file(self.bucket, object_key, str(path))
+            try:
+                self.client.download_file(self.bucket, capture_manifest_path(Path(object_key)).as_posix(), str(capture_manifest_path(path)))
+            except Exception:
+                # Legacy objects may predate manifests.
+                pass
+            yield path
+        finally:
+            path.unlink(missing_ok=True)
+            capture_manifest_path(path).unlink(missing_ok=True)
+
+    def delete(self, key: str) -> bool:
+        object_key = self._object_key(key)
+        # delete_object succeeds for missing keys, so ask first; retention
+        # counts only captures that were actually removed.
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=object_key)
+            existed = True
+        except Exception as exc:
+            if _error_code(exc) not in MISSING_OBJECT_CODES:
+                raise
+            existed = False
+        self.client.delete_object(Bucket=self.bucket, Key=capture_manifest_path(Path(object_key)).as_posix())
+        if existed:
+            self.client.delete_object(Bucket=self.bucket, Key=object_key)
+        return existed
+
+
+def _error_code(exc: Exception) -> str:
+    """botocore ``ClientError`` code, or ``""`` for other exceptions."""
+    response = getattr(exc, "response", None)
+    return str(response.get("Error", {}).get("Code", "")) if isinstance(response, dict) else ""
+
+
+def build_canonical_audio_store(private_root: Path) -> CanonicalAudioStore:
+    """Store selected by ``SOULSCOPE_AUDIO_STORE`` (``local`` by default, or ``s3``)."""
+    kind = os.getenv(AUDIO_STORE_ENV, "local").strip().lower() or "local"
+    if kind == "local":
+        return LocalShardedStore(private_root)
+    if kind == "s3":
+        try:
+            import boto3
+        except ImportError as exc:  # pragma: no cover - deployment configuration error
+            raise RuntimeError("SOULSCOPE_AUDIO_STORE=s3 requires boto3") from exc
+        bucket = os.getenv("SOULSCOPE_AUDIO_S3_BUCKET")
+        if not bucket:
+            raise RuntimeError("SOULSCOPE_AUDIO_S3_BUCKET is required for the s3 audio store")
+        client = boto3.client("s3", endpoint_url=os.getenv("SOULSCOPE_AUDIO_S3_ENDPOINT_URL") or None)
+        return S3CanonicalStore(client, bucket, work_root=private_root, prefix=os.getenv("SOULSCOPE_AUDIO_S3_PREFIX", ""))
+    raise RuntimeError(f"Unknown {AUDIO_STORE_ENV}: {kind}")
+
+
+__all__ = [
+    "CANONICAL_SUFFIX",
+    "CAPTURE_MANIFEST_SUFFIX",
+    "CanonicalAudioStore",
+    "CaptureLocation",
+    "LocalShardedStore",
+    "S3CanonicalStore",
+    "build_canonical_audio_store",
+    "capture_manifest_path",
+    "sharded_key",
+]
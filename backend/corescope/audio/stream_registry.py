@@ -0,0 +1,108 @@
+"""Bounded registry of live acoustic streams held by one process.
+
+A stream holds its decoded PCM (up to about 5.8 MB at the duration limit) and
+an allocated capture location until ``finish``. Streams expire
+``idle_ttl_seconds`` after their last chunk, and the least recently used stream
+is evicted once ``max_streams`` is reached; either way the stream is abandoned,
+which drops its samples and releases its location. Streams live in the
+worker's memory, so every request of a stream must reach the same worker; the
+app refuses to start streaming with more than one worker (``WEB_CONCURRENCY``).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .streaming import StreamingAnalysisSession
+
+
+DEFAULT_STREAM_IDLE_SECONDS = 120.0
+DEFAULT_MAX_STREAMS = 32
+
+
+class AcousticStreamRegistry:
+    def __init__(
+        self,
+        *,
+        idle_ttl_seconds: float = DEFAULT_STREAM_IDLE_SECONDS,
+        max_streams: int = DEFAULT_MAX_STREAMS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_streams = max_streams
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._streams: "OrderedDict[str, Tuple[float, StreamingAnalysisSession]]" = OrderedDict()
+
+    def _expired(self, now: float) -> List["StreamingAnalysisSession"]:
+        stale = [key for key, (expires_at, _) in self._streams.items() if expires_at <= now]
+        return [self._streams.pop(key)[1] for key in stale]
+
+    def add(self, stream_id: str, stream: "StreamingAnalysisSession") -> None:
+        with self._lock:
+            now = self.clock()
+            evicted = self._expired(now)
+            while len(self._streams) >= self.max_streams:
+                evicted.append(self._streams.popitem(last=False)[1][1])
+            self._streams[stream_id] = (now + self.idle_ttl_seconds, stream)
+        _abandon(evicted)
+
+    def get(self, stream_id: str) -> Optional["StreamingAnalysisSession"]:
+        """Return a live stream and mark it used, or ``None`` if unknown or expired."""
+        with self._lock:
+            now = self.clock()
+            entry = self._streams.get(stream_id)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._streams[stream_id]
+                expired: Optional["StreamingAnalysisSession"] = entry[1]
+            else:
+                self._streams[stream_id] = (now + self.idle_ttl_seconds, entry[1])
+                self._streams.move_to_end(stream_id)
+                return entry[1]
+        _abandon([expired])
+        return None
+
+    def pop(self, stream_id: str) -> Optional["StreamingAnalysisSession"]:
+        """Remove a stream without abandoning it (the caller finishes or abandons it)."""
+        with self._lock:
+            entry = self._streams.pop(stream_id, None)
+        return entry[1] if entry is not None else None
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            expired = self._expired(self.clock())
+        _abandon(expired)
+        return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._streams)
+
+
+def _abandon(streams: List[Optional["StreamingAnalysisSession"]]) -> None:
+    for stream in streams:
+        if stream is not None:
+            stream.abandon()
+
+
+def build_stream_registry() -> AcousticStreamRegistry:
+    """Registry limited by ``SOULSCOPE_STREAM_IDLE_SECONDS`` and ``SOULSCOPE_STREAM_MAX``."""
+    return AcousticStreamRegistry(
+        idle_ttl_seconds=float(os.getenv("SOULSCOPE_STREAM_IDLE_SECONDS", str(DEFAULT_STREAM_IDLE_SECONDS))),
+        max_streams=int(os.getenv("SOULSCOPE_STREAM_MAX", str(DEFAULT_MAX_STREAMS))),
+    )
+
+
+__all__ = [
+    "DEFAULT_MAX_STREAMS",
+    "DEFAULT_STREAM_IDLE_SECONDS",
+    "AcousticStreamRegistry",
+    "build_stream_registry",
+]
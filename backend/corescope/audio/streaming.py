@@ -0,0 +1,322 @@
+"""Incremental acoustic analysis for audio that arrives while the user speaks.
+
+Live capture streams canonical PCM (16 kHz, mono, little-endian int16) in
+arbitrary chunk sizes. The session keeps incremental VAD state, running pitch
+statistics and Welch-style spectral accumulators so provisional snapshots are
+cheap, then hands the already-decoded samples and finished VAD to
+``analyze_canonical_audio`` at end-of-stream. Provisional snapshots are capture
+feedback only; the final response is the canonical contract. Running pitch
+uses the caller's bounds, else the prior range, else the default range; the
+final analysis gets only what the caller gave, so it runs the pitch pre-pass
+like an upload would.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import parselmouth
+from parselmouth.praat import call
+
+from .acoustic_contract import AcousticAnalysisResponse, CaptureKind, StreamingFeatureSnapshot, VadSegment
+from .acoustic_extractor import (
+    MAX_DURATION_SECONDS,
+    TARGET_SAMPLE_RATE,
+    _energy_vad,
+    _percentile,
+    _safe_float,
+    _segment_states,
+    analyze_canonical_audio,
+    write_canonical_wav,
+    write_capture_manifest,
+    webrtcvad,
+)
+from .pitch_range import DEFAULT_PITCH_RANGE, PitchRange, resolve_pitch_range
+from .storage import CanonicalAudioStore, CaptureLocation, capture_manifest_path
+from corescope.engine.baselines import BaselineStore
+
+
+STREAM_CONTENT_TYPE = "audio/L16; rate=16000; channels=1"
+VAD_FRAME_MS = 30
+SPECTRAL_FRAME = 1024
+DEFAULT_SNAPSHOT_INTERVAL_MS = 3000
+
+
+class IncrementalVad:
+    """WebRTC VAD over complete 30 ms frames; matches ``_run_vad`` once finished."""
+
+    def __init__(self, sr: int = TARGET_SAMPLE_RATE) -> None:
+        self.sr = sr
+        self.frame_len = max(1, int(sr * VAD_FRAME_MS / 1000))
+        self._detector = webrtcvad.Vad(2) if webrtcvad is not None else None
+        self._voiced: List[bool] = []
+        self.frames_processed = 0
+
+    def consume(self, samples: np.ndarray, available: int) -> None:
+        """Classify every complete frame in ``samples[:available]`` not yet seen."""
+        complete = available // self.frame_len
+        if complete <= self.frames_processed:
+            return
+        start = self.frames_processed * self.frame_len
+        frames = samples[start : complete * self.frame_len].reshape(-1, self.frame_len)
+        if self._detector is not None:
+            pcm = np.clip(frames * 32767, -32768, 32767).astype(np.int16)
+            self._voiced.extend(self._detector.is_speech(frame.tobytes(), self.sr) for frame in pcm)
+        self.frames_processed = complete
+
+    def stats(self, sample_count: int) -> Dict[str, float]:
+        voiced = np.asarray(self._voiced, dtype=bool)
+        return _segment_states(voiced, self.frame_len, min(sample_count, voiced.size * self.frame_len), self.sr, 0.78, "webrtc_vad")[1]
+
+    def finish(self, samples: np.ndarray) -> Tuple[List[VadSegment], Dict[str, float]]:
+        """Classify the zero-padded tail frame and apply the batch fallback rule."""
+        if self._detector is None:
+            return _energy_vad(samples, self.sr)
+        tail_start = self.frames_processed * self.frame_len
+        if tail_start < len(samples):
+            tail = np.zeros(self.frame_len, dtype=np.float32)
+            tail[: len(samples) - tail_start] = samples[tail_start:]
+            pcm = np.clip(tail * 32767, -32768, 32767).astype(np.int16)
+            self._voiced.append(self._detector.is_speech(pcm.tobytes(), self.sr))
+            self.frames_processed += 1
+        voiced = np.asarray(self._voiced, dtype=bool)
+        segments, stats = _segment_states(voiced, self.frame_len, len(samples), self.sr, 0.78, "webrtc_vad")
+        if stats.get("voiced_duration_ms", 0) > 0:
+            return segments, stats
+        return _energy_vad(samples, self.sr)
+
+
+class StreamingAnalysisSession:
+    """Accumulates one live capture and produces provisional and final results."""
+
+    def __init__(
+        self,
+        *,
+        stream_id: str,
+        location: CaptureLocation,
+        scan_id: str,
+        user_id: str,
+        source_capture_id: str,
+        capture_kind: CaptureKind,
+        device_metadata: Dict[str, Any],
+        pitch_floor_hz: Optional[float] = None,
+        pitch_ceiling_hz: Optional[float] = None,
+        prior_pitch_range: Optional[Tuple[float, float]] = None,
+        snapshot_interval_ms: int = DEFAULT_SNAPSHOT_INTERVAL_MS,
+        store: Optional[CanonicalAudioStore] = None,
+        baseline_store: Optional[BaselineStore] = None,
+    ) -> None:
+        self.stream_id = stream_id
+        self.location = location
+        self.store = store
+        self.baseline_store = baseline_store
+        self.scan_id = scan_id
+        self.user_id = user_id
+        self.source_capture_id = source_capture_id
+        self.capture_kind = capture_kind
+        self.device_metadata = device_metadata
+        self.pitch_floor_hz = pitch_floor_hz
+        self.pitch_ceiling_hz = pitch_ceiling_hz
+        self.prior_pitch_range = prior_pitch_range
+        # Running pitch needs bounds before any audio arrives.
+        self._running_range = resolve_pitch_range(pitch_floor_hz, pitch_ceiling_hz, prior_pitch_range) or PitchRange(
+            *DEFAULT_PITCH_RANGE, "default"
+        )
+        self.snapshot_interval_samples = max(1, int(snapshot_interval_ms * TARGET_SAMPLE_RATE / 1000))
+        self.sr = TARGET_SAMPLE_RATE
+        self.max_samples = MAX_DURATION_SECONDS * TARGET_SAMPLE_RATE
+        self._samples = np.zeros(self.sr * 4, dtype=np.float32)
+        self._count = 0
+        self._pending_byte = b""
+        self._vad = IncrementalVad(self.sr)
+        # Running pitch: voiced F0 frames from every analysed block.
+        self._pitch_position = 0
+        self._voiced_f0: List[float] = []
+        self._pitch_frames = 0
+        # Spectral accumulators over Hann-windowed, non-overlapping frames.
+        self._spectral_position = 0
+        self._spectral_window = np.hanning(SPECTRAL_FRAME).astype(np.float32)
+        self._power_sum = np.zeros(SPECTRAL_FRAME // 2 + 1, dtype=np.float64)
+        self._spectral_frames = 0
+        self._sum_squares = 0.0
+        self._zero_crossings = 0
+        self._last_snapshot_at = 0
+        # Chunk routes run in worker threads; one request at a time touches a stream.
+        self._lock = threading.RLock()
+        self.finished = False
+
+    @property
+    def received_ms(self) -> int:
+        return int(round(self._count / self.sr * 1000))
+
+    def append_pcm(self, chunk: bytes) -> Optional[StreamingFeatureSnapshot]:
+        """Append little-endian int16 PCM; return a snapshot when one is due."""
+        with self._lock:
+            return self._append_pcm(chunk)
+
+    def _append_pcm(self, chunk: bytes) -> Optional[StreamingFeatureSnapshot]:
+        if self.finished:
+            raise ValueError("stream_already_finished")
+        data = self._pending_byte + chunk
+        usable = len(data) - (len(data) % 2)
+        self._pending_byte = data[usable:]
+        incoming = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        if self._count + incoming.size > self.max_samples:
+            raise ValueError("audio_too_long")
+        self._reserve(self._count + incoming.size)
+        self._samples[self._count : self._count + incoming.size] = incoming
+        previous = self._count
+        self._count += incoming.size
+        self._accumulate_energy(previous, self._count)
+        self._vad.consume(self._samples, self._count)
+        self._accumulate_spectrum()
+        if self._count - self._last_snapshot_at >= self.snapshot_interval_samples:
+            return self._snapshot()
+        return None
+
+    def snapshot(self) -> StreamingFeatureSnapshot:
+        """Provisional features for the audio received so far."""
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> StreamingFeatureSnapshot:
+        self._accumulate_pitch()
+        self._last_snapshot_at = self._count
+        voiced = np.asarray(self._voiced_f0, dtype=float)
+        low = _percentile(voiced, 20)
+        high = _percentile(voiced, 80)
+        features: Dict[str, Optional[float]] = {
+            "voice.f0.mean": _safe_float(np.mean(voiced)) if voiced.size else None,
+            "voice.f0.median": _safe_float(np.median(voiced)) if voiced.size else None,
+            "voice.f0.sd": _safe_float(np.std(voiced)) if voiced.size else None,
+            "voice.f0.p20": low,
+            "voice.f0.p80": high,
+            "voice.voiced_frame_ratio": float(voiced.size / max(1, self._pitch_frames)),
+            "voice.rms_energy": float(np.sqrt(self._sum_squares / max(1, self._count))),
+            "voice.zero_crossing_rate": float(self._zero_crossings / max(1, self._count - 1)),
+        }
+        features.update(self._spectral_summary())
+        vad_stats = self._vad.stats(self._count)
+        return StreamingFeatureSnapshot(
+            stream_id=self.stream_id,
+            source_capture_id=self.source_capture_id,
+            capture_kind=self.capture_kind,
+            received_ms=self.received_ms,
+            features=features,
+            vad=vad_stats,
+        )
+
+    def finish(self, *, original_content_type: str = STREAM_CONTENT_TYPE) -> AcousticAnalysisResponse:
+        """Persist the canonical WAV and return the canonical analysis result."""
+        with self._lock:
+            return self._finish(original_content_type)
+
+    def abandon(self) -> None:
+        """Drop the samples and working files of a stream that will never finish."""
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            self._samples = np.zeros(0, dtype=np.float32)
+        # Nothing was persisted yet, so the working path is never a retained WAV.
+        self.location.local_path.unlink(missing_ok=True)
+        capture_manifest_path(self.location.local_path).unlink(missing_ok=True)
+        if self.store is not None:
+            self.store.release(self.location)
+
+    def _finish(self, original_content_type: str) -> AcousticAnalysisResponse:
+        if self.finished:
+            raise ValueError("stream_already_finished")
+        self.finished = True
+        samples = self._samples[: self._count]
+        canonical_path = self.location.local_path
+        if self.store is not None:
+            self.store.retention_index.register(self.location.key)
+        try:
+            decoded = write_canonical_wav(samples, self.sr, canonical_path)
+            write_capture_manifest(
+                canonical_path,
+                user_id=self.user_id,
+                scan_id=self.scan_id,
+                source_capture_id=self.source_capture_id,
+                capture_kind=self.capture_kind,
+                device_metadata=self.device_metadata,
+            )
+            storage_path = self.store.persist(self.location) if self.store is not None else str(canonical_path)
+            return analyze_canonical_audio(
+                decoded,
+                scan_id=self.scan_id,
+                user_id=self.user_id,
+                source_capture_id=self.source_capture_id,
+                capture_kind=self.capture_kind,
+                original_content_type=original_content_type,
+                storage_path=storage_path,
+                device_metadata=self.device_metadata,
+                pitch_floor_hz=self.pitch_floor_hz,
+                pitch_ceiling_hz=self.pitch_ceiling_hz,
+                prior_pitch_range=self.prior_pitch_range,
+                vad=self._vad.finish(samples),
+                baseline_store=self.baseline_store,
+            )
+        finally:
+            if self.store is not None:
+                self.store.release(self.location)
+
+    def _reserve(self, size: int) -> None:
+        if size <= self._samples.size:
+            return
+        grown = np.zeros(min(self.max_samples, max(size, self._samples.size * 2)), dtype=np.float32)
+        grown[: self._count] = self._samples[: self._count]
+        self._samples = grown
+
+    def _accumulate_energy(self, start: int, end: int) -> None:
+        block = self._samples[start:end]
+        self._sum_squares += float(np.dot(block, block))
+        # Include the boundary pair so chunking never changes the crossing count.
+        signs = np.signbit(self._samples[max(0, start - 1) : end])
+        self._zero_crossings += int(np.count_nonzero(signs[1:] != signs[:-1]))
+
+    def _accumulate_spectrum(self) -> None:
+        complete = (self._count - self._spectral_position) // SPECTRAL_FRAME
+        if complete <= 0:
+            return
+        end = self._spectral_position + complete * SPECTRAL_FRAME
+        frames = self._samples[self._spectral_position : end].reshape(complete, SPECTRAL_FRAME)
+        spectra = np.abs(np.fft.rfft(frames * self._spectral_window, axis=1)) ** 2
+        self._power_sum += spectra.sum(axis=0)
+        self._spectral_frames += complete
+        self._spectral_position = end
+
+    def _accumulate_pitch(self) -> None:
+        # Praat needs three periods of the floor as left context; frames that
+        # fall inside the context were already counted by the previous block.
+        context = int(round(3.0 / self._running_range.floor_hz * self.sr))
+        start = max(0, self._pitch_position - context)
+        if self._count - self._pitch_position < context:
+            return
+        sound = parselmouth.Sound(self._samples[start : self._count].astype(np.float64), sampling_frequency=self.sr)
+        pitch = call(sound, "To Pitch", 0.0, self._running_range.floor_hz, self._running_range.ceiling_hz)
+        frequencies = np.asarray(pitch.selected_array["frequency"], dtype=float)
+        times = np.asarray(pitch.xs(), dtype=float)
+        fresh = times >= (self._pitch_position - start) / self.sr
+        self._pitch_frames += int(np.count_nonzero(fresh))
+        self._voiced_f0.extend(frequencies[fresh & (frequencies > 0)].tolist())
+        self._pitch_position = self._count
+
+    def _spectral_summary(self) -> Dict[str, Optional[float]]:
+        if self._spectral_frames == 0:
+            return {}
+        power = self._power_sum / self._spectral_frames
+        total = float(np.sum(power))
+        if total <= 1e-12:
+            return {}
+        freqs = np.fft.rfftfreq(SPECTRAL_FRAME, 1 / self.sr)
+        cumulative = np.cumsum(power)
+        return {
+            "voice.spectral_centroid": float(np.sum(freqs * power) / total),
+            "voice.spectral_rolloff_85": float(freqs[min(len(freqs) - 1, int(np.searchsorted(cumulative, total * 0.85)))]),
+            "voice.spectral_flatness": float(np.exp(np.mean(np.log(power + 1e-12))) / (np.mean(power) + 1e-12)),
+            "voice.harmonic_richness": float(np.sum(power[(freqs >= 100) & (freqs <= 1200)]) / total),
+        }
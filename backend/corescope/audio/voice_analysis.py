@@ -1,80 +1,64 @@
 # corescope/audio/voice_analysis.py
+"""
+``VoiceFeatures`` for the core frequency fusion, read off one canonical
+acoustic analysis.
 
-import numpy as np
-import librosa
-import parselmouth  # Praat wrapper
-from parselmouth.praat import call
+Pitch, jitter, shimmer, HNR and spectral centroid come from the same
+``analyze_canonical_audio`` pass that the acoustic routes run, on the same
+16 kHz canonical samples. Nothing is decoded, resampled or pitch-tracked a
+second time, and librosa is not needed.
+"""
 
-from corescope.core_frequency.models import VoiceFeatures
-
-
-def load_audio_mono(path: str, target_sr: int = 16000) -> tuple[np.ndarray, int]:
-    """
-    Load audio file as mono, resampled to target_sr.
-    Returns (audio, sr).
-    """
-    audio, sr = librosa.load(path, sr=target_sr, mono=True)
-    return audio, sr
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional, Union
 
-
-def compute_spectral_centroid(audio: np.ndarray, sr: int) -> float:
-    centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)
-    return float(np.mean(centroid))
+from corescope.core_frequency.models import VoiceFeatures
+from .acoustic_contract import AcousticAnalysisResponse, CaptureKind
+from .acoustic_extractor import analyze_canonical_audio, decode_audio
 
 
-def compute_pitch_praat(audio: np.ndarray, sr: int, floor: float = 60.0, ceiling: float = 400.0):
+def voice_features_from_analysis(analysis: AcousticAnalysisResponse) -> VoiceFeatures:
     """
-    Use Praat via parselmouth to get pitch and derive jitter, shimmer, HNR.
+    Map canonical measurements onto ``VoiceFeatures``.
+    Without voiced frames pitch is 0.0, as before; other missing values are NaN.
     """
-    snd = parselmouth.Sound(audio, sampling_frequency=sr)
-
-    pitch = call(snd, "To Pitch", 0.0, floor, ceiling)
-    pitch_values = pitch.selected_array['frequency']
-    pitch_values = pitch_values[pitch_values > 0]  # remove unvoiced
-    if len(pitch_values) == 0:
-        mean_f0 = 0.0
-        f0_std = 0.0
-    else:
-        mean_f0 = float(np.mean(pitch_values))
-        f0_std = float(np.std(pitch_values))
-
-    # PointProcess for jitter/shimmer
-    point_process = call(snd, "To PointProcess (periodic, cc)", floor, ceiling)
+    values: Dict[str, Optional[float]] = {item.feature_id: item.value for item in analysis.features}
 
-    # Jitter (local)
-    jitter_local = call([snd, point_process], "Get jitter (local)", 0.0, 0.0, floor, ceiling, 1.3, 1.6)
+    def value(feature_id: str, missing: float = float("nan")) -> float:
+        found = values.get(feature_id)
+        return float(found) if found is not None else missing
 
-    # Shimmer (local)
-    shimmer_local = call([snd, point_process], "Get shimmer (local)", 0.0, 0.0, floor, ceiling, 1.3, 1.6, 1.6)
-
-    # Harmonicity (HNR)
-    harmonicity = call(snd, "To Harmonicity (cc)", 0.01, floor, 0.1, 1.0)
-    hnr = call(harmonicity, "Get mean", 0.0, 0.0)
-
-    return mean_f0, f0_std, jitter_local, shimmer_local, hnr
+    return VoiceFeatures(
+        mean_f0=value("voice.f0.mean", 0.0),
+        f0_std=value("voice.f0.sd", 0.0),
+        spectral_centroid=value("voice.spectral_centroid"),
+        jitter_local=value("voice.jitter.local"),
+        shimmer_local=value("voice.shimmer.local"),
+        hnr=value("voice.hnr.mean"),
+    )
 
 
-def extract_voice_features_from_file(path: str) -> VoiceFeatures:
+def extract_voice_features_from_file(
+    path: Union[str, Path],
+    capture_kind: CaptureKind = "sustained_vowel",
+) -> VoiceFeatures:
     """
-    High-level helper: given a .wav file path,
+    High-level helper: given an audio file path,
     return VoiceFeatures suitable for SoulScope.
+    Jitter and shimmer are only measured for sustained vowels. Files of any
+    length are analysed; the upload duration limits do not apply.
     """
-    audio, sr = load_audio_mono(path)
-
-    # Optional: trim leading/trailing silence
-    audio, _ = librosa.effects.trim(audio, top_db=30)
-
-    # Spectral centroid
-    spectral_centroid = compute_spectral_centroid(audio, sr)
-
-    # Pitch + jitter/shimmer/HNR via Praat
-    mean_f0, f0_std, jitter_local, shimmer_local, hnr = compute_pitch_praat(audio, sr)
-
-    return VoiceFeatures(
-        mean_f0=mean_f0,
-        f0_std=f0_std,
-        spectral_centroid=spectral_centroid,
-        jitter_local=jitter_local,
-        shimmer_local=shimmer_local,
-        hnr=hnr,
+    path = Path(path)
+    decoded = decode_audio(path)
+    analysis = analyze_canonical_audio(
+        decoded,
+        scan_id="local",
+        user_id="local",
+        source_capture_id=path.stem,
+        capture_kind=capture_kind,
+        original_content_type=mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+        storage_path=None,
+        device_metadata={},
     )
+    return voice_features_from_analysis(analysis)
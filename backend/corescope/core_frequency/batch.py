@@ -0,0 +1,281 @@
+# soulscope/core_frequency/batch.py
+"""Vectorized scoring for many sessions at once.
+
+Each ``*Batch`` input holds one NumPy column per feature field, with NaN for a
+field that is ``None`` on the scalar dataclass. The scorers mirror the branches
+of ``compute_body_resonance``, ``compute_soul_resonance``,
+``compute_heart_mind_resonance`` and ``score_core_frequency``, and they
+accumulate the weighted sums in the same order. Every score, meta value and
+label is therefore identical to the scalar path, not just close to it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Dict, Sequence, Type, TypeVar
+
+import numpy as np
+
+from .core_frequency import CORE_LABEL_FLOOR, CORE_LABELS, W_BODY, W_HEART_MIND, W_SOUL
+from .models import (
+    CoreFrequencyResult,
+    PhysioFeatures,
+    ReactivityMetrics,
+    ResonanceComponent,
+    VoiceFeatures,
+)
+from .ranges import DEFAULT_RANGES, NormalizationRanges
+
+
+B = TypeVar("B", bound="_FeatureBatch")
+
+
+@dataclass(frozen=True)
+class _FeatureBatch:
+    @classmethod
+    def from_records(cls: Type[B], records: Sequence[object]) -> B:
+        """Columns from a sequence of the matching scalar dataclass."""
+        columns = {
+            field.name: np.array(
+                [np.nan if getattr(record, field.name) is None else getattr(record, field.name) for record in records],
+                dtype=np.float64,
+            )
+            for field in fields(cls)
+        }
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return int(getattr(self, fields(self)[0].name).size)
+
+
+@dataclass(frozen=True)
+class PhysioFeatureBatch(_FeatureBatch):
+    hrv_rmssd: np.ndarray
+    lf_power: np.ndarray
+    hf_power: np.ndarray
+    lf_hf_ratio: np.ndarray
+    mean_hr: np.ndarray
+    eda_tonic_mean: np.ndarray
+    eda_phasic_peaks_per_min: np.ndarray
+    breath_rate_mean: np.ndarray
+
+
+@dataclass(frozen=True)
+class VoiceFeatureBatch(_FeatureBatch):
+    mean_f0: np.ndarray
+    f0_std: np.ndarray
+    spectral_centroid: np.ndarray
+    jitter_local: np.ndarray
+    shimmer_local: np.ndarray
+    hnr: np.ndarray
+
+
+@dataclass(frozen=True)
+class ReactivityBatch(_FeatureBatch):
+    baseline_hrv_rmssd: np.ndarray
+    challenge_hrv_rmssd: np.ndarray
+    baseline_eda_mean: np.ndarray
+    challenge_eda_mean: np.ndarray
+    baseline_breath_rate: np.ndarray
+    challenge_breath_rate: np.ndarray
+    recovery_index: np.ndarray
+
+
+@dataclass(frozen=True)
+class ResonanceBatch:
+    score: np.ndarray
+    meta: Dict[str, np.ndarray]
+
+    def component(self, index: int) -> ResonanceComponent:
+        return ResonanceComponent(
+            score=float(self.score[index]),
+            meta={name: float(values[index]) for name, values in self.meta.items()},
+        )
+
+
+@dataclass(frozen=True)
+class CoreFrequencyBatch:
+    core_index: np.ndarray
+    body_resonance: ResonanceBatch
+    soul_resonance: ResonanceBatch
+    heart_mind_resonance: ResonanceBatch
+    dominant_band_hz: np.ndarray
+    qualitative_label: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.core_index.size)
+
+    def result(self, index: int) -> CoreFrequencyResult:
+        return CoreFrequencyResult(
+            core_index=float(self.core_index[index]),
+            body_resonance=self.body_resonance.component(index),
+            soul_resonance=self.soul_resonance.component(index),
+            heart_mind_resonance=self.heart_mind_resonance.component(index),
+            dominant_band_hz=float(self.dominant_band_hz[index]),
+            qualitative_label=str(self.qualitative_label[index]),
+        )
+
+
+def normalize_array(values: np.ndarray, low: float, high: float, invert: bool = False) -> np.ndarray:
+    """
+    Vectorized ``normalize``. NaN maps like the scalar clamp does: to 1, or 0 inverted.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if high == low:
+        return np.full(values.shape, 0.5)
+    x = (values - low) / (high - low)
+    x = np.where(np.isnan(x), 1.0, np.clip(x, 0.0, 1.0))
+    return 1.0 - x if invert else x
+
+
+def _weighted_average(scores: Sequence[np.ndarray], weights: np.ndarray) -> np.ndarray:
+    # Same reduction as ``np.average(scores, weights=weights)`` on each row.
+    return np.average(np.column_stack(scores), axis=1, weights=weights)
+
+
+def compute_body_resonance_batch(features: PhysioFeatureBatch, ranges: NormalizationRanges = DEFAULT_RANGES) -> ResonanceBatch:
+    hrv_score = normalize_array(features.hrv_rmssd, *ranges["body.hrv_rmssd"], invert=False)
+
+    lf_hf_low, lf_hf_high = ranges["body.lf_hf_low"], ranges["body.lf_hf_high"]
+    lf_hf = np.where(np.isfinite(features.lf_hf_ratio), features.lf_hf_ratio, 10.0)
+    lf_hf_score = np.select(
+        [lf_hf <= 0, lf_hf < lf_hf_low[1], lf_hf <= lf_hf_high[0]],
+        [0.0, normalize_array(lf_hf, *lf_hf_low, invert=False), 1.0],
+        default=normalize_array(lf_hf, *lf_hf_high, invert=True),
+    )
+
+    hr_score = normalize_array(features.mean_hr, *ranges["body.mean_hr"], invert=True)
+
+    eda_tonic = features.eda_tonic_mean
+    eda_score = np.where(np.isnan(eda_tonic), 0.5, normalize_array(eda_tonic, *ranges["body.eda_tonic"], invert=True))
+
+    body_score = _weighted_average([hrv_score, lf_hf_score, hr_score, eda_score], np.array([0.4, 0.2, 0.2, 0.2]))
+    return ResonanceBatch(
+        score=body_score,
+        meta={
+            "hrv_score": hrv_score,
+            "lf_hf_score": lf_hf_score,
+            "hr_score": hr_score,
+            "eda_score": eda_score,
+        },
+    )
+
+
+def compute_soul_resonance_batch(v: VoiceFeatureBatch, ranges: NormalizationRanges = DEFAULT_RANGES) -> ResonanceBatch:
+    hnr_score = normalize_array(v.hnr, *ranges["soul.hnr"], invert=False)
+    jitter_score = normalize_array(v.jitter_local, *ranges["soul.jitter"], invert=True)
+    shimmer_score = normalize_array(v.shimmer_local, *ranges["soul.shimmer"], invert=True)
+
+    f0_std_low, f0_std_high = ranges["soul.f0_std_low"], ranges["soul.f0_std_high"]
+    pitch_var_score = np.select(
+        [v.f0_std < f0_std_low[1], v.f0_std <= f0_std_high[0]],
+        [normalize_array(v.f0_std, *f0_std_low, invert=False), 1.0],
+        default=normalize_array(v.f0_std, *f0_std_high, invert=True),
+    )
+    centroid_low, centroid_high = ranges["soul.centroid_low"], ranges["soul.centroid_high"]
+    bright_score = np.select(
+        [v.spectral_centroid < centroid_low[1], v.spectral_centroid <= centroid_high[0]],
+        [normalize_array(v.spectral_centroid, *centroid_low, invert=False), 1.0],
+        default=normalize_array(v.spectral_centroid, *centroid_high, invert=True),
+    )
+
+    weights = [0.35, 0.2, 0.2, 0.15, 0.1]
+    scores = [hnr_score, jitter_score, shimmer_score, pitch_var_score, bright_score]
+    # Left-to-right accumulation, as the builtin ``sum`` does in the scalar path.
+    soul_score = np.zeros(len(v))
+    for w, s in zip(weights, scores):
+        soul_score = soul_score + w * s
+
+    return ResonanceBatch(
+        score=soul_score,
+        meta={
+            "hnr_score": hnr_score,
+            "jitter_score": jitter_score,
+            "shimmer_score": shimmer_score,
+            "pitch_var_score": pitch_var_score,
+            "bright_score": bright_score,
+        },
+    )
+
+
+def compute_heart_mind_resonance_batch(r: ReactivityBatch, ranges: NormalizationRanges = DEFAULT_RANGES) -> ResonanceBatch:
+    hrv_drop = r.baseline_hrv_rmssd - r.challenge_hrv_rmssd
+    hrv_reactivity_score = np.where(hrv_drop <= 0, 1.0, normalize_array(hrv_drop, *ranges["heart_mind.hrv_drop"], invert=True))
+
+    eda_delta = r.challenge_eda_mean - r.baseline_eda_mean
+    eda_reactivity_score = np.select(
+        [np.isnan(r.baseline_eda_mean) | np.isnan(r.challenge_eda_mean), eda_delta < 0],
+        [0.5, 1.0],
+        default=normalize_array(eda_delta, *ranges["heart_mind.eda_delta"], invert=True),
+    )
+
+    br_delta = r.challenge_breath_rate - r.baseline_breath_rate
+    breath_reactivity_score = np.select(
+        [np.isnan(r.baseline_breath_rate) | np.isnan(r.challenge_breath_rate), br_delta <= 0],
+        [0.5, 1.0],
+        default=normalize_array(br_delta, *ranges["heart_mind.breath_delta"], invert=True),
+    )
+
+    recovery_score = np.where(np.isnan(r.recovery_index), 0.5, r.recovery_index)
+
+    hm_score = _weighted_average(
+        [hrv_reactivity_score, eda_reactivity_score, breath_reactivity_score, recovery_score],
+        np.array([0.35, 0.25, 0.15, 0.25]),
+    )
+    return ResonanceBatch(
+        score=hm_score,
+        meta={
+            "hrv_reactivity_score": hrv_reactivity_score,
+            "eda_reactivity_score": eda_reactivity_score,
+            "breath_reactivity_score": breath_reactivity_score,
+            "recovery_score": recovery_score,
+        },
+    )
+
+
+def score_core_frequency_batch(
+    physio_features: PhysioFeatureBatch,
+    voice_features: VoiceFeatureBatch,
+    reactivity: ReactivityBatch,
+    ranges: NormalizationRanges = DEFAULT_RANGES,
+) -> CoreFrequencyBatch:
+    """
+    Vectorized ``score_core_frequency`` over N sessions of extracted features.
+    """
+    if not len(physio_features) == len(voice_features) == len(reactivity):
+        raise ValueError("batch_length_mismatch")
+
+    body_res = compute_body_resonance_batch(physio_features, ranges)
+    soul_res = compute_soul_resonance_batch(voice_features, ranges)
+    hm_res = compute_heart_mind_resonance_batch(reactivity, ranges)
+
+    core_index = W_BODY * body_res.score + W_SOUL * soul_res.score + W_HEART_MIND * hm_res.score
+    dominant_band_hz = 100.0 + core_index * (800.0 - 100.0)
+    label = np.select(
+        [core_index >= threshold for threshold, _ in CORE_LABELS],
+        [candidate for _, candidate in CORE_LABELS],
+        default=CORE_LABEL_FLOOR,
+    )
+
+    return CoreFrequencyBatch(
+        core_index=core_index,
+        body_resonance=body_res,
+        soul_resonance=soul_res,
+        heart_mind_resonance=hm_res,
+        dominant_band_hz=dominant_band_hz,
+        qualitative_label=label.astype(object),
+    )
+
+
+__all__ = [
+    "CoreFrequencyBatch",
+    "PhysioFeatureBatch",
+    "ReactivityBatch",
+    "ResonanceBatch",
+    "VoiceFeatureBatch",
+    "compute_body_resonance_batch",
+    "compute_heart_mind_resonance_batch",
+    "compute_soul_resonance_batch",
+    "normalize_array",
+    "score_core_frequency_batch",
+]
@@ -1,9 +1,21 @@
 
 # soulscope/core_frequency/body_resonance.py
 
+from functools import lru_cache
+from typing import Literal, Tuple
+
 import numpy as np
-from typing import Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
 from .models import PhysioTimeSeries, PhysioFeatures, ResonanceComponent
+from .ranges import DEFAULT_RANGES, NormalizationRanges
+
+
+HrvSpectralMethod = Literal["fft", "welch", "lomb"]
+LF_BAND_HZ = (0.04, 0.15)
+HF_BAND_HZ = (0.15, 0.40)
+WELCH_SEGMENT_SECONDS = 60.0
+LOMB_STEP_HZ = 0.002
 
 
 def compute_hrv_rmssd(rr_intervals_ms: np.ndarray) -> float:
@@ -11,15 +23,36 @@ def compute_hrv_rmssd(rr_intervals_ms: np.ndarray) -> float:
     return np.sqrt(np.mean(diffs ** 2))
 
 
-def estimate_lf_hf(rr_intervals_ms: np.ndarray, fs: float = 4.0) -> Tuple[float, float, float]:
-    """
-    Very rough LF/HF estimation from RR intervals.
-    In production, use a proper HRV library (e.g. neurokit2).
-    """
+def _band_powers(freqs: np.ndarray, psd: np.ndarray, df: float = 1.0) -> Tuple[float, float, float]:
+    lf_mask = (freqs >= LF_BAND_HZ[0]) & (freqs < LF_BAND_HZ[1])
+    hf_mask = (freqs >= HF_BAND_HZ[0]) & (freqs < HF_BAND_HZ[1])
+    lf_power = psd[lf_mask].sum() * df
+    hf_power = psd[hf_mask].sum() * df
+    lf_hf_ratio = lf_power / hf_power if hf_power > 0 else np.inf
+    return lf_power, hf_power, lf_hf_ratio
+
+
+def _resampled_rr(rr_intervals_ms: np.ndarray, fs: float) -> np.ndarray:
     # Interpolate RR to evenly sampled signal
+    if rr_intervals_ms.size < 2:
+        return np.empty(0)
     t = np.cumsum(rr_intervals_ms) / 1000.0
     t_resampled = np.arange(t[0], t[-1], 1.0/fs)
-    rr_interp = np.interp(t_resampled, t, rr_intervals_ms)
+    return np.interp(t_resampled, t, rr_intervals_ms)
+
+
+@lru_cache(maxsize=32)
+def _hann_window(length: int) -> Tuple[np.ndarray, float]:
+    """Periodic Hann window and its power, shared by every call of that length."""
+    window = np.hanning(length + 1)[:-1]
+    window.setflags(write=False)
+    return window, float(np.sum(window ** 2))
+
+
+def _fft_lf_hf(rr_intervals_ms: np.ndarray, fs: float) -> Tuple[float, float, float]:
+    rr_interp = _resampled_rr(rr_intervals_ms, fs)
+    if rr_interp.size < 2:
+        return _band_powers(np.empty(0), np.empty(0))
 
     # Remove mean
     rr_detrended = rr_interp - np.mean(rr_interp)
@@ -27,22 +60,80 @@ def estimate_lf_hf(rr_intervals_ms: np.ndarray, fs: float = 4.0) -> Tuple[float,
     # FFT
     freqs = np.fft.rfftfreq(len(rr_detrended), d=1.0/fs)
     psd = np.abs(np.fft.rfft(rr_detrended)) ** 2
+    return _band_powers(freqs, psd)
 
-    # LF: 0.04–0.15 Hz, HF: 0.15–0.4 Hz
-    lf_mask = (freqs >= 0.04) & (freqs < 0.15)
-    hf_mask = (freqs >= 0.15) & (freqs < 0.40)
 
-    lf_power = psd[lf_mask].sum()
-    hf_power = psd[hf_mask].sum()
-    lf_hf_ratio = lf_power / hf_power if hf_power > 0 else np.inf
+def _welch_psd(series: np.ndarray, fs: float) -> Tuple[np.ndarray, np.ndarray]:
+    # Half-overlapping Hann segments as strided views; series shorter than one
+    # segment fall back to a single windowed periodogram.
+    length = min(series.size, int(WELCH_SEGMENT_SECONDS * fs))
+    segments = sliding_window_view(series, length)[:: max(1, length // 2)]
+    window, window_power = _hann_window(length)
+    detrended = segments - segments.mean(axis=1, keepdims=True)
+    psd = np.mean(np.abs(np.fft.rfft(detrended * window, axis=1)) ** 2, axis=0) / (fs * window_power)
+    # One-sided density: DC and, for even lengths, the Nyquist bin have no mirror.
+    psd[1 : -1 if length % 2 == 0 else None] *= 2.0
+    return np.fft.rfftfreq(length, d=1.0/fs), psd
 
-    return lf_power, hf_power, lf_hf_ratio
+
+def _welch_lf_hf(rr_intervals_ms: np.ndarray, fs: float) -> Tuple[float, float, float]:
+    rr_interp = _resampled_rr(rr_intervals_ms, fs)
+    if rr_interp.size < 2:
+        return _band_powers(np.empty(0), np.empty(0))
+    freqs, psd = _welch_psd(rr_interp, fs)
+    return _band_powers(freqs, psd, df=freqs[1])
+
+
+def _lomb_lf_hf(rr_intervals_ms: np.ndarray) -> Tuple[float, float, float]:
+    # SciPy is only loaded for this method; importing it costs the app's cold start.
+    from scipy.signal import lombscargle
+
+    # Beat times are uneven; Lomb-Scargle evaluates them directly.
+    t = np.cumsum(rr_intervals_ms) / 1000.0
+    duration = t[-1] - t[0] if t.size else 0.0
+    if duration * HF_BAND_HZ[1] < 1.0:
+        # Too short to resolve either band, like the resampled methods whose
+        # first frequency bin then lies above HF.
+        return _band_powers(np.empty(0), np.empty(0))
+    # The grid must resolve 1/duration or narrow peaks are over-integrated.
+    step = min(LOMB_STEP_HZ, 1.0 / duration)
+    freqs = np.arange(LF_BAND_HZ[0], HF_BAND_HZ[1], step)
+    periodogram = lombscargle(t, rr_intervals_ms - np.mean(rr_intervals_ms), 2 * np.pi * freqs)
+    psd = 2.0 * periodogram * duration / rr_intervals_ms.size  # ms^2/Hz
+    return _band_powers(freqs, psd, df=step)
+
+
+def estimate_lf_hf(
+    rr_intervals_ms: np.ndarray,
+    fs: float = 4.0,
+    method: HrvSpectralMethod = "fft",
+) -> Tuple[float, float, float]:
+    """
+    LF/HF estimation from RR intervals.
+
+    ``fft`` is the original single unwindowed periodogram of the 4 Hz
+    resampled series (unnormalised powers). ``welch`` averages Hann-windowed
+    60 s segments and is the fastest on long recordings. ``lomb`` runs
+    Lomb-Scargle on the uneven beat times without interpolation, so HF power
+    is not smoothed away by resampling. Both return band powers in ms^2; the
+    ratio is comparable across all three methods. Every method returns zero
+    powers (ratio ``inf``) for series too short to resolve the bands (fewer
+    than two samples, or under 2.5 s).
+    """
+    rr_intervals_ms = np.asarray(rr_intervals_ms, dtype=float)
+    if method == "fft":
+        return _fft_lf_hf(rr_intervals_ms, fs)
+    if method == "welch":
+        return _welch_lf_hf(rr_intervals_ms, fs)
+    if method == "lomb":
+        return _lomb_lf_hf(rr_intervals_ms)
+    raise ValueError(f"Unknown HRV spectral method: {method}")
 
 
-def extract_physio_features(ts: PhysioTimeSeries) -> PhysioFeatures:
+def extract_physio_features(ts: PhysioTimeSeries, lf_hf_method: HrvSpectralMethod = "fft") -> PhysioFeatures:
     rr = ts.rr_intervals
     hrv_rmssd = compute_hrv_rmssd(rr)
-    lf_power, hf_power, lf_hf_ratio = estimate_lf_hf(rr)
+    lf_power, hf_power, lf_hf_ratio = estimate_lf_hf(rr, method=lf_hf_method)
     mean_rr = np.mean(rr)
     mean_hr = 60000.0 / mean_rr  # bpm
 
@@ -83,35 +174,36 @@ def normalize(value: float, low: float, high: float, invert: bool = False) -> fl
     return 1.0 - x if invert else x
 
 
-def compute_body_resonance(features: PhysioFeatures) -> ResonanceComponent:
+def compute_body_resonance(features: PhysioFeatures, ranges: NormalizationRanges = DEFAULT_RANGES) -> ResonanceComponent:
     """
     Combine HRV, LF/HF, heart rate, EDA into a 0–1 resonance score.
     Higher = more regulated, coherent.
-    Ranges below are heuristic, you’ll calibrate on real data.
+    Default ranges are heuristic; see ``calibration`` for cohort-derived ones.
     """
 
     # HRV: higher is better. Typical RMSSD: 10–80+ ms
-    hrv_score = normalize(features.hrv_rmssd, low=10, high=80, invert=False)
+    hrv_score = normalize(features.hrv_rmssd, *ranges["body.hrv_rmssd"], invert=False)
 
     # LF/HF: mid-range often considered balanced, extreme ratios less so.
     # We'll treat 0.5–3 as "good", beyond that lower score.
+    lf_hf_low, lf_hf_high = ranges["body.lf_hf_low"], ranges["body.lf_hf_high"]
     lf_hf = features.lf_hf_ratio if np.isfinite(features.lf_hf_ratio) else 10.0
     if lf_hf <= 0:
         lf_hf_score = 0.0
-    elif lf_hf < 0.5:
-        lf_hf_score = normalize(lf_hf, low=0.1, high=0.5, invert=False)
-    elif lf_hf <= 3.0:
+    elif lf_hf < lf_hf_low[1]:
+        lf_hf_score = normalize(lf_hf, *lf_hf_low, invert=False)
+    elif lf_hf <= lf_hf_high[0]:
         lf_hf_score = 1.0
     else:
-        lf_hf_score = normalize(lf_hf, low=3.0, high=8.0, invert=True)
+        lf_hf_score = normalize(lf_hf, *lf_hf_high, invert=True)
 
     # Mean heart rate: moderate is better at rest (55–85 bpm)
-    hr_score = normalize(features.mean_hr, low=55, high=85, invert=True)
+    hr_score = normalize(features.mean_hr, *ranges["body.mean_hr"], invert=True)
 
     # EDA tonic: lower baseline suggests less chronic arousal (rough)
     eda_score = 0.5
     if features.eda_tonic_mean is not None:
-        eda_score = normalize(features.eda_tonic_mean, low=2.0, high=15.0, invert=True)
+        eda_score = normalize(features.eda_tonic_mean, *ranges["body.eda_tonic"], invert=True)
 
     # Combine with weights
     weights = np.array([0.4, 0.2, 0.2, 0.2])
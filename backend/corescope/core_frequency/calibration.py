@@ -0,0 +1,350 @@
+# soulscope/core_frequency/calibration.py
+"""
+Cohort calibration of the resonance normalization ranges.
+
+Measurements stream into one KLL quantile sketch (Karnin, Lang & Liberty,
+2016) per capture kind and feature. A sketch keeps O(k log(n/k)) values
+whatever the stream length, two sketches merge into one over both streams,
+and rank error is about 1.7/k (~1% at the default k=200). Backfill output is
+read one analysis at a time and fed in fixed-size chunks, so calibrating over
+millions of measurements never holds them all in memory. ``regenerate_ranges``
+turns the sketches into a ``ranges`` mapping via ``CALIBRATION_SPECS``.
+
+Acoustic features are keyed by capture kind. Physio and reactivity values are
+keyed under the pseudo-kinds ``"physio"`` and ``"reactivity"`` and come from
+scan sessions through ``ingest_physio_sessions``, one value per session.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Literal, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import PhysioFeatures, ReactivityMetrics
+from .ranges import DEFAULT_RANGES, NormalizationRanges, Range
+
+
+DEFAULT_K = 200
+# Sketches with fewer values than this leave their range at its default.
+MIN_CALIBRATION_COUNT = 100
+INGEST_CHUNK = 4096
+
+_SKETCH_HEADER = struct.Struct("<4sIQddI")
+_SKETCH_MAGIC = b"KLL1"
+_SET_HEADER = struct.Struct("<4sI")
+_SET_MAGIC = b"CAL1"
+_LENGTH = struct.Struct("<I")
+
+
+class KllSketch:
+    """Mergeable quantile sketch; values at level ``h`` stand for ``2**h`` inputs."""
+
+    def __init__(self, k: int = DEFAULT_K) -> None:
+        if k < 8:
+            raise ValueError("sketch_k_too_small")
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(0)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self) -> None:
+        while sum(level.size for level in self._levels) > sum(self._capacity(h) for h in range(len(self._levels))):
+            height = next(h for h, level in enumerate(self._levels) if level.size > self._capacity(h))
+            if height + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            ordered = np.sort(self._levels[height])
+            # An odd item stays behind; the rest halve into the next level.
+            keep, pairs = ordered[: ordered.size % 2], ordered[ordered.size % 2 :]
+            promoted = pairs[int(self._rng.integers(2)) :: 2]
+            self._levels[height] = keep
+            self._levels[height + 1] = np.concatenate([self._levels[height + 1], promoted])
+
+    def update(self, values: Iterable[float]) -> "KllSketch":
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if values.size:
+            self.n += values.size
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._levels[0] = np.concatenate([self._levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: "KllSketch") -> "KllSketch":
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for height, level in enumerate(other._levels):
+            self._levels[height] = np.concatenate([self._levels[height], level])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Values at ranks ``qs`` (0–1); q=0 and q=1 are the exact extremes."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(level.size, 2.0**height) for height, level in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        index = np.minimum(np.searchsorted(cumulative, qs * cumulative[-1], side="left"), items.size - 1)
+        return np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, items[index]))
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def to_bytes(self) -> bytes:
+        sizes = b"".join(_LENGTH.pack(level.size) for level in self._levels)
+        payload = np.concatenate(self._levels).astype("<f8").tobytes()
+        return _SKETCH_HEADER.pack(_SKETCH_MAGIC, self.k, self.n, self.min, self.max, len(self._levels)) + sizes + payload
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KllSketch":
+        magic, k, n, low, high, count = _SKETCH_HEADER.unpack_from(data)
+        if magic != _SKETCH_MAGIC:
+            raise ValueError("invalid_kll_sketch")
+        offset = _SKETCH_HEADER.size
+        sizes = [_LENGTH.unpack_from(data, offset + index * _LENGTH.size)[0] for index in range(count)]
+        values = np.frombuffer(data, dtype="<f8", count=sum(sizes), offset=offset + count * _LENGTH.size).astype(np.float64)
+        sketch = cls(k)
+        sketch.n, sketch.min, sketch.max = n, low, high
+        sketch._levels = list(np.split(values, np.cumsum(sizes)[:-1])) if sizes else [np.empty(0)]
+        sketch._rng = np.random.default_rng(n)
+        return sketch
+
+
+SketchKey = Tuple[str, str]
+
+
+class CalibrationSketches:
+    """One ``KllSketch`` per (capture kind, feature id)."""
+
+    def __init__(self, k: int = DEFAULT_K) -> None:
+        self.k = k
+        self._sketches: Dict[SketchKey, KllSketch] = {}
+
+    def __len__(self) -> int:
+        return len(self._sketches)
+
+    def keys(self) -> List[SketchKey]:
+        return sorted(self._sketches)
+
+    def sketch(self, capture_kind: str, feature_id: str) -> Optional[KllSketch]:
+        return self._sketches.get((capture_kind, feature_id))
+
+    def add(self, capture_kind: str, feature_id: str, values: Iterable[float]) -> None:
+        key = (capture_kind, feature_id)
+        if key not in self._sketches:
+            self._sketches[key] = KllSketch(self.k)
+        self._sketches[key].update(values)
+
+    def add_values(self, capture_kind: str, values: Mapping[str, Optional[float]]) -> None:
+        for feature_id, value in values.items():
+            if value is not None:
+                self.add(capture_kind, feature_id, [value])
+
+    def merge(self, other: "CalibrationSketches") -> "CalibrationSketches":
+        for key, sketch in other._sketches.items():
+            if key in self._sketches:
+                self._sketches[key].merge(sketch)
+            else:
+                self._sketches[key] = KllSketch.from_bytes(sketch.to_bytes())
+        return self
+
+    def to_bytes(self) -> bytes:
+        parts = [_SET_HEADER.pack(_SET_MAGIC, len(self._sketches))]
+        for (capture_kind, feature_id), sketch in sorted(self._sketches.items()):
+            for blob in (f"{capture_kind}\t{feature_id}".encode("utf-8"), sketch.to_bytes()):
+                parts.extend((_LENGTH.pack(len(blob)), blob))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CalibrationSketches":
+        magic, count = _SET_HEADER.unpack_from(data)
+        if magic != _SET_MAGIC:
+            raise ValueError("invalid_calibration_sketches")
+        offset = _SET_HEADER.size
+        blobs = []
+        for _ in range(count * 2):
+            (size,) = _LENGTH.unpack_from(data, offset)
+            blobs.append(data[offset + _LENGTH.size : offset + _LENGTH.size + size])
+            offset += _LENGTH.size + size
+        sketches = cls()
+        for name, blob in zip(blobs[::2], blobs[1::2]):
+            capture_kind, feature_id = name.decode("utf-8").split("\t", 1)
+            sketches._sketches[(capture_kind, feature_id)] = KllSketch.from_bytes(blob)
+        sketches.k = next(iter(sketches._sketches.values())).k if sketches._sketches else DEFAULT_K
+        return sketches
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_name(f"{path.name}.tmp")
+        staging.write_bytes(self.to_bytes())
+        os.replace(staging, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "CalibrationSketches":
+        return cls.from_bytes(path.read_bytes())
+
+
+def physio_calibration_values(features: PhysioFeatures) -> Dict[str, Optional[float]]:
+    return {
+        "physio.hrv_rmssd": features.hrv_rmssd,
+        "physio.lf_hf_ratio": features.lf_hf_ratio,
+        "physio.mean_hr": features.mean_hr,
+        "physio.eda_tonic_mean": features.eda_tonic_mean,
+    }
+
+
+def reactivity_calibration_values(r: ReactivityMetrics) -> Dict[str, Optional[float]]:
+    def delta(baseline: Optional[float], challenge: Optional[float]) -> Optional[float]:
+        return None if baseline is None or challenge is None else challenge - baseline
+
+    return {
+        "reactivity.hrv_drop": r.baseline_hrv_rmssd - r.challenge_hrv_rmssd,
+        "reactivity.eda_delta": delta(r.baseline_eda_mean, r.challenge_eda_mean),
+        "reactivity.breath_delta": delta(r.baseline_breath_rate, r.challenge_breath_rate),
+    }
+
+
+def _backfill_measurements(path: Path, output_format: Literal["jsonl", "parquet"]) -> Iterator[Tuple[str, str, float]]:
+    """(capture kind, feature id, value) of every available measurement, streamed."""
+    if output_format == "jsonl":
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                row = json.loads(line)
+                if row.get("status") != "ok":
+                    continue
+                for item in row["response"]["features"]:
+                    if item["value"] is not None and item["rejection_reason"] is None:
+                        yield row["capture_kind"], item["feature_id"], item["value"]
+        return
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("parquet input requires pyarrow; use jsonl or install pyarrow") from exc
+    for part in sorted(path.glob("part-*.parquet")):
+        for batch in pq.ParquetFile(part).iter_batches(columns=["capture_kind", "feature_id", "value", "rejection_reason"]):
+            columns = batch.to_pydict()
+            for capture_kind, feature_id, value, rejection in zip(
+                columns["capture_kind"], columns["feature_id"], columns["value"], columns["rejection_reason"]
+            ):
+                if value is not None and rejection is None:
+                    yield capture_kind, feature_id, value
+
+
+def ingest_backfill_output(
+    path: Path,
+    *,
+    output_format: Literal["jsonl", "parquet"] = "jsonl",
+    sketches: Optional[CalibrationSketches] = None,
+    chunk: int = INGEST_CHUNK,
+) -> CalibrationSketches:
+    """Stream a backfill output into sketches; memory is bounded by ``chunk`` per feature."""
+    sketches = sketches if sketches is not None else CalibrationSketches()
+    pending: Dict[SketchKey, List[float]] = {}
+    for capture_kind, feature_id, value in _backfill_measurements(path, output_format):
+        values = pending.setdefault((capture_kind, feature_id), [])
+        values.append(value)
+        if len(values) >= chunk:
+            sketches.add(capture_kind, feature_id, values)
+            values.clear()
+    for (capture_kind, feature_id), values in pending.items():
+        if values:
+            sketches.add(capture_kind, feature_id, values)
+    return sketches
+
+
+def ingest_physio_sessions(
+    sessions: Iterable[Tuple[PhysioFeatures, Optional[ReactivityMetrics]]],
+    *,
+    sketches: Optional[CalibrationSketches] = None,
+) -> CalibrationSketches:
+    """Add each session's physio features and, when it has them, its reactivity metrics."""
+    sketches = sketches if sketches is not None else CalibrationSketches()
+    for features, reactivity in sessions:
+        sketches.add_values("physio", physio_calibration_values(features))
+        if reactivity is not None:
+            sketches.add_values("reactivity", reactivity_calibration_values(reactivity))
+    return sketches
+
+
+@dataclass(frozen=True)
+class CalibrationSpec:
+    capture_kind: str
+    feature_id: str
+    low_percentile: float
+    high_percentile: float
+
+
+# Single ranges span the central 80%. Split ranges put their plateau between
+# the 10th and 90th percentiles and their tails out to the 1st and 99th.
+CALIBRATION_SPECS: Dict[str, CalibrationSpec] = {
+    "body.hrv_rmssd": CalibrationSpec("physio", "physio.hrv_rmssd", 10, 90),
+    "body.lf_hf_low": CalibrationSpec("physio", "physio.lf_hf_ratio", 1, 10),
+    "body.lf_hf_high": CalibrationSpec("physio", "physio.lf_hf_ratio", 90, 99),
+    "body.mean_hr": CalibrationSpec("physio", "physio.mean_hr", 10, 90),
+    "body.eda_tonic": CalibrationSpec("physio", "physio.eda_tonic_mean", 10, 90),
+    "soul.hnr": CalibrationSpec("sustained_vowel", "voice.hnr.mean", 10, 90),
+    "soul.jitter": CalibrationSpec("sustained_vowel", "voice.jitter.local", 10, 90),
+    "soul.shimmer": CalibrationSpec("sustained_vowel", "voice.shimmer.local", 10, 90),
+    "soul.f0_std_low": CalibrationSpec("sustained_vowel", "voice.f0.sd", 1, 10),
+    "soul.f0_std_high": CalibrationSpec("sustained_vowel", "voice.f0.sd", 90, 99),
+    "soul.centroid_low": CalibrationSpec("sustained_vowel", "voice.spectral_centroid", 1, 10),
+    "soul.centroid_high": CalibrationSpec("sustained_vowel", "voice.spectral_centroid", 90, 99),
+    "heart_mind.hrv_drop": CalibrationSpec("reactivity", "reactivity.hrv_drop", 10, 90),
+    "heart_mind.eda_delta": CalibrationSpec("reactivity", "reactivity.eda_delta", 10, 90),
+    "heart_mind.breath_delta": CalibrationSpec("reactivity", "reactivity.breath_delta", 10, 90),
+}
+
+
+def regenerate_ranges(
+    sketches: CalibrationSketches,
+    specs: Mapping[str, CalibrationSpec] = CALIBRATION_SPECS,
+    base: NormalizationRanges = DEFAULT_RANGES,
+    min_count: int = MIN_CALIBRATION_COUNT,
+) -> Dict[str, Range]:
+    """``base`` with every range whose sketch holds at least ``min_count`` values replaced."""
+    ranges = dict(base)
+    for name, spec in specs.items():
+        sketch = sketches.sketch(spec.capture_kind, spec.feature_id)
+        if sketch is None or sketch.n < min_count:
+            continue
+        low, high = sketch.quantiles([spec.low_percentile / 100, spec.high_percentile / 100])
+        if high > low:
+            ranges[name] = (float(low), float(high))
+    return ranges
+
+
+__all__ = [
+    "CALIBRATION_SPECS",
+    "CalibrationSketches",
+    "CalibrationSpec",
+    "DEFAULT_K",
+    "KllSketch",
+    "MIN_CALIBRATION_COUNT",
+    "ingest_backfill_output",
+    "ingest_physio_sessions",
+    "physio_calibration_values",
+    "reactivity_calibration_values",
+    "regenerate_ranges",
+]
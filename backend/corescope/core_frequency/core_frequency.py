@@ -12,46 +12,66 @@ from .models import (
 from .body_resonance import extract_physio_features, compute_body_resonance
 from .voice_resonance import compute_soul_resonance
 from .reactivity_resonance import compute_heart_mind_resonance
+from .ranges import DEFAULT_RANGES, NormalizationRanges
+
+
+# Simple weighted fusion: you can later replace with PCA or ML model.
+W_BODY = 0.4
+W_SOUL = 0.3
+W_HEART_MIND = 0.3
+
+# Crude qualitative labels for UX, checked from the highest threshold down.
+CORE_LABELS = (
+    (0.75, "Coherent / Regenerating"),
+    (0.5, "Adaptive but Strained"),
+    (0.3, "Fragmented / Overloaded"),
+)
+CORE_LABEL_FLOOR = "Collapsed / Survival Mode"
 
 
 def fuse_core_frequency(
     physio_ts: PhysioTimeSeries,
     voice_features: VoiceFeatures,
     reactivity: ReactivityMetrics,
+    ranges: NormalizationRanges = DEFAULT_RANGES,
 ) -> CoreFrequencyResult:
     """
     Main entrypoint: take raw-ish inputs, return fused core frequency.
     """
 
     physio_features: PhysioFeatures = extract_physio_features(physio_ts)
-    body_res: ResonanceComponent = compute_body_resonance(physio_features)
-    soul_res: ResonanceComponent = compute_soul_resonance(voice_features)
-    hm_res: ResonanceComponent = compute_heart_mind_resonance(reactivity)
+    return score_core_frequency(physio_features, voice_features, reactivity, ranges)
+
 
-    # Simple weighted fusion: you can later replace with PCA or ML model.
-    w_body = 0.4
-    w_soul = 0.3
-    w_hm = 0.3
+def score_core_frequency(
+    physio_features: PhysioFeatures,
+    voice_features: VoiceFeatures,
+    reactivity: ReactivityMetrics,
+    ranges: NormalizationRanges = DEFAULT_RANGES,
+) -> CoreFrequencyResult:
+    """
+    Fuse already-extracted features; ``batch.score_core_frequency_batch`` is
+    the vectorized equivalent for whole cohorts.
+    """
+    body_res: ResonanceComponent = compute_body_resonance(physio_features, ranges)
+    soul_res: ResonanceComponent = compute_soul_resonance(voice_features, ranges)
+    hm_res: ResonanceComponent = compute_heart_mind_resonance(reactivity, ranges)
 
     core_index = (
-        w_body * body_res.score
-        + w_soul * soul_res.score
-        + w_hm * hm_res.score
+        W_BODY * body_res.score
+        + W_SOUL * soul_res.score
+        + W_HEART_MIND * hm_res.score
     )
 
     # You can map this to a "dominant band" for sound design
     # Example: 0–1 mapped to 100–800 Hz
     dominant_band_hz = 100.0 + core_index * (800.0 - 100.0)
 
-    # Crude qualitative label for UX
-    if core_index >= 0.75:
-        label = "Coherent / Regenerating"
-    elif core_index >= 0.5:
-        label = "Adaptive but Strained"
-    elif core_index >= 0.3:
-        label = "Fragmented / Overloaded"
-    else:
-        label = "Collapsed / Survival Mode"
+    label = CORE_LABEL_FLOOR
+    for threshold, candidate in CORE_LABELS:
+        if core_index >= threshold:
+            label = candidate
+            break
 
     return CoreFrequencyResult(
         core_index=core_index,
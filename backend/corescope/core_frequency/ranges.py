@@ -0,0 +1,41 @@
+# soulscope/core_frequency/ranges.py
+"""
+Normalization ranges for the resonance scores, by name.
+
+``DEFAULT_RANGES`` holds the original heuristic ranges. Split ranges
+(``*_low``/``*_high``) bound a plateau that scores 1.0: the low range ends
+where the plateau starts and the high range starts where it ends.
+``calibration.regenerate_ranges`` derives a replacement mapping from cohort
+percentiles. Every scorer takes it as ``ranges``.
+"""
+
+from typing import Dict, Mapping, Tuple
+
+
+Range = Tuple[float, float]
+NormalizationRanges = Mapping[str, Range]
+
+DEFAULT_RANGES: Dict[str, Range] = {
+    # Body: HRV RMSSD (ms), LF/HF plateau 0.5–3, resting HR (bpm), tonic EDA (µS).
+    "body.hrv_rmssd": (10.0, 80.0),
+    "body.lf_hf_low": (0.1, 0.5),
+    "body.lf_hf_high": (3.0, 8.0),
+    "body.mean_hr": (55.0, 85.0),
+    "body.eda_tonic": (2.0, 15.0),
+    # Soul: HNR (dB), jitter/shimmer (fraction), F0 SD plateau 10–80 Hz,
+    # spectral centroid plateau 1500–3500 Hz.
+    "soul.hnr": (5.0, 25.0),
+    "soul.jitter": (0.0, 0.01),
+    "soul.shimmer": (0.0, 0.1),
+    "soul.f0_std_low": (0.0, 10.0),
+    "soul.f0_std_high": (80.0, 200.0),
+    "soul.centroid_low": (500.0, 1500.0),
+    "soul.centroid_high": (3500.0, 6000.0),
+    # Heart–mind: rises from baseline to challenge.
+    "heart_mind.hrv_drop": (0.0, 30.0),
+    "heart_mind.eda_delta": (0.0, 5.0),
+    "heart_mind.breath_delta": (0.0, 8.0),
+}
+
+
+__all__ = ["DEFAULT_RANGES", "NormalizationRanges", "Range"]
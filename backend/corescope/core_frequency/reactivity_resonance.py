@@ -4,9 +4,10 @@
 import numpy as np
 from .models import ReactivityMetrics, ResonanceComponent
 from .body_resonance import normalize
+from .ranges import DEFAULT_RANGES, NormalizationRanges
 
 
-def compute_heart_mind_resonance(r: ReactivityMetrics) -> ResonanceComponent:
+def compute_heart_mind_resonance(r: ReactivityMetrics, ranges: NormalizationRanges = DEFAULT_RANGES) -> ResonanceComponent:
     """
     Higher = healthier reactivity + recovery.
     """
@@ -17,7 +18,7 @@ def compute_heart_mind_resonance(r: ReactivityMetrics) -> ResonanceComponent:
     if hrv_drop <= 0:
         hrv_reactivity_score = 1.0
     else:
-        hrv_reactivity_score = normalize(hrv_drop, low=0.0, high=30.0, invert=True)
+        hrv_reactivity_score = normalize(hrv_drop, *ranges["heart_mind.hrv_drop"], invert=True)
 
     # EDA rise under challenge: some rise is normal, huge = hyperreactive
     eda_reactivity_score = 0.5
@@ -26,7 +27,7 @@ def compute_heart_mind_resonance(r: ReactivityMetrics) -> ResonanceComponent:
         if eda_delta < 0:
             eda_reactivity_score = 1.0
         else:
-            eda_reactivity_score = normalize(eda_delta, low=0.0, high=5.0, invert=True)
+            eda_reactivity_score = normalize(eda_delta, *ranges["heart_mind.eda_delta"], invert=True)
 
     # Breath: less spike = better
     breath_reactivity_score = 0.5
@@ -35,7 +36,7 @@ def compute_heart_mind_resonance(r: ReactivityMetrics) -> ResonanceComponent:
         if br_delta <= 0:
             breath_reactivity_score = 1.0
         else:
-            breath_reactivity_score = normalize(br_delta, low=0.0, high=8.0, invert=True)
+            breath_reactivity_score = normalize(br_delta, *ranges["heart_mind.breath_delta"], invert=True)
 
     # Recovery index is already 0–1, 1 = perfect.
     recovery_score = r.recovery_index if r.recovery_index is not None else 0.5
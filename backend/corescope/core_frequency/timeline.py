@@ -0,0 +1,204 @@
+# soulscope/core_frequency/timeline.py
+"""Sliding-window physio features across a session.
+
+``extract_physio_timeline`` computes the ``extract_physio_features`` quantities
+over windows of ``window_seconds``, advanced by ``step_seconds``. Windows tile
+each phase from its start and never straddle a phase boundary, so every window
+belongs to exactly one phase. A phase shorter than one window gets one
+truncated window.
+
+RMSSD, mean HR, EDA tonic level, phasic peak rate and breath rate come from
+prefix sums indexed with ``searchsorted``. LF/HF resamples the RR series onto
+one uniform grid, takes every full-length window as a strided view and runs a
+single batched FFT. Nothing loops over windows in Python, so an hour-long session costs
+a few milliseconds. Phasic peaks use one session-wide 90th percentile of the
+EDA slope. A per-window percentile would flag about a tenth of every window's
+samples, so the rates could not be compared across windows.
+
+Timestamps are in seconds. When there is one RR interval per sample, the
+sample timestamps are the beat times. Otherwise beats are placed by the
+cumulative RR sum from the first timestamp. NaN in ``eda`` or
+``breath_rate`` marks a missing sample (see ``PhysioBuffer.masked_series``);
+means and peak counts use valid samples only. Features a window cannot
+support are NaN.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .body_resonance import HF_BAND_HZ, LF_BAND_HZ
+from .models import PhysioTimeSeries
+
+
+DEFAULT_TIMELINE_WINDOW_SECONDS = 60.0
+DEFAULT_TIMELINE_STEP_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class PhysioTimeline:
+    window_start: np.ndarray
+    window_end: np.ndarray
+    phase_index: np.ndarray
+    hrv_rmssd: np.ndarray
+    mean_hr: np.ndarray
+    lf_hf_ratio: np.ndarray
+    eda_tonic_mean: np.ndarray
+    eda_phasic_peaks_per_min: np.ndarray
+    breath_rate_mean: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.window_start.size)
+
+
+def _windows(
+    first: float,
+    last: float,
+    phase_starts: Optional[Sequence[float]],
+    window_seconds: float,
+    step_seconds: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Phase bounds, clipped to the recording; phases that end before it starts are dropped.
+    starts = np.asarray(phase_starts if phase_starts is not None else [first], dtype=float)
+    ends = np.append(starts[1:], np.inf)
+    starts = np.maximum(starts, first)
+    ends = np.minimum(ends, np.nextafter(last, np.inf))
+    phases = np.flatnonzero(ends > starts)
+    starts, ends = starts[phases], ends[phases]
+    # Full windows that fit in each phase; at least one (truncated) window per phase.
+    counts = np.maximum(1, np.floor((ends - starts - window_seconds) / step_seconds).astype(int) + 1)
+    phase_index = np.repeat(phases, counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    window_start = np.repeat(starts, counts) + offsets * step_seconds
+    window_end = np.minimum(window_start + window_seconds, np.repeat(ends, counts))
+    return window_start, window_end, phase_index
+
+
+def _window_sums(prefix: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    return prefix[hi] - prefix[lo]
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    return np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+
+
+def _valid_means(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    counts = _window_sums(_prefix(valid), lo, hi)
+    return np.where(counts >= 1, _window_sums(_prefix(np.where(valid, values, 0.0)), lo, hi) / counts, np.nan)
+
+
+def _window_lf_hf(
+    beat_times: np.ndarray,
+    rr: np.ndarray,
+    window_start: np.ndarray,
+    window_end: np.ndarray,
+    window_seconds: float,
+    fs: float,
+) -> np.ndarray:
+    ratio = np.full(window_start.size, np.nan)
+    length = int(window_seconds * fs)
+    if rr.size < 2 or length < 2:
+        return ratio
+    grid = np.arange(beat_times[0], beat_times[-1], 1.0 / fs)
+    if grid.size < length:
+        return ratio
+    index = np.ceil((window_start - beat_times[0]) * fs - 1e-9).astype(int)
+    full = (window_end >= window_start + window_seconds) & (index >= 0) & (index + length <= grid.size)
+    if not full.any():
+        return ratio
+    segments = sliding_window_view(np.interp(grid, beat_times, rr), length)[index[full]]
+    detrended = segments - segments.mean(axis=1, keepdims=True)
+    psd = np.abs(np.fft.rfft(detrended, axis=1)) ** 2
+    freqs = np.fft.rfftfreq(length, d=1.0/fs)
+    lf = psd[:, (freqs >= LF_BAND_HZ[0]) & (freqs < LF_BAND_HZ[1])].sum(axis=1)
+    hf = psd[:, (freqs >= HF_BAND_HZ[0]) & (freqs < HF_BAND_HZ[1])].sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio[full] = np.where(hf > 0, lf / hf, np.inf)
+    return ratio
+
+
+def extract_physio_timeline(
+    ts: PhysioTimeSeries,
+    window_seconds: float = DEFAULT_TIMELINE_WINDOW_SECONDS,
+    step_seconds: float = DEFAULT_TIMELINE_STEP_SECONDS,
+    phase_starts: Optional[Sequence[float]] = None,
+    fs: float = 4.0,
+) -> PhysioTimeline:
+    """
+    Windowed features; ``phase_starts`` are ascending phase start times.
+    """
+    if window_seconds <= 0 or step_seconds <= 0:
+        raise ValueError("timeline_window_invalid")
+    timestamps = np.asarray(ts.timestamps, dtype=float)
+    rr = np.asarray(ts.rr_intervals, dtype=float)
+    if rr.size == timestamps.size:
+        beat_times = timestamps
+    else:
+        beat_times = timestamps[0] + np.concatenate(([0.0], np.cumsum(rr[1:]))) / 1000.0
+
+    window_start, window_end, phase_index = _windows(
+        float(min(timestamps[0], beat_times[0])),
+        float(max(timestamps[-1], beat_times[-1])),
+        phase_starts,
+        window_seconds,
+        step_seconds,
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Beats [lo, hi) fall in each window; RMSSD uses the hi - lo - 1 successive diffs inside it.
+        lo = np.searchsorted(beat_times, window_start, side="left")
+        hi = np.searchsorted(beat_times, window_end, side="left")
+        beats = hi - lo
+        last = np.minimum(np.maximum(hi - 1, lo), rr.size - 1)
+        diff_prefix = _prefix(np.diff(rr) ** 2)
+        diff_sums = diff_prefix[last] - diff_prefix[np.minimum(lo, last)]
+        hrv_rmssd = np.where(beats >= 2, np.sqrt(diff_sums / (beats - 1)), np.nan)
+        mean_hr = np.where(beats >= 1, 60000.0 * beats / _window_sums(_prefix(rr), lo, hi), np.nan)
+
+        lo = np.searchsorted(timestamps, window_start, side="left")
+        hi = np.searchsorted(timestamps, window_end, side="left")
+        first = np.minimum(lo, timestamps.size - 1)
+        last = np.minimum(np.maximum(hi - 1, lo), timestamps.size - 1)
+
+        eda_tonic_mean = np.full(window_start.size, np.nan)
+        eda_phasic_peaks_per_min = np.full(window_start.size, np.nan)
+        if ts.eda is not None and timestamps.size >= 2:
+            eda = np.asarray(ts.eda, dtype=float)
+            eda_tonic_mean = _valid_means(eda, lo, hi)
+            # A slope next to a missing sample is NaN and never counts as a peak.
+            eda_diff = np.diff(eda)
+            threshold = np.nanpercentile(eda_diff, 90) if not np.isnan(eda_diff).all() else np.inf
+            peak_prefix = _prefix(eda_diff > threshold)
+            peaks = peak_prefix[last] - peak_prefix[first]
+            span_min = (timestamps[last] - timestamps[first]) / 60.0
+            eda_phasic_peaks_per_min = np.where(
+                np.isnan(eda_tonic_mean), np.nan, np.where(span_min > 0, peaks / span_min, 0.0)
+            )
+
+        breath_rate_mean = np.full(window_start.size, np.nan)
+        if ts.breath_rate is not None:
+            breath = np.asarray(ts.breath_rate, dtype=float)
+            breath_rate_mean = _valid_means(breath, lo, hi)
+
+    return PhysioTimeline(
+        window_start=window_start,
+        window_end=window_end,
+        phase_index=phase_index,
+        hrv_rmssd=hrv_rmssd,
+        mean_hr=mean_hr,
+        lf_hf_ratio=_window_lf_hf(beat_times, rr, window_start, window_end, window_seconds, fs),
+        eda_tonic_mean=eda_tonic_mean,
+        eda_phasic_peaks_per_min=eda_phasic_peaks_per_min,
+        breath_rate_mean=breath_rate_mean,
+    )
+
+
+__all__ = [
+    "DEFAULT_TIMELINE_STEP_SECONDS",
+    "DEFAULT_TIMELINE_WINDOW_SECONDS",
+    "PhysioTimeline",
+    "extract_physio_timeline",
+]
@@ -3,38 +3,41 @@
 
 from .models import VoiceFeatures, ResonanceComponent
 from .body_resonance import normalize
+from .ranges import DEFAULT_RANGES, NormalizationRanges
 
 
-def compute_soul_resonance(v: VoiceFeatures) -> ResonanceComponent:
+def compute_soul_resonance(v: VoiceFeatures, ranges: NormalizationRanges = DEFAULT_RANGES) -> ResonanceComponent:
     """
     Higher score = clearer, more stable, expressive voice.
-    You’ll refine ranges based on real voice data.
+    Default ranges are heuristic; see ``calibration`` for cohort-derived ones.
     """
 
     # HNR: higher = clearer, less noise. Typical 0–30 dB.
-    hnr_score = normalize(v.hnr, low=5.0, high=25.0, invert=False)
+    hnr_score = normalize(v.hnr, *ranges["soul.hnr"], invert=False)
 
     # Jitter / shimmer: lower = more stable. We'll invert.
-    jitter_score = normalize(v.jitter_local, low=0.0, high=0.01, invert=True)
-    shimmer_score = normalize(v.shimmer_local, low=0.0, high=0.1, invert=True)
+    jitter_score = normalize(v.jitter_local, *ranges["soul.jitter"], invert=True)
+    shimmer_score = normalize(v.shimmer_local, *ranges["soul.shimmer"], invert=True)
 
     # Pitch variability: too flat OR too chaotic is not ideal.
     # Let’s assume 10–80 Hz std is “good”; outside that declines.
-    if v.f0_std < 10:
-        pitch_var_score = normalize(v.f0_std, low=0.0, high=10.0, invert=False)
-    elif v.f0_std <= 80:
+    f0_std_low, f0_std_high = ranges["soul.f0_std_low"], ranges["soul.f0_std_high"]
+    if v.f0_std < f0_std_low[1]:
+        pitch_var_score = normalize(v.f0_std, *f0_std_low, invert=False)
+    elif v.f0_std <= f0_std_high[0]:
         pitch_var_score = 1.0
     else:
-        pitch_var_score = normalize(v.f0_std, low=80.0, high=200.0, invert=True)
+        pitch_var_score = normalize(v.f0_std, *f0_std_high, invert=True)
 
     # Spectral centroid: mid-range "sweet spot", too low = dull, too high = strained
     # Ballpark 1500–3500 Hz.
-    if v.spectral_centroid < 1500:
-        bright_score = normalize(v.spectral_centroid, low=500, high=1500, invert=False)
-    elif v.spectral_centroid <= 3500:
+    centroid_low, centroid_high = ranges["soul.centroid_low"], ranges["soul.centroid_high"]
+    if v.spectral_centroid < centroid_low[1]:
+        bright_score = normalize(v.spectral_centroid, *centroid_low, invert=False)
+    elif v.spectral_centroid <= centroid_high[0]:
         bright_score = 1.0
     else:
-        bright_score = normalize(v.spectral_centroid, low=3500, high=6000, invert=True)
+        bright_score = normalize(v.spectral_centroid, *centroid_high, invert=True)
 
     weights = [0.35, 0.2, 0.2, 0.15, 0.1]
     scores = [
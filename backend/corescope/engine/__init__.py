@@ -3,13 +3,19 @@
 from .contracts import (
     DecisionLedger,
     EngineVersions,
+    EvidenceIndex,
     EvidenceLedger,
+    EvidenceQuery,
     EvidenceRecord,
+    ScanEvidenceLedger,
 )
 
 __all__ = [
     "DecisionLedger",
     "EngineVersions",
+    "EvidenceIndex",
     "EvidenceLedger",
+    "EvidenceQuery",
     "EvidenceRecord",
+    "ScanEvidenceLedger",
 ]
@@ -0,0 +1,219 @@
+"""Per-user feature baselines for evidence direction.
+
+Each user, capture kind and feature keeps a running count, mean and M2
+(Welford), plus the most recent ``RECENT_WINDOW`` values for quantiles. An
+analysis reads the user's baselines for its capture kind in one lookup before
+building evidence, then folds its own available measurements in. Prior scans
+are never re-read. Updates are keyed by capture id, so a retried analysis of
+the same capture is not counted twice. The in-memory store serves a single
+process and evicts the least recently used user and kind once
+``max_entries`` is reached. The SQLite store keeps one row per user, kind and
+feature in a file shared by every worker on a host, and updates each row
+inside an immediate transaction.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+RECENT_WINDOW = 20
+# Fewer prior captures than this leave direction "stable" with no baseline.
+MIN_BASELINE_COUNT = 3
+# Deviation, in baseline standard deviations, reported as elevated or reduced.
+DIRECTION_Z_THRESHOLD = 1.0
+# Capture ids remembered per user and kind to make updates idempotent; far more
+# captures than a user records within the 24-hour retry window.
+APPLIED_CAPTURE_WINDOW = 256
+DEFAULT_MAX_BASELINE_ENTRIES = 10_000
+
+
+@dataclass(frozen=True)
+class FeatureBaseline:
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    recent: Tuple[float, ...] = field(default_factory=tuple)
+
+    @property
+    def sd(self) -> Optional[float]:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None
+
+    def updated(self, value: float) -> "FeatureBaseline":
+        count = self.count + 1
+        delta = value - self.mean
+        mean = self.mean + delta / count
+        return FeatureBaseline(count, mean, self.m2 + delta * (value - mean), (*self.recent, value)[-RECENT_WINDOW:])
+
+    def z_score(self, value: float) -> Optional[float]:
+        sd = self.sd
+        if self.count < MIN_BASELINE_COUNT or sd is None or sd <= 1e-12 * max(1.0, abs(self.mean)):
+            return None
+        return (value - self.mean) / sd
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        p10, p50, p90 = (float(value) for value in np.percentile(self.recent, [10, 50, 90])) if self.recent else (None, None, None)
+        return {"count": self.count, "mean": self.mean, "sd": self.sd, "recent_p10": p10, "recent_p50": p50, "recent_p90": p90}
+
+
+Baselines = Dict[str, FeatureBaseline]
+
+
+class BaselineStore(ABC):
+    @abstractmethod
+    def get(self, user_id: str, capture_kind: str) -> Baselines:
+        """Baselines by feature id for one user and capture kind."""
+
+    @abstractmethod
+    def update(self, user_id: str, capture_kind: str, capture_id: str, values: Mapping[str, float]) -> bool:
+        """Fold one capture's available values into the user's baselines.
+
+        Returns ``False``, changing nothing, if ``capture_id`` was already folded in.
+        """
+
+
+class InMemoryBaselineStore(BaselineStore):
+    def __init__(self, max_entries: int = DEFAULT_MAX_BASELINE_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Per user and kind: baselines and the recently applied capture ids.
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Baselines, Dict[str, None]]]" = OrderedDict()
+
+    def get(self, user_id: str, capture_kind: str) -> Baselines:
+        with self._lock:
+            entry = self._entries.get((user_id, capture_kind))
+            if entry is None:
+                return {}
+            self._entries.move_to_end((user_id, capture_kind))
+            return dict(entry[0])
+
+    def update(self, user_id: str, capture_kind: str, capture_id: str, values: Mapping[str, float]) -> bool:
+        with self._lock:
+            key = (user_id, capture_kind)
+            if key not in self._entries:
+                while len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+                self._entries[key] = ({}, {})
+            self._entries.move_to_end(key)
+            baselines, applied = self._entries[key]
+            if capture_id in applied:
+                return False
+            applied[capture_id] = None
+            if len(applied) > APPLIED_CAPTURE_WINDOW:
+                del applied[next(iter(applied))]
+            for feature_id, value in values.items():
+                baselines[feature_id] = baselines.get(feature_id, FeatureBaseline()).updated(value)
+            return True
+
+
+class SQLiteBaselineStore(BaselineStore):
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=10.0, isolation_level=None)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS feature_baselines ("
+                " user_id TEXT NOT NULL,"
+                " capture_kind TEXT NOT NULL,"
+                " feature_id TEXT NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " mean REAL NOT NULL,"
+                " m2 REAL NOT NULL,"
+                " recent TEXT NOT NULL,"
+                " PRIMARY KEY (user_id, capture_kind, feature_id)"
+                ")"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS baseline_captures ("
+                " user_id TEXT NOT NULL,"
+                " capture_kind TEXT NOT NULL,"
+                " capture_id TEXT NOT NULL,"
+                " PRIMARY KEY (user_id, capture_kind, capture_id)"
+                ")"
+            )
+            yield connection
+
+    def get(self, user_id: str, capture_kind: str) -> Baselines:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT feature_id, count, mean, m2, recent FROM feature_baselines WHERE user_id = ? AND capture_kind = ?",
+                (user_id, capture_kind),
+            ).fetchall()
+        return {feature_id: FeatureBaseline(count, mean, m2, tuple(json.loads(recent))) for feature_id, count, mean, m2, recent in rows}
+
+    def update(self, user_id: str, capture_kind: str, capture_id: str, values: Mapping[str, float]) -> bool:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                applied = connection.execute(
+                    "INSERT OR IGNORE INTO baseline_captures (user_id, capture_kind, capture_id) VALUES (?, ?, ?)",
+                    (user_id, capture_kind, capture_id),
+                ).rowcount
+                if not applied:
+                    connection.execute("ROLLBACK")
+                    return False
+                # rowid follows insertion, so this keeps the most recent ids.
+                connection.execute(
+                    "DELETE FROM baseline_captures WHERE user_id = ? AND capture_kind = ? AND rowid NOT IN ("
+                    " SELECT rowid FROM baseline_captures WHERE user_id = ? AND capture_kind = ? ORDER BY rowid DESC LIMIT ?"
+                    ")",
+                    (user_id, capture_kind, user_id, capture_kind, APPLIED_CAPTURE_WINDOW),
+                )
+                current = {
+                    feature_id: FeatureBaseline(count, mean, m2, tuple(json.loads(recent)))
+                    for feature_id, count, mean, m2, recent in connection.execute(
+                        "SELECT feature_id, count, mean, m2, recent FROM feature_baselines WHERE user_id = ? AND capture_kind = ?",
+                        (user_id, capture_kind),
+                    )
+                }
+                rows = []
+                for feature_id, value in values.items():
+                    baseline = current.get(feature_id, FeatureBaseline()).updated(value)
+                    rows.append((user_id, capture_kind, feature_id, baseline.count, baseline.mean, baseline.m2, json.dumps(baseline.recent)))
+                connection.executemany("INSERT OR REPLACE INTO feature_baselines VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+        return True
+
+
+def build_baseline_store() -> BaselineStore:
+    """Store selected by ``SOULSCOPE_BASELINE_STORE`` (``memory`` by default, or ``sqlite``)."""
+    kind = os.getenv("SOULSCOPE_BASELINE_STORE", "memory").strip().lower() or "memory"
+    if kind == "memory":
+        return InMemoryBaselineStore(int(os.getenv("SOULSCOPE_BASELINE_MAX", str(DEFAULT_MAX_BASELINE_ENTRIES))))
+    if kind == "sqlite":
+        return SQLiteBaselineStore(Path(os.getenv("SOULSCOPE_BASELINE_DB", "backend/.baselines.sqlite3")))
+    raise RuntimeError(f"Unknown SOULSCOPE_BASELINE_STORE: {kind}")
+
+
+__all__ = [
+    "APPLIED_CAPTURE_WINDOW",
+    "DEFAULT_MAX_BASELINE_ENTRIES",
+    "DIRECTION_Z_THRESHOLD",
+    "MIN_BASELINE_COUNT",
+    "RECENT_WINDOW",
+    "BaselineStore",
+    "Baselines",
+    "FeatureBaseline",
+    "InMemoryBaselineStore",
+    "SQLiteBaselineStore",
+    "build_baseline_store",
+]
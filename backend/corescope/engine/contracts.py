@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+from bisect import bisect_left
+from contextlib import suppress
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Literal, Optional
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 
 
 Direction = Literal["elevated", "reduced", "stable", "mixed", "unavailable"]
@@ -50,6 +53,158 @@ class EvidenceLedger(ImmutableModel):
     records: List[EvidenceRecord] = Field(default_factory=list)
     versions: EngineVersions
 
+    @cached_property
+    def query(self) -> EvidenceQuery:
+        """Indexed view over ``records``, built on first use and cached."""
+        return EvidenceQuery(self.records)
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> "EvidenceLedger":
+        copied = super().model_copy(update=update, deep=deep)
+        # The cached view indexes the original's records, so the copy rebuilds it.
+        with suppress(AttributeError):
+            del copied.query
+        return copied
+
+
+class EvidenceQuery:
+    """Read-only lookups over a ledger's records.
+
+    Results are tuples of the ledger's own record objects, in ledger order.
+    Feature prefixes match whole dotted segments: ``voice.f0`` matches
+    ``voice.f0`` and ``voice.f0.median`` but not ``voice.f0x``.
+    """
+
+    __slots__ = ("records", "_by_evidence_id", "_features", "_by_feature", "_by_capture_kind", "_by_direction", "_by_quality", "_by_available", "_confidences", "_by_confidence")
+
+    def __init__(self, records: Sequence[EvidenceRecord]) -> None:
+        self.records = records
+        self._by_evidence_id = {record.evidence_id: position for position, record in enumerate(records)}
+        self._by_feature = _positions(records, lambda record: record.feature_source)
+        self._features = sorted(self._by_feature)
+        self._by_capture_kind = _positions(records, lambda record: str(record.provenance.get("capture_kind")))
+        self._by_direction = _positions(records, lambda record: record.direction)
+        self._by_quality = _positions(records, lambda record: record.quality)
+        self._by_available = _positions(records, lambda record: not record.missing_evidence)
+        self._by_confidence = tuple(sorted(range(len(records)), key=lambda position: records[position].confidence))
+        self._confidences = [records[position].confidence for position in self._by_confidence]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def record(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        position = self._by_evidence_id.get(evidence_id)
+        return self.records[position] if position is not None else None
+
+    def for_feature(self, feature_source: str) -> Tuple[EvidenceRecord, ...]:
+        """Records of exactly ``feature_source``; ``select`` matches prefixes."""
+        return tuple(self.records[position] for position in self._by_feature.get(feature_source, ()))
+
+    def for_capture_kind(self, capture_kind: str) -> Tuple[EvidenceRecord, ...]:
+        return tuple(self.records[position] for position in self._by_capture_kind.get(capture_kind, ()))
+
+    def index(self) -> EvidenceIndex:
+        """The position maps in their serialisable form."""
+        return EvidenceIndex(
+            by_evidence_id=dict(self._by_evidence_id),
+            by_feature_source={feature: list(positions) for feature, positions in self._by_feature.items()},
+            by_capture_kind={kind: list(positions) for kind, positions in self._by_capture_kind.items()},
+        )
+
+    def select(
+        self,
+        *,
+        feature_prefix: Optional[str] = None,
+        capture_kind: Optional[str] = None,
+        available: Optional[bool] = None,
+        min_confidence: Optional[float] = None,
+        direction: Optional[Direction] = None,
+        quality: Optional[str] = None,
+    ) -> Tuple[EvidenceRecord, ...]:
+        """Records matching every given criterion.
+
+        Candidates come from the narrowest index; the other criteria are
+        checked on those records only.
+        """
+        criteria: List[Tuple[Sequence[int], Callable[[EvidenceRecord], bool]]] = []
+        if feature_prefix is not None:
+            criteria.append((self._feature_positions(feature_prefix), lambda record: _has_prefix(record.feature_source, feature_prefix)))
+        if capture_kind is not None:
+            criteria.append((self._by_capture_kind.get(capture_kind, ()), lambda record: str(record.provenance.get("capture_kind")) == capture_kind))
+        if available is not None:
+            criteria.append((self._by_available.get(available, ()), lambda record: record.missing_evidence != available))
+        if min_confidence is not None:
+            start = bisect_left(self._confidences, min_confidence)
+            criteria.append((self._by_confidence[start:], lambda record: record.confidence >= min_confidence))
+        if direction is not None:
+            criteria.append((self._by_direction.get(direction, ()), lambda record: record.direction == direction))
+        if quality is not None:
+            criteria.append((self._by_quality.get(quality, ()), lambda record: record.quality == quality))
+        if not criteria:
+            return tuple(self.records)
+        narrowest = min(range(len(criteria)), key=lambda index: len(criteria[index][0]))
+        checks = [check for index, (_, check) in enumerate(criteria) if index != narrowest]
+        return tuple(
+            self.records[position]
+            for position in sorted(criteria[narrowest][0])
+            if all(check(self.records[position]) for check in checks)
+        )
+
+    def _feature_positions(self, prefix: str) -> Sequence[int]:
+        if not prefix:
+            return range(len(self.records))
+        start = bisect_left(self._features, prefix)
+        # "/" sorts right after ".", so this bounds every "<prefix>.*" feature.
+        stop = bisect_left(self._features, prefix + "/", start)
+        return [
+            position
+            for feature in self._features[start:stop]
+            if _has_prefix(feature, prefix)
+            for position in self._by_feature[feature]
+        ]
+
+
+def _positions(records: Sequence[EvidenceRecord], key: Callable[[EvidenceRecord], Any]) -> Dict[Any, Tuple[int, ...]]:
+    positions: Dict[Any, List[int]] = {}
+    for position, record in enumerate(records):
+        positions.setdefault(key(record), []).append(position)
+    return {value: tuple(found) for value, found in positions.items()}
+
+
+def _has_prefix(feature_source: str, prefix: str) -> bool:
+    return not prefix or feature_source == prefix or feature_source.startswith(prefix + ".")
+
+
+class EvidenceIndex(ImmutableModel):
+    """Record positions in a merged ledger, as serialised by ``ScanEvidenceLedger``."""
+
+    by_evidence_id: Dict[str, int] = Field(default_factory=dict)
+    by_feature_source: Dict[str, List[int]] = Field(default_factory=dict)
+    by_capture_kind: Dict[str, List[int]] = Field(default_factory=dict)
+
+
+class ScanEvidenceLedger(EvidenceLedger):
+    """Every capture ledger of one scan, merged.
+
+    Lookups go through ``query``; ``index`` exposes its position maps to API
+    clients and is derived on serialisation, never accepted as input.
+    """
+
+    source_ledger_ids: List[str] = Field(default_factory=list)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def index(self) -> EvidenceIndex:
+        return self.query.index()
+
+    def record(self, evidence_id: str) -> Optional[EvidenceRecord]:
+        return self.query.record(evidence_id)
+
+    def for_feature(self, feature_source: str) -> List[EvidenceRecord]:
+        return list(self.query.for_feature(feature_source))
+
+    def for_capture_kind(self, capture_kind: str) -> List[EvidenceRecord]:
+        return list(self.query.for_capture_kind(capture_kind))
+
 
 class CandidateDecision(ImmutableModel):
     candidate_id: str
@@ -2,24 +2,43 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from corescope.audio.acoustic_contract import AcousticFeatureMeasurement
 
-from .contracts import EvidenceLedger, EvidenceRecord
+from .baselines import DIRECTION_Z_THRESHOLD, FeatureBaseline
+from .contracts import Direction, EvidenceLedger, EvidenceRecord, ScanEvidenceLedger
 from .versions import CURRENT_ENGINE_VERSIONS
 
 
+def _against_baseline(value: float, baseline: Optional[FeatureBaseline]) -> Tuple[Direction, Optional[float], Optional[Dict[str, Any]]]:
+    """Direction and magnitude (z-score) against the user's own baseline; no magnitude until it is established."""
+    z_score = baseline.z_score(value) if baseline is not None else None
+    if z_score is None:
+        return "stable", None, None
+    direction: Direction = "elevated" if z_score >= DIRECTION_Z_THRESHOLD else "reduced" if z_score <= -DIRECTION_Z_THRESHOLD else "stable"
+    return direction, round(z_score, 6), {**baseline.summary(), "z_score": z_score}
+
+
 def build_acoustic_evidence_ledger(
     *,
     scan_id: str,
     source_capture_id: str,
     measurements: Iterable[AcousticFeatureMeasurement],
+    baselines: Optional[Mapping[str, FeatureBaseline]] = None,
 ) -> EvidenceLedger:
+    """One record per measurement; with ``baselines`` (prior captures only),
+    direction and magnitude describe the deviation from the user's baseline."""
+    baselines = baselines or {}
     records = []
     for measurement in measurements:
         available = measurement.value is not None and measurement.rejection_reason is None
         confounds = [measurement.rejection_reason] if measurement.rejection_reason else []
+        direction, magnitude, baseline = (
+            _against_baseline(measurement.value, baselines.get(measurement.feature_id))
+            if available
+            else ("unavailable", None, None)
+        )
         records.append(
             EvidenceRecord(
                 evidence_id=f"{source_capture_id}:{measurement.feature_id}:{measurement.feature_version}",
@@ -31,10 +50,10 @@ def build_acoustic_evidence_ledger(
                     if available
                     else f"{measurement.feature_id} was unavailable"
                 ),
-                direction="stable" if available else "unavailable",
-                magnitude=measurement.value,
+                direction=direction,
+                magnitude=magnitude,
                 quality=measurement.quality,
-                baseline=None,
+                baseline=baseline,
                 confidence=measurement.confidence,
                 uncertainty=round(1.0 - measurement.confidence, 6),
                 provenance={
@@ -59,3 +78,38 @@ def build_acoustic_evidence_ledger(
         records=records,
         versions=CURRENT_ENGINE_VERSIONS,
     )
+
+
+def merge_evidence_ledgers(scan_id: str, ledgers: Iterable[EvidenceLedger]) -> ScanEvidenceLedger:
+    """Merge the capture ledgers of one scan into a single indexed ledger.
+
+    Ledgers are applied oldest first. A record whose evidence ID is already
+    present (a retried capture) replaces it in place, so the newest version wins
+    and record order stays stable. All ledgers must belong to ``scan_id`` and
+    share one version manifest.
+    """
+    ledgers = sorted(ledgers, key=lambda ledger: ledger.created_at)
+    if not ledgers:
+        raise ValueError("evidence_ledgers_empty")
+    if any(ledger.scan_id != scan_id for ledger in ledgers):
+        raise ValueError("evidence_ledger_scan_mismatch")
+    versions = {ledger.versions for ledger in ledgers}
+    if len(versions) > 1:
+        raise ValueError("evidence_ledger_version_mismatch")
+    records: List[EvidenceRecord] = []
+    by_evidence_id: Dict[str, int] = {}
+    for ledger in ledgers:
+        for record in ledger.records:
+            position = by_evidence_id.get(record.evidence_id)
+            if position is None:
+                by_evidence_id[record.evidence_id] = len(records)
+                records.append(record)
+            else:
+                records[position] = record
+    return ScanEvidenceLedger(
+        ledger_id=f"{scan_id}:evidence",
+        scan_id=scan_id,
+        records=records,
+        versions=versions.pop(),
+        source_ledger_ids=list(dict.fromkeys(ledger.ledger_id for ledger in ledgers)),
+    )
@@ -0,0 +1,216 @@
+"""Columnar per-session storage for ingested physio samples.
+
+Samples are kept as four preallocated float64 columns (timestamp, RR interval,
+EDA, breath rate), validity masks for the optional channels and a uint8 code
+for the scan phase that was active when the batch arrived (0 = untagged). Ingest
+appends whole batches with slice assignment and capacity doubles when needed.
+``series`` returns a ``PhysioTimeSeries`` whose arrays are views of the
+columns, so nothing is rebuilt per request. Missing optional values are stored
+as 0.0, matching the legacy list-of-samples conversion; ``masked_series``
+copies the optional channels with NaN in place of missing values instead.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from corescope.core_frequency.models import PhysioTimeSeries
+
+
+_HEADER = struct.Struct("<4sQ")
+_MAGIC = b"PHB1"
+
+
+class PhysioBuffer:
+    def __init__(self, capacity: int = 1024) -> None:
+        capacity = max(1, capacity)
+        self._count = 0
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._rr = np.zeros(capacity, dtype=np.float64)
+        self._eda = np.zeros(capacity, dtype=np.float64)
+        self._breath = np.zeros(capacity, dtype=np.float64)
+        self._eda_valid = np.zeros(capacity, dtype=bool)
+        self._breath_valid = np.zeros(capacity, dtype=bool)
+        self._phase = np.zeros(capacity, dtype=np.uint8)
+        # The legacy conversion only kept a channel when some value was truthy.
+        self._eda_present = 0
+        self._breath_present = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return self._timestamps.size
+
+    def _reserve(self, size: int) -> None:
+        if size <= self.capacity:
+            return
+        capacity = max(size, self.capacity * 2)
+        for name in ("_timestamps", "_rr", "_eda", "_breath", "_eda_valid", "_breath_valid", "_phase"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: self._count] = column[: self._count]
+            setattr(self, name, grown)
+
+    def append(
+        self,
+        timestamps: np.ndarray,
+        rr_intervals: np.ndarray,
+        eda: Optional[np.ndarray] = None,
+        breath_rate: Optional[np.ndarray] = None,
+        phase: int = 0,
+    ) -> int:
+        """Append a batch tagged with ``phase``; NaN in ``eda``/``breath_rate`` marks a missing value."""
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        size = timestamps.size
+        self._reserve(self._count + size)
+        window = slice(self._count, self._count + size)
+        self._timestamps[window] = timestamps
+        self._rr[window] = np.asarray(rr_intervals, dtype=np.float64).reshape(-1)
+        self._phase[window] = phase
+        for values, column, valid, present in (
+            (eda, self._eda, self._eda_valid, "_eda_present"),
+            (breath_rate, self._breath, self._breath_valid, "_breath_present"),
+        ):
+            if values is None:
+                column[window] = 0.0
+                valid[window] = False
+                continue
+            values = np.asarray(values, dtype=np.float64).reshape(-1)
+            mask = ~np.isnan(values)
+            column[window] = np.where(mask, values, 0.0)
+            valid[window] = mask
+            setattr(self, present, getattr(self, present) + int(np.count_nonzero(column[window])))
+        self._count += size
+        return size
+
+    @property
+    def eda_valid(self) -> np.ndarray:
+        return self._eda_valid[: self._count]
+
+    @property
+    def breath_valid(self) -> np.ndarray:
+        return self._breath_valid[: self._count]
+
+    @property
+    def phases(self) -> np.ndarray:
+        return self._phase[: self._count]
+
+    def series(self) -> Optional[PhysioTimeSeries]:
+        """Views over the stored columns, or ``None`` when nothing was ingested."""
+        if not self._count:
+            return None
+        count = self._count
+        return PhysioTimeSeries(
+            timestamps=self._timestamps[:count],
+            rr_intervals=self._rr[:count],
+            eda=self._eda[:count] if self._eda_present else None,
+            breath_rate=self._breath[:count] if self._breath_present else None,
+        )
+
+    def masked_series(self) -> Optional[PhysioTimeSeries]:
+        """Like ``series`` but EDA and breath are copies with NaN where no value arrived."""
+        series = self.series()
+        if series is None:
+            return None
+        count = self._count
+        return PhysioTimeSeries(
+            timestamps=series.timestamps,
+            rr_intervals=series.rr_intervals,
+            eda=np.where(self._eda_valid[:count], self._eda[:count], np.nan) if self._eda_valid[:count].any() else None,
+            breath_rate=np.where(self._breath_valid[:count], self._breath[:count], np.nan) if self._breath_valid[:count].any() else None,
+        )
+
+    def copy(self) -> "PhysioBuffer":
+        """Independent buffer holding the samples ingested so far."""
+        buffer = PhysioBuffer(self._count)
+        buffer._fill(0, self._count, *self._columns(0))
+        buffer._count = self._count
+        buffer._recount()
+        return buffer
+
+    def to_bytes(self, start: int = 0) -> bytes:
+        """Serialise samples from ``start`` on; chunks concatenate with ``from_chunks``."""
+        timestamps, rr, eda, breath, eda_valid, breath_valid, phase = self._columns(start)
+        return b"".join(
+            [
+                _HEADER.pack(_MAGIC, timestamps.size),
+                timestamps.astype("<f8", copy=False).tobytes(),
+                rr.astype("<f8", copy=False).tobytes(),
+                eda.astype("<f8", copy=False).tobytes(),
+                breath.astype("<f8", copy=False).tobytes(),
+                np.packbits(eda_valid).tobytes(),
+                np.packbits(breath_valid).tobytes(),
+                phase.tobytes(),
+            ]
+        )
+
+    @staticmethod
+    def chunk_length(payload: bytes) -> int:
+        """Number of samples in a ``to_bytes`` chunk, read from its header only."""
+        magic, count = _HEADER.unpack_from(payload)
+        if magic != _MAGIC:
+            raise ValueError("physio_buffer_corrupt")
+        return int(count)
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "PhysioBuffer":
+        return cls.from_chunks([payload])
+
+    @classmethod
+    def from_chunks(cls, payloads: Sequence[bytes]) -> "PhysioBuffer":
+        """Rebuild a buffer from ``to_bytes`` chunks, in append order."""
+        decoded = [_decode(payload) for payload in payloads]
+        total = sum(columns[0].size for columns in decoded)
+        buffer = cls(total)
+        for columns in decoded:
+            size = columns[0].size
+            buffer._fill(buffer._count, buffer._count + size, *columns)
+            buffer._count += size
+        buffer._recount()
+        return buffer
+
+    def _columns(self, start: int) -> Tuple[np.ndarray, ...]:
+        window = slice(start, self._count)
+        return (
+            self._timestamps[window],
+            self._rr[window],
+            self._eda[window],
+            self._breath[window],
+            self._eda_valid[window],
+            self._breath_valid[window],
+            self._phase[window],
+        )
+
+    def _fill(self, start: int, stop: int, *columns: Any) -> None:
+        window = slice(start, stop)
+        for name, values in zip(("_timestamps", "_rr", "_eda", "_breath", "_eda_valid", "_breath_valid", "_phase"), columns):
+            getattr(self, name)[window] = values
+
+    def _recount(self) -> None:
+        self._eda_present = int(np.count_nonzero(self._eda[: self._count]))
+        self._breath_present = int(np.count_nonzero(self._breath[: self._count]))
+
+
+def _decode(payload: bytes) -> Tuple[Any, ...]:
+    magic, count = _HEADER.unpack_from(payload)
+    if magic != _MAGIC:
+        raise ValueError("physio_buffer_corrupt")
+    offset = _HEADER.size
+    columns: List[Any] = []
+    for _ in range(4):
+        columns.append(np.frombuffer(payload, dtype="<f8", count=count, offset=offset))
+        offset += count * 8
+    packed = (count + 7) // 8
+    for _ in range(2):
+        columns.append(np.unpackbits(np.frombuffer(payload, dtype=np.uint8, count=packed, offset=offset), count=count).astype(bool))
+        offset += packed
+    columns.append(np.frombuffer(payload, dtype=np.uint8, count=count, offset=offset))
+    return tuple(columns)
+
+
+__all__ = ["PhysioBuffer"]
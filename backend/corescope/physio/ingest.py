@@ -0,0 +1,178 @@
+"""Bulk physio ingest formats that parse straight into NumPy columns.
+
+Besides the JSON ``PhysioIngestRequest`` body, ``/api/physio/ingest`` accepts
+two bulk formats that skip per-sample pydantic validation.
+
+``application/vnd.soulscope.physio-frames`` is a packed little-endian frame::
+
+    header   "SSPH", version u8 (1), value width u8 (4 or 8), channel bits u8
+             (1 = EDA, 2 = breath), reserved u8, session id length u16,
+             sample count u32, then the UTF-8 session id
+    samples  one record per sample: timestamp f8, RR interval, then the
+             present channels in bit order, each float32 or float64
+
+Timestamps are always float64 so epoch seconds keep sub-millisecond precision.
+
+``application/x-ndjson`` starts with a header line
+``{"session_id": ..., "channels": ["eda_micro_siemens", "breath_rate_bpm"]}``
+followed by one JSON array per sample: ``[timestamp, rr_interval_ms, *channels]``.
+
+In both formats NaN (or ``null``) marks a missing optional value. Every batch
+goes through the same vectorized range checks as the JSON body.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+PHYSIO_FRAMES_CONTENT_TYPE = "application/vnd.soulscope.physio-frames"
+PHYSIO_NDJSON_CONTENT_TYPE = "application/x-ndjson"
+_FRAME_HEADER = struct.Struct("<4sBBBBHI")
+_FRAME_MAGIC = b"SSPH"
+_FRAME_VERSION = 1
+CHANNEL_EDA = 1
+CHANNEL_BREATH = 2
+_CHANNEL_NAMES = {CHANNEL_EDA: "eda_micro_siemens", CHANNEL_BREATH: "breath_rate_bpm"}
+
+# Inclusive plausible ranges; optional channels may also be NaN.
+RR_INTERVAL_RANGE_MS = (200.0, 3000.0)
+EDA_RANGE_MICRO_SIEMENS = (0.0, 100.0)
+BREATH_RATE_RANGE_BPM = (0.0, 120.0)
+
+
+@dataclass(frozen=True)
+class PhysioBatch:
+    session_id: str
+    timestamps: np.ndarray
+    rr_intervals: np.ndarray
+    eda: np.ndarray
+    breath_rate: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamps.size)
+
+
+def physio_batch_from_columns(session_id: str, columns: np.ndarray) -> PhysioBatch:
+    """Batch from an ``(n, 4)`` array of timestamp, RR, EDA and breath columns."""
+    columns = np.asarray(columns, dtype=np.float64).reshape(-1, 4)
+    return PhysioBatch(session_id, columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3])
+
+
+def _frame_dtype(value_size: int, channels: int) -> np.dtype:
+    value = "<f4" if value_size == 4 else "<f8"
+    fields = [("timestamp", "<f8"), ("rr_interval_ms", value)]
+    fields.extend((_CHANNEL_NAMES[bit], value) for bit in (CHANNEL_EDA, CHANNEL_BREATH) if channels & bit)
+    return np.dtype(fields)
+
+
+def encode_physio_frames(
+    session_id: str,
+    timestamps: Sequence[float],
+    rr_intervals: Sequence[float],
+    *,
+    eda: Optional[Sequence[float]] = None,
+    breath_rate: Optional[Sequence[float]] = None,
+    value_size: int = 4,
+) -> bytes:
+    """Pack samples in the frame format; used by the wearable bridge and tests."""
+    channels = (CHANNEL_EDA if eda is not None else 0) | (CHANNEL_BREATH if breath_rate is not None else 0)
+    records = np.zeros(len(timestamps), dtype=_frame_dtype(value_size, channels))
+    records["timestamp"] = timestamps
+    records["rr_interval_ms"] = rr_intervals
+    if eda is not None:
+        records["eda_micro_siemens"] = eda
+    if breath_rate is not None:
+        records["breath_rate_bpm"] = breath_rate
+    name = session_id.encode("utf-8")
+    header = _FRAME_HEADER.pack(_FRAME_MAGIC, _FRAME_VERSION, value_size, channels, 0, len(name), records.size)
+    return header + name + records.tobytes()
+
+
+def decode_physio_frames(payload: bytes) -> PhysioBatch:
+    if len(payload) < _FRAME_HEADER.size:
+        raise ValueError("physio_frames_truncated")
+    magic, version, value_size, channels, _, name_length, count = _FRAME_HEADER.unpack_from(payload)
+    if magic != _FRAME_MAGIC or version != _FRAME_VERSION:
+        raise ValueError("physio_frames_unsupported")
+    if value_size not in (4, 8) or channels & ~(CHANNEL_EDA | CHANNEL_BREATH):
+        raise ValueError("physio_frames_unsupported")
+    dtype = _frame_dtype(value_size, channels)
+    offset = _FRAME_HEADER.size + name_length
+    if len(payload) != offset + count * dtype.itemsize:
+        raise ValueError("physio_frames_truncated")
+    try:
+        session_id = payload[_FRAME_HEADER.size : offset].decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise ValueError("physio_frames_unsupported") from exc
+    records = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+    missing = np.full(count, np.nan)
+    return PhysioBatch(
+        session_id,
+        records["timestamp"].astype(np.float64),
+        records["rr_interval_ms"].astype(np.float64),
+        records["eda_micro_siemens"].astype(np.float64) if channels & CHANNEL_EDA else missing,
+        records["breath_rate_bpm"].astype(np.float64) if channels & CHANNEL_BREATH else missing.copy(),
+    )
+
+
+def decode_physio_ndjson(payload: bytes) -> PhysioBatch:
+    lines = [line for line in payload.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("physio_ndjson_missing_header")
+    try:
+        header = json.loads(lines[0])
+        rows: List[list] = [json.loads(line) for line in lines[1:]]
+    except json.JSONDecodeError as exc:
+        raise ValueError("physio_ndjson_invalid") from exc
+    if not isinstance(header, dict) or not isinstance(header.get("session_id"), str):
+        raise ValueError("physio_ndjson_missing_header")
+    names = list(header.get("channels") or [])
+    if any(name not in _CHANNEL_NAMES.values() for name in names) or len(set(names)) != len(names):
+        raise ValueError("physio_ndjson_unknown_channel")
+    try:
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), 2 + len(names))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("physio_ndjson_invalid") from exc
+    columns = np.full((len(rows), 4), np.nan)
+    columns[:, :2] = values[:, :2]
+    for position, name in enumerate(names):
+        columns[:, 2 if name == "eda_micro_siemens" else 3] = values[:, 2 + position]
+    return physio_batch_from_columns(header["session_id"], columns)
+
+
+def _in_range(values: np.ndarray, bounds: tuple, *, optional: bool) -> bool:
+    low, high = bounds
+    checked = values[~np.isnan(values)] if optional else values
+    return bool(np.all((checked >= low) & (checked <= high)))
+
+
+def validate_physio_batch(batch: PhysioBatch) -> None:
+    """Reject the whole batch if any sample is non-finite or implausible."""
+    if not np.all(np.isfinite(batch.timestamps)):
+        raise ValueError("physio_timestamp_invalid")
+    if not _in_range(batch.rr_intervals, RR_INTERVAL_RANGE_MS, optional=False):
+        raise ValueError("physio_rr_interval_out_of_range")
+    if not _in_range(batch.eda, EDA_RANGE_MICRO_SIEMENS, optional=True):
+        raise ValueError("physio_eda_out_of_range")
+    if not _in_range(batch.breath_rate, BREATH_RATE_RANGE_BPM, optional=True):
+        raise ValueError("physio_breath_rate_out_of_range")
+
+
+__all__ = [
+    "CHANNEL_BREATH",
+    "CHANNEL_EDA",
+    "PHYSIO_FRAMES_CONTENT_TYPE",
+    "PHYSIO_NDJSON_CONTENT_TYPE",
+    "PhysioBatch",
+    "decode_physio_frames",
+    "decode_physio_ndjson",
+    "encode_physio_frames",
+    "physio_batch_from_columns",
+    "validate_physio_batch",
+]
@@ -0,0 +1,153 @@
+"""Running physio features that update per ingest batch.
+
+``OnlinePhysioFeatures`` keeps the sums behind RMSSD, mean RR/heart rate and
+breath rate, and a Welford count, mean and M2 for EDA (merged per batch, so the
+SD does not cancel catastrophically on large tonic levels), so reading them is
+O(1) however long the session is. RMSSD
+carries the last RR interval across batches, so it equals
+``compute_hrv_rmssd`` over the whole series. LF/HF is not additive. It is
+computed on demand over the latest ``window_seconds`` of RR intervals in the
+session's ``PhysioBuffer``; ``lf_hf_window`` copies just that window so the
+spectrum can be computed after the session lock is released. The accumulator
+round-trips through a plain dict so it can live in JSON session state.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from corescope.core_frequency.body_resonance import HrvSpectralMethod, estimate_lf_hf
+from .buffer import PhysioBuffer
+from .ingest import RR_INTERVAL_RANGE_MS
+
+
+DEFAULT_LF_HF_WINDOW_SECONDS = 120.0
+
+
+@dataclass
+class OnlinePhysioFeatures:
+    rr_count: int = 0
+    rr_sum: float = 0.0
+    diff_count: int = 0
+    diff_square_sum: float = 0.0
+    last_rr: Optional[float] = None
+    eda_count: int = 0
+    eda_running_mean: float = 0.0
+    eda_m2: float = 0.0
+    eda_first: Optional[float] = None
+    eda_last: Optional[float] = None
+    breath_count: int = 0
+    breath_sum: float = 0.0
+
+    def update(self, rr_intervals: np.ndarray, eda: Optional[np.ndarray] = None, breath_rate: Optional[np.ndarray] = None) -> None:
+        """Fold in one batch; NaN marks a missing EDA or breath value."""
+        rr = np.asarray(rr_intervals, dtype=np.float64)
+        if rr.size:
+            chained = rr if self.last_rr is None else np.concatenate(([self.last_rr], rr))
+            diffs = np.diff(chained)
+            self.diff_count += int(diffs.size)
+            self.diff_square_sum += float(np.dot(diffs, diffs))
+            self.rr_count += int(rr.size)
+            self.rr_sum += float(rr.sum())
+            self.last_rr = float(rr[-1])
+        if eda is not None:
+            values = np.asarray(eda, dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if values.size:
+                # Chan et al.'s pairwise merge of the batch's own mean and M2.
+                count = self.eda_count + values.size
+                batch_mean = float(values.mean())
+                delta = batch_mean - self.eda_running_mean
+                self.eda_m2 += float(np.sum((values - batch_mean) ** 2)) + delta * delta * self.eda_count * values.size / count
+                self.eda_running_mean += delta * values.size / count
+                self.eda_count = int(count)
+                if self.eda_first is None:
+                    self.eda_first = float(values[0])
+                self.eda_last = float(values[-1])
+        if breath_rate is not None:
+            values = np.asarray(breath_rate, dtype=np.float64)
+            values = values[~np.isnan(values)]
+            self.breath_count += int(values.size)
+            self.breath_sum += float(values.sum())
+
+    @property
+    def rmssd(self) -> Optional[float]:
+        return float(np.sqrt(self.diff_square_sum / self.diff_count)) if self.diff_count else None
+
+    @property
+    def mean_rr(self) -> Optional[float]:
+        return self.rr_sum / self.rr_count if self.rr_count else None
+
+    @property
+    def mean_hr(self) -> Optional[float]:
+        mean_rr = self.mean_rr
+        return 60000.0 / mean_rr if mean_rr else None
+
+    @property
+    def eda_mean(self) -> Optional[float]:
+        return self.eda_running_mean if self.eda_count else None
+
+    @property
+    def eda_sd(self) -> Optional[float]:
+        return float(np.sqrt(self.eda_m2 / self.eda_count)) if self.eda_count else None
+
+    @property
+    def eda_drift(self) -> Optional[float]:
+        if self.eda_first is None or self.eda_last is None:
+            return None
+        return self.eda_last - self.eda_first
+
+    @property
+    def breath_rate_mean(self) -> Optional[float]:
+        return self.breath_sum / self.breath_count if self.breath_count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: Optional[Dict[str, Any]]) -> "OnlinePhysioFeatures":
+        if not payload:
+            return cls()
+        if "eda_sum" in payload:
+            # Session state stored before EDA moved to Welford updates.
+            payload = dict(payload)
+            total, squares, count = payload.pop("eda_sum"), payload.pop("eda_square_sum"), payload["eda_count"]
+            mean = total / count if count else 0.0
+            payload.update(eda_running_mean=mean, eda_m2=max(0.0, squares - count * mean * mean))
+        return cls(**payload)
+
+
+def lf_hf_window(buffer: PhysioBuffer, window_seconds: float = DEFAULT_LF_HF_WINDOW_SECONDS, fs: float = 4.0) -> Optional[np.ndarray]:
+    """Copy of the RR intervals that span the latest ``window_seconds``, or ``None`` if too short.
+
+    Only the newest beats are read (ingest rejects intervals under 200 ms), so
+    the cost does not grow with the session.
+    """
+    series = buffer.series()
+    if series is None:
+        return None
+    rr = series.rr_intervals[-(int(window_seconds * 1000.0 / RR_INTERVAL_RANGE_MS[0]) + 2) :]
+    # Beats are counted back from the newest until their durations fill the window.
+    elapsed = np.cumsum(rr[::-1]) / 1000.0
+    count = int(np.searchsorted(elapsed, window_seconds, side="right")) + 1
+    tail = rr[-min(count, rr.size) :]
+    if tail.size < 2 or (tail[1:].sum() / 1000.0) * fs < 2:
+        return None
+    return tail.copy()
+
+
+def windowed_lf_hf(
+    buffer: PhysioBuffer,
+    window_seconds: float = DEFAULT_LF_HF_WINDOW_SECONDS,
+    fs: float = 4.0,
+    method: HrvSpectralMethod = "fft",
+) -> Optional[Tuple[float, float, float]]:
+    """LF/HF over the RR intervals that span the latest ``window_seconds``."""
+    tail = lf_hf_window(buffer, window_seconds, fs)
+    return estimate_lf_hf(tail, fs=fs, method=method) if tail is not None else None
+
+
+__all__ = ["DEFAULT_LF_HF_WINDOW_SECONDS", "OnlinePhysioFeatures", "lf_hf_window", "windowed_lf_hf"]
@@ -0,0 +1,89 @@
+"""Reactivity metrics derived from phase-tagged physio samples.
+
+Ingest tags every sample with the scan phase that was active when it arrived
+(see ``PhysioBuffer.phases``). ``derive_reactivity`` reduces each phase with
+``np.bincount``, one pass per quantity for all phases together:
+
+* HRV is the RMSSD of successive RR intervals that share a phase, so a diff is
+  never taken across a phase change;
+* EDA and breath are means over valid samples only;
+* the recovery index is the fraction of the baseline-to-challenge RMSSD drop
+  that the recovery phase regains, clipped to 0-1. It is 1 when HRV did not
+  drop under challenge, and ``None`` before any recovery data.
+
+Samples ingested before the first phase started are untagged and ignored.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from corescope.core_frequency.models import ReactivityMetrics
+from .buffer import PhysioBuffer
+
+
+UNTAGGED_PHASE = 0
+PHASE_CODES: Dict[str, int] = {"baseline": 1, "challenge": 2, "recovery": 3}
+_PHASE_SLOTS = max(PHASE_CODES.values()) + 1
+
+
+def phase_code(phase: Optional[str]) -> int:
+    return PHASE_CODES.get(phase, UNTAGGED_PHASE) if phase else UNTAGGED_PHASE
+
+
+def _phase_means(codes: np.ndarray, values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    counts = np.bincount(codes[valid], minlength=_PHASE_SLOTS)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=_PHASE_SLOTS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _phase_rmssd(codes: np.ndarray, rr: np.ndarray) -> np.ndarray:
+    same = codes[1:] == codes[:-1]
+    return np.sqrt(_phase_means(codes[1:], np.diff(rr) ** 2, same))
+
+
+def _optional(values: np.ndarray, phase: str) -> Optional[float]:
+    value = values[PHASE_CODES[phase]]
+    return None if np.isnan(value) else float(value)
+
+
+def derive_reactivity(buffer: Optional[PhysioBuffer]) -> Optional[ReactivityMetrics]:
+    """``ReactivityMetrics`` from the stored series, or ``None`` without baseline and challenge HRV."""
+    if buffer is None or len(buffer) < 2:
+        return None
+    series = buffer.series()
+    codes = buffer.phases.astype(np.intp)
+    rmssd = _phase_rmssd(codes, series.rr_intervals)
+    baseline_hrv = _optional(rmssd, "baseline")
+    challenge_hrv = _optional(rmssd, "challenge")
+    if baseline_hrv is None or challenge_hrv is None:
+        return None
+    recovery_hrv = _optional(rmssd, "recovery")
+
+    eda = _phase_means(codes, series.eda, buffer.eda_valid) if series.eda is not None else np.full(_PHASE_SLOTS, np.nan)
+    breath = (
+        _phase_means(codes, series.breath_rate, buffer.breath_valid)
+        if series.breath_rate is not None
+        else np.full(_PHASE_SLOTS, np.nan)
+    )
+
+    recovery_index = None
+    if recovery_hrv is not None:
+        drop = baseline_hrv - challenge_hrv
+        recovery_index = 1.0 if drop <= 0 else float(np.clip((recovery_hrv - challenge_hrv) / drop, 0.0, 1.0))
+
+    return ReactivityMetrics(
+        baseline_hrv_rmssd=baseline_hrv,
+        challenge_hrv_rmssd=challenge_hrv,
+        baseline_eda_mean=_optional(eda, "baseline"),
+        challenge_eda_mean=_optional(eda, "challenge"),
+        baseline_breath_rate=_optional(breath, "baseline"),
+        challenge_breath_rate=_optional(breath, "challenge"),
+        recovery_index=recovery_index,
+    )
+
+
+__all__ = ["PHASE_CODES", "UNTAGGED_PHASE", "derive_reactivity", "phase_code"]
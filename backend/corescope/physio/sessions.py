@@ -0,0 +1,398 @@
+"""Bounded stores for legacy scan session state.
+
+Sessions expire ``ttl_seconds`` after they were last touched, and the least
+recently used session is evicted once ``max_sessions`` is reached. The
+in-memory store serves a single process. The SQLite store keeps JSON state in
+one file that every uvicorn worker on a host can open. The columnar physio
+buffer is kept as append-only chunks in a table keyed by (session_id, seq): an
+update writes only the samples it appended, never the whole buffer, and reads
+the stored chunks only if it uses more of the buffer than its length and
+``append`` (so per-ingest cost does not grow with the session). Updates run
+inside an immediate transaction, so concurrent appends from different workers
+never lose writes.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .buffer import PhysioBuffer
+
+
+T = TypeVar("T")
+SessionState = Dict[str, Any]
+DEFAULT_SESSION_TTL_SECONDS = 2 * 60 * 60
+DEFAULT_MAX_SESSIONS = 10_000
+# Stands in for the physio buffer in the SQLite state JSON.
+PHYSIO_MARKER = "__physio__"
+
+
+class SessionStore(ABC):
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = DEFAULT_SESSION_TTL_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+
+    @abstractmethod
+    def create(self, session_id: str, state: SessionState) -> None:
+        """Store a new session, evicting expired and then least recently used ones."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Return a copy of the session state, or ``None`` if unknown or expired."""
+
+    @abstractmethod
+    def read(self, session_id: str, view: Callable[[SessionState], T]) -> T:
+        """Apply read-only ``view`` to the state without copying it; raises ``KeyError`` if unknown.
+
+        ``view`` must not mutate the state and should only take what it needs
+        (the in-memory store runs it under its lock).
+        """
+
+    @abstractmethod
+    def update(self, session_id: str, mutate: Callable[[SessionState], T]) -> T:
+        """Apply ``mutate`` to the state atomically; raises ``KeyError`` if unknown."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def session_ids(self) -> List[str]:
+        """Identifiers of the sessions that have not expired."""
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __contains__(self, session_id: object) -> bool:
+        if not isinstance(session_id, str):
+            return False
+        try:
+            return self.read(session_id, lambda _state: True)
+        except KeyError:
+            return False
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, **limits: Any) -> None:
+        super().__init__(**limits)
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Tuple[float, SessionState]]" = OrderedDict()
+
+    def _live(self, session_id: str, now: float) -> Optional[SessionState]:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._sessions[session_id]
+            return None
+        return entry[1]
+
+    def _purge(self, now: float) -> int:
+        expired = [key for key, (expires_at, _) in self._sessions.items() if expires_at <= now]
+        for key in expired:
+            del self._sessions[key]
+        return len(expired)
+
+    def create(self, session_id: str, state: SessionState) -> None:
+        with self._lock:
+            now = self.clock()
+            self._purge(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session_id] = (now + self.ttl_seconds, copy.deepcopy(state))
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            state = self._live(session_id, self.clock())
+            return copy.deepcopy(state) if state is not None else None
+
+    def read(self, session_id: str, view: Callable[[SessionState], T]) -> T:
+        with self._lock:
+            state = self._live(session_id, self.clock())
+            if state is None:
+                raise KeyError(session_id)
+            return view(state)
+
+    def update(self, session_id: str, mutate: Callable[[SessionState], T]) -> T:
+        with self._lock:
+            now = self.clock()
+            state = self._live(session_id, now)
+            if state is None:
+                raise KeyError(session_id)
+            result = mutate(state)
+            self._sessions[session_id] = (now + self.ttl_seconds, state)
+            self._sessions.move_to_end(session_id)
+            return result
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def session_ids(self) -> List[str]:
+        with self._lock:
+            self._purge(self.clock())
+            return sorted(self._sessions)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._purge(self.clock())
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._purge(self.clock())
+            return len(self._sessions)
+
+
+class _StoredPhysio:
+    """A stored session's physio buffer, decoded from its chunks only when needed.
+
+    Appends are held apart from the stored samples; any other use loads the
+    chunks once and carries on with the full ``PhysioBuffer``.
+    """
+
+    def __init__(self, load: Callable[[], List[bytes]], stored: int) -> None:
+        self._load = load
+        self.stored = stored
+        self._appended = PhysioBuffer(capacity=64)
+        self._buffer: Optional[PhysioBuffer] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer) if self._buffer is not None else self.stored + len(self._appended)
+
+    def append(self, *args: Any, **kwargs: Any) -> int:
+        return (self._buffer if self._buffer is not None else self._appended).append(*args, **kwargs)
+
+    def buffer(self) -> PhysioBuffer:
+        if self._buffer is None:
+            chunks = self._load()
+            if len(self._appended):
+                chunks.append(self._appended.to_bytes())
+            self._buffer = PhysioBuffer.from_chunks(chunks)
+        return self._buffer
+
+    def appended_bytes(self) -> bytes:
+        """The samples appended since loading, as one chunk."""
+        return self._buffer.to_bytes(self.stored) if self._buffer is not None else self._appended.to_bytes()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.buffer(), name)
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: Path, **limits: Any) -> None:
+        super().__init__(**limits)
+        self.path = path
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(self.path, timeout=10.0, isolation_level=None)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " state TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " touched_at REAL NOT NULL"
+                ")"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS physio_chunks ("
+                " session_id TEXT NOT NULL REFERENCES sessions (session_id) ON DELETE CASCADE,"
+                " seq INTEGER NOT NULL,"
+                " payload BLOB NOT NULL,"
+                " PRIMARY KEY (session_id, seq)"
+                ")"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at_idx ON sessions (expires_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_touched_at_idx ON sessions (touched_at)")
+            yield connection
+
+    @staticmethod
+    def _chunks(connection: sqlite3.Connection, session_id: str) -> List[bytes]:
+        rows = connection.execute("SELECT payload FROM physio_chunks WHERE session_id = ? ORDER BY seq", (session_id,))
+        return [payload for (payload,) in rows]
+
+    @staticmethod
+    def _stored_count(connection: sqlite3.Connection, session_id: str) -> int:
+        row = connection.execute(
+            "SELECT seq, payload FROM physio_chunks WHERE session_id = ? ORDER BY seq DESC LIMIT 1", (session_id,)
+        ).fetchone()
+        return int(row[0]) + PhysioBuffer.chunk_length(row[1]) if row is not None else 0
+
+    def _load(self, connection: sqlite3.Connection, session_id: str, now: float, *, lazy: bool = False) -> Optional[Tuple[SessionState, Optional[_StoredPhysio]]]:
+        row = connection.execute(
+            "SELECT state FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, now),
+        ).fetchone()
+        if row is None:
+            return None
+        state = json.loads(row[0])
+        physio = None
+        if state.pop(PHYSIO_MARKER, None) is not None:
+            if lazy:
+                physio = _StoredPhysio(lambda: self._chunks(connection, session_id), self._stored_count(connection, session_id))
+                state["physio"] = physio
+            else:
+                state["physio"] = PhysioBuffer.from_chunks(self._chunks(connection, session_id))
+        return state, physio
+
+    @staticmethod
+    def _store(
+        connection: sqlite3.Connection,
+        session_id: str,
+        state: SessionState,
+        loaded: Optional[_StoredPhysio],
+    ) -> str:
+        """Write the physio appended since loading; return the state JSON without it."""
+        physio = state.get("physio")
+        # A chunk's seq is the index of its first sample.
+        if loaded is not None and physio is loaded:
+            if len(loaded) > loaded.stored:
+                connection.execute(
+                    "INSERT INTO physio_chunks (session_id, seq, payload) VALUES (?, ?, ?)",
+                    (session_id, loaded.stored, loaded.appended_bytes()),
+                )
+        elif isinstance(physio, PhysioBuffer):
+            # A replaced buffer is rewritten from scratch.
+            connection.execute("DELETE FROM physio_chunks WHERE session_id = ?", (session_id,))
+            if len(physio):
+                connection.execute(
+                    "INSERT INTO physio_chunks (session_id, seq, payload) VALUES (?, 0, ?)", (session_id, physio.to_bytes())
+                )
+        else:
+            connection.execute("DELETE FROM physio_chunks WHERE session_id = ?", (session_id,))
+            return json.dumps(state)
+        return json.dumps({**{key: value for key, value in state.items() if key != "physio"}, PHYSIO_MARKER: True})
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def create(self, session_id: str, state: SessionState) -> None:
+        now = self.clock()
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            (count,) = connection.execute("SELECT COUNT(*) FROM sessions").fetchone()
+            overflow = int(count) - self.max_sessions + 1
+            if overflow > 0:
+                connection.execute(
+                    "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM sessions ORDER BY touched_at LIMIT ?)",
+                    (overflow,),
+                )
+            connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            connection.execute(
+                "INSERT INTO sessions (session_id, state, expires_at, touched_at) VALUES (?, '{}', ?, ?)",
+                (session_id, now + self.ttl_seconds, now),
+            )
+            text = self._store(connection, session_id, state, None)
+            connection.execute("UPDATE sessions SET state = ? WHERE session_id = ?", (text, session_id))
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        with self._connect() as connection:
+            loaded = self._load(connection, session_id, self.clock())
+        return loaded[0] if loaded else None
+
+    def read(self, session_id: str, view: Callable[[SessionState], T]) -> T:
+        state = self.get(session_id)
+        if state is None:
+            raise KeyError(session_id)
+        return view(state)
+
+    def update(self, session_id: str, mutate: Callable[[SessionState], T]) -> T:
+        now = self.clock()
+        with self._transaction() as connection:
+            loaded = self._load(connection, session_id, now, lazy=True)
+            if loaded is None:
+                raise KeyError(session_id)
+            state, physio = loaded
+            result = mutate(state)
+            connection.execute(
+                "UPDATE sessions SET state = ?, expires_at = ?, touched_at = ? WHERE session_id = ?",
+                (self._store(connection, session_id, state, physio), now + self.ttl_seconds, now, session_id),
+            )
+        return result
+
+    def delete(self, session_id: str) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def session_ids(self) -> List[str]:
+        with self._connect() as connection:
+            rows = connection.execute("SELECT session_id FROM sessions WHERE expires_at > ? ORDER BY session_id", (self.clock(),))
+            return [session_id for (session_id,) in rows]
+
+    def purge_expired(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (self.clock(),)).rowcount
+
+    def __contains__(self, session_id: object) -> bool:
+        if not isinstance(session_id, str):
+            return False
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ? AND expires_at > ?", (session_id, self.clock())
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (self.clock(),)).fetchone()
+        return int(count)
+
+
+def build_session_store() -> SessionStore:
+    """Store selected by ``SOULSCOPE_SESSION_STORE`` (``memory`` by default, or ``sqlite``)."""
+    kind = os.getenv("SOULSCOPE_SESSION_STORE", "memory").strip().lower() or "memory"
+    limits = {
+        "ttl_seconds": float(os.getenv("SOULSCOPE_SESSION_TTL_SECONDS", str(DEFAULT_SESSION_TTL_SECONDS))),
+        "max_sessions": int(os.getenv("SOULSCOPE_SESSION_MAX", str(DEFAULT_MAX_SESSIONS))),
+    }
+    if kind == "memory":
+        return InMemorySessionStore(**limits)
+    if kind == "sqlite":
+        return SQLiteSessionStore(Path(os.getenv("SOULSCOPE_SESSION_DB", "backend/.sessions.sqlite3")), **limits)
+    raise RuntimeError(f"Unknown SOULSCOPE_SESSION_STORE: {kind}")
+
+
+__all__ = [
+    "DEFAULT_MAX_SESSIONS",
+    "DEFAULT_SESSION_TTL_SECONDS",
+    "InMemorySessionStore",
+    "SQLiteSessionStore",
+    "SessionState",
+    "SessionStore",
+    "build_session_store",
+]
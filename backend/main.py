@@ -1,25 +1,125 @@
 # backend/main.py
+import asyncio
+import importlib
 import json
 import os
+import sys
+import time
+from contextlib import asynccontextmanager, suppress
+from dataclasses import asdict
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, List, Literal, Optional
+from logging import getLogger
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Optional, Tuple, Type, TypeVar
 from uuid import uuid4
 
 import numpy as np
 import httpx
-from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile
+from fastapi import FastAPI, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-
-from corescope.audio.acoustic_contract import AcousticAnalysisResponse, CaptureKind
-from corescope.audio.acoustic_extractor import analyze_upload_file
-from corescope.core_frequency.models import (
-    PhysioTimeSeries,
-    ReactivityMetrics,
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from corescope.audio.acoustic_contract import AcousticAnalysisResponse, CaptureKind, StreamingFeatureSnapshot
+from corescope.audio.storage import build_canonical_audio_store
+from corescope.audio.stream_registry import build_stream_registry
+from corescope.engine.baselines import build_baseline_store
+from corescope.engine.contracts import EvidenceLedger, ScanEvidenceLedger
+from corescope.engine.evidence import merge_evidence_ledgers
+from corescope.physio.buffer import PhysioBuffer
+from corescope.physio.ingest import (
+    PHYSIO_FRAMES_CONTENT_TYPE,
+    PHYSIO_NDJSON_CONTENT_TYPE,
+    PhysioBatch,
+    decode_physio_frames,
+    decode_physio_ndjson,
+    physio_batch_from_columns,
+    validate_physio_batch,
 )
+from corescope.core_frequency.body_resonance import estimate_lf_hf
+from corescope.physio.online import OnlinePhysioFeatures, lf_hf_window
+from corescope.physio.reactivity import derive_reactivity, phase_code
+from corescope.physio.sessions import SessionState, build_session_store
+
+logger = getLogger(__name__)
+
+if TYPE_CHECKING:
+    from corescope.audio.streaming import StreamingAnalysisSession
+
+# Praat, SciPy, soundfile and webrtcvad load with these modules. They are
+# imported on first use (or by the startup warmup) so the app, and /healthz,
+# come up before them.
+ANALYSIS_MODULES = ("corescope.audio.acoustic_extractor", "corescope.audio.streaming")
+
 
-app = FastAPI()
+def _load_analysis_modules() -> None:
+    for name in ANALYSIS_MODULES:
+        importlib.import_module(name)
+
+
+def _analysis_modules_loaded() -> bool:
+    return all(name in sys.modules for name in ANALYSIS_MODULES)
+
+
+def _warm_up_analysis() -> None:
+    """Import and exercise the analysis path once; /readyz reports ready afterwards."""
+    started = time.perf_counter()
+    try:
+        _load_analysis_modules()
+        from corescope.audio.warmup import warm_analysis
+
+        warm_analysis()
+    except Exception as exc:
+        WARMUP_STATE.update(ready=False, error=type(exc).__name__)
+        return
+    # Imports included: this is what the worker's first request would otherwise pay.
+    WARMUP_STATE.update(ready=True, seconds=time.perf_counter() - started, error=None)
+
+
+def _sweep_expired() -> None:
+    from corescope.audio.acoustic_extractor import cleanup_expired_private_audio
+
+    cleanup_expired_private_audio(PRIVATE_AUDIO_ROOT, store=AUDIO_STORE)
+    SESSION_STORE.purge_expired()
+    ACOUSTIC_STREAMS.purge_expired()
+
+
+async def _retention_sweeper() -> None:
+    """Periodically pop expired canonical audio, scan sessions and idle streams."""
+    while True:
+        try:
+            await asyncio.to_thread(_sweep_expired)
+        except Exception:
+            # A failed sweep must never take the API down; the next one retries,
+            # but a sweep that keeps failing means expired audio is being kept.
+            logger.exception("Retention sweep failed")
+        await asyncio.sleep(RETENTION_SWEEP_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if ACOUSTIC_STREAMING and WEB_WORKERS > 1:
+        # Streams live in one worker's memory; chunks routed elsewhere would 404.
+        logger.warning("Live acoustic streaming is enabled with %d workers; chunks must reach the worker that started the stream", WEB_WORKERS)
+    # Shard directories are created once here rather than per request.
+    await asyncio.to_thread(AUDIO_STORE.prepare)
+    WARMUP_STATE.update(ready=not WARMUP_ANALYSIS, seconds=None, error=None)
+    warmup = asyncio.create_task(asyncio.to_thread(_warm_up_analysis)) if WARMUP_ANALYSIS else None
+    sweeper = asyncio.create_task(_retention_sweeper()) if RETENTION_SWEEP_SECONDS > 0 else None
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            # The warmup thread itself cannot be interrupted; only the task is dropped.
+            warmup.cancel()
+        if sweeper is not None:
+            sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await sweeper
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow local development, the production frontend, and Vercel preview deployments.
 # Preview URLs change per deployment, so use a constrained regex rather than manually
@@ -45,6 +145,15 @@ app.add_middleware(
 )
 
 PRIVATE_AUDIO_ROOT = Path(os.getenv("SOULSCOPE_PRIVATE_AUDIO_ROOT", "backend/.private_audio"))
+AUDIO_STORE = build_canonical_audio_store(PRIVATE_AUDIO_ROOT)
+BASELINE_STORE = build_baseline_store()
+# Opt-in: open streams are process-local, so every chunk of a stream must be
+# routed to the process that started it.
+ACOUSTIC_STREAMING = os.getenv("SOULSCOPE_ACOUSTIC_STREAMING", "false").lower() == "true"
+WEB_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1") or "1")
+RETENTION_SWEEP_SECONDS = float(os.getenv("SOULSCOPE_RETENTION_SWEEP_SECONDS", "900"))
+WARMUP_ANALYSIS = os.getenv("SOULSCOPE_WARMUP_ANALYSIS", "true").lower() != "false"
+WARMUP_STATE: Dict[str, Any] = {"ready": not WARMUP_ANALYSIS, "seconds": None, "error": None}
 REQUIRE_SUPABASE_AUTH = os.getenv("SOULSCOPE_REQUIRE_SUPABASE_AUTH", "true").lower() != "false"
 SUPABASE_URL = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY") or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
@@ -109,6 +218,36 @@ async def _verify_scan_ownership(scan_id: str, user_id: str, authorization: Opti
         raise HTTPException(status_code=403, detail="Scan is not owned by the authenticated user")
 
 
+# ---------------------------------------------------------------------------
+# Health
+# ---------------------------------------------------------------------------
+@app.get("/healthz")
+def healthz():
+    """Liveness; answers before the acoustic analysis modules have loaded."""
+    return {"status": "ok", "analysis_loaded": _analysis_modules_loaded()}
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness; 503 until this worker has finished its analysis warmup."""
+    if not WARMUP_STATE["ready"]:
+        detail = "Analysis warmup failed" if WARMUP_STATE["error"] else "Analysis warmup in progress"
+        raise HTTPException(status_code=503, detail=detail)
+    return {"status": "ready", "warmup_seconds": WARMUP_STATE["seconds"]}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Per-worker gauges in the Prometheus text format."""
+    lines = [
+        "# TYPE soulscope_ready gauge",
+        f"soulscope_ready {int(bool(WARMUP_STATE['ready']))}",
+    ]
+    if WARMUP_STATE["seconds"] is not None:
+        lines += ["# TYPE soulscope_warmup_seconds gauge", f"soulscope_warmup_seconds {WARMUP_STATE['seconds']:.6f}"]
+    return "\n".join(lines) + "\n"
+
+
 # ---------------------------------------------------------------------------
 # Sensor + Session bootstrap
 # ---------------------------------------------------------------------------
@@ -125,6 +264,7 @@ class SensorPreview(BaseModel):
     hrv_rmssd: float
     eda_drift: float
     breath_rate: Optional[float] = None
+    lf_hf_ratio: Optional[float] = None
 
 
 class SensorCheckResponse(BaseModel):
@@ -134,17 +274,61 @@ class SensorCheckResponse(BaseModel):
     session_id: str
 
 
-SESSIONS: Dict[str, Dict] = {}
+SESSION_STORE = build_session_store()
+MAX_PHYSIO_SAMPLES_PER_SESSION = int(os.getenv("SOULSCOPE_SESSION_MAX_PHYSIO_SAMPLES", "100000"))
+T = TypeVar("T")
+
+
+def _update_session(session_id: str, mutate: Callable[[SessionState], T]) -> T:
+    try:
+        return SESSION_STORE.update(session_id, mutate)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Unknown session") from exc
+
+
+def _physio_snapshot(state: SessionState) -> Optional[PhysioBuffer]:
+    physio = state.get("physio")
+    return physio.copy() if physio is not None else None
+
+
+def _preview_inputs(state: SessionState) -> Tuple[OnlinePhysioFeatures, Optional[np.ndarray]]:
+    """Snapshot what a preview needs; cheap enough to run inside a session update."""
+    return OnlinePhysioFeatures.from_dict(state.get("physio_features")), lf_hf_window(state["physio"])
+
+
+def _live_preview(inputs: Tuple[OnlinePhysioFeatures, Optional[np.ndarray]]) -> Optional[SensorPreview]:
+    """Current running values for a session, or ``None`` before enough RR data."""
+    features, rr_window = inputs
+    if features.mean_hr is None or features.rmssd is None:
+        return None
+    # The spectrum runs after the session store's lock has been released.
+    lf_hf = estimate_lf_hf(rr_window, fs=4.0) if rr_window is not None else None
+    return SensorPreview(
+        heart_rate=int(round(features.mean_hr)),
+        hrv_rmssd=features.rmssd,
+        eda_drift=features.eda_drift or 0.0,
+        breath_rate=features.breath_rate_mean,
+        lf_hf_ratio=float(lf_hf[2]) if lf_hf is not None and np.isfinite(lf_hf[2]) else None,
+    )
 
 
 @app.post("/api/sensors/check", response_model=SensorCheckResponse)
-def check_sensors():
-    session_id = uuid4().hex
-    SESSIONS[session_id] = {
-        "physio": [],
-        "voice_prompts": [],
-        "reactivity": {},
-    }
+def check_sensors(session_id: Optional[str] = None):
+    """Open a session, or preview the running values of an existing one."""
+    live = None
+    if session_id is not None:
+        live = _live_preview(_update_session(session_id, _preview_inputs))
+    else:
+        session_id = uuid4().hex
+        SESSION_STORE.create(
+            session_id,
+            {
+                "physio": PhysioBuffer(),
+                "physio_features": OnlinePhysioFeatures().to_dict(),
+                "voice_prompts": [],
+                "reactivity": {},
+            },
+        )
     sensors = {
         "heart": SensorSnapshot(
             status="stable",
@@ -159,7 +343,7 @@ def check_sensors():
             detail="Mic + accelerometer breath cadence detected.",
         ),
     }
-    preview = SensorPreview(
+    preview = live or SensorPreview(
         heart_rate=72,
         hrv_rmssd=41.0,
         eda_drift=0.12,
@@ -190,6 +374,7 @@ class PhaseStartResponse(BaseModel):
     duration_seconds: int
     started_at: datetime
     instructions: str
+    preview: Optional[SensorPreview] = None
 
 
 PHASE_DEFAULTS: Dict[PhaseLiteral, int] = {
@@ -209,16 +394,20 @@ PHASE_INSTRUCTIONS: Dict[PhaseLiteral, str] = {
 def start_phase(phase: PhaseLiteral, payload: PhaseStartRequest):
     if phase not in PHASE_DEFAULTS:
         raise HTTPException(status_code=404, detail="Unknown phase")
-    if payload.session_id not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Unknown session")
     duration = payload.duration_seconds or PHASE_DEFAULTS[phase]
-    SESSIONS[payload.session_id]["current_phase"] = phase
+
+    def begin(state: SessionState) -> Tuple[OnlinePhysioFeatures, Optional[np.ndarray]]:
+        state["current_phase"] = phase
+        return _preview_inputs(state)
+
+    preview = _live_preview(_update_session(payload.session_id, begin))
     return PhaseStartResponse(
         session_id=payload.session_id,
         phase=phase,
         duration_seconds=duration,
         started_at=datetime.now(timezone.utc),
         instructions=PHASE_INSTRUCTIONS[phase],
+        preview=preview,
     )
 
 
@@ -238,11 +427,12 @@ class VoiceClipResponse(BaseModel):
 
 @app.post("/api/voice-clips", response_model=VoiceClipResponse)
 def save_voice_clip(payload: VoiceClipRequest):
-    if payload.session_id not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Unknown session")
     clip_id = f"clip_{uuid4().hex}"
-    SESSIONS[payload.session_id]["voice_prompts"].append(
-        {"prompt": payload.prompt_label, "script": payload.script, "clip_id": clip_id}
+    _update_session(
+        payload.session_id,
+        lambda state: state["voice_prompts"].append(
+            {"prompt": payload.prompt_label, "script": payload.script, "clip_id": clip_id}
+        ),
     )
     return VoiceClipResponse(clip_id=clip_id)
 
@@ -254,6 +444,9 @@ async def analyze_voice_audio(
     source_capture_id: str = Form(...),
     capture_kind: CaptureKind = Form(...),
     device_metadata: str = Form("{}"),
+    extraction_mode: Literal["whole_capture", "vad_segments"] = Form("whole_capture"),
+    prior_pitch_floor_hz: Optional[float] = Form(None),
+    prior_pitch_ceiling_hz: Optional[float] = Form(None),
     authorization: Optional[str] = Header(default=None),
 ):
     user_id = await _authenticate_user(authorization)
@@ -272,24 +465,161 @@ async def analyze_voice_audio(
     if not isinstance(metadata, dict):
         raise HTTPException(status_code=400, detail="Device metadata must be an object")
     upload_bytes = await file.read()
+    from corescope.audio.acoustic_extractor import analyze_upload_file
+
     try:
         return analyze_upload_file(
             upload_bytes,
             filename=file.filename or "capture",
             content_type=content_type,
             private_root=PRIVATE_AUDIO_ROOT,
+            store=AUDIO_STORE,
+            baseline_store=BASELINE_STORE,
             user_id=user_id,
             scan_id=scan_id,
             source_capture_id=source_capture_id,
             capture_kind=capture_kind,
             device_metadata=metadata,
+            segmented=extraction_mode == "vad_segments",
+            # A range reported by an earlier capture of this user skips the
+            # pitch pre-pass; both bounds are needed.
+            prior_pitch_range=(
+                (prior_pitch_floor_hz, prior_pitch_ceiling_hz)
+                if prior_pitch_floor_hz is not None and prior_pitch_ceiling_hz is not None
+                else None
+            ),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail="Canonical acoustic analysis failed") from exc
+
+
+# ---------------------------------------------------------------------------
+# Live acoustic capture streaming
+# ---------------------------------------------------------------------------
+class AcousticStreamStartResponse(BaseModel):
+    stream_id: str
+    sample_rate_hz: int = 16000
+    encoding: Literal["pcm_s16le"] = "pcm_s16le"
+
+
+class AcousticStreamChunkResponse(BaseModel):
+    stream_id: str
+    received_ms: int
+    snapshot: Optional[StreamingFeatureSnapshot] = None
+
+
+ACOUSTIC_STREAMS = build_stream_registry()
+
+
+async def _owned_stream(stream_id: str, authorization: Optional[str]) -> "StreamingAnalysisSession":
+    user_id = await _authenticate_user(authorization)
+    stream = ACOUSTIC_STREAMS.get(stream_id)
+    if stream is None or stream.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Unknown acoustic stream")
+    return stream
+
+
+@app.post("/api/acoustic/stream", response_model=AcousticStreamStartResponse)
+async def start_acoustic_stream(
+    scan_id: str = Form(...),
+    source_capture_id: str = Form(...),
+    capture_kind: CaptureKind = Form(...),
+    device_metadata: str = Form("{}"),
+    prior_pitch_floor_hz: Optional[float] = Form(None),
+    prior_pitch_ceiling_hz: Optional[float] = Form(None),
+    authorization: Optional[str] = Header(default=None),
+):
+    if not ACOUSTIC_STREAMING:
+        raise HTTPException(status_code=503, detail="Live acoustic streaming is disabled")
+    user_id = await _authenticate_user(authorization)
+    await _verify_scan_ownership(scan_id, user_id, authorization)
+    try:
+        metadata = json.loads(device_metadata) if device_metadata else {}
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail="Invalid device metadata") from exc
+    if not isinstance(metadata, dict):
+        raise HTTPException(status_code=400, detail="Device metadata must be an object")
+    from corescope.audio.streaming import StreamingAnalysisSession
+
+    stream_id = uuid4().hex
+    location = AUDIO_STORE.allocate(user_id, scan_id, source_capture_id)
+    try:
+        stream = StreamingAnalysisSession(
+            stream_id=stream_id,
+            location=location,
+            scan_id=scan_id,
+            user_id=user_id,
+            source_capture_id=source_capture_id,
+            capture_kind=capture_kind,
+            device_metadata=metadata,
+            prior_pitch_range=(
+                (prior_pitch_floor_hz, prior_pitch_ceiling_hz)
+                if prior_pitch_floor_hz is not None and prior_pitch_ceiling_hz is not None
+                else None
+            ),
+            store=AUDIO_STORE,
+            baseline_store=BASELINE_STORE,
         )
+    except ValueError as exc:
+        AUDIO_STORE.release(location)
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    ACOUSTIC_STREAMS.add(stream_id, stream)
+    return AcousticStreamStartResponse(stream_id=stream_id)
+
+
+@app.post("/api/acoustic/stream/{stream_id}/chunks", response_model=AcousticStreamChunkResponse)
+async def append_acoustic_stream_chunk(
+    stream_id: str,
+    chunk: UploadFile = File(...),
+    authorization: Optional[str] = Header(default=None),
+):
+    stream = await _owned_stream(stream_id, authorization)
+    payload = await chunk.read()
+    try:
+        # Snapshots run Praat; keep it off the event loop.
+        snapshot = await asyncio.to_thread(stream.append_pcm, payload)
+    except ValueError as exc:
+        ACOUSTIC_STREAMS.pop(stream_id)
+        stream.abandon()
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    return AcousticStreamChunkResponse(stream_id=stream_id, received_ms=stream.received_ms, snapshot=snapshot)
+
+
+@app.post("/api/acoustic/stream/{stream_id}/finish", response_model=AcousticAnalysisResponse)
+async def finish_acoustic_stream(stream_id: str, authorization: Optional[str] = Header(default=None)):
+    stream = await _owned_stream(stream_id, authorization)
+    ACOUSTIC_STREAMS.pop(stream_id)
+    try:
+        return await asyncio.to_thread(stream.finish)
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail="Canonical acoustic analysis failed") from exc
 
 
+# ---------------------------------------------------------------------------
+# Scan evidence
+# ---------------------------------------------------------------------------
+class EvidenceMergeRequest(BaseModel):
+    ledgers: List[EvidenceLedger]
+
+
+@app.post("/api/evidence/{scan_id}/merge", response_model=ScanEvidenceLedger)
+async def merge_scan_evidence(
+    scan_id: str,
+    payload: EvidenceMergeRequest,
+    authorization: Optional[str] = Header(default=None),
+):
+    user_id = await _authenticate_user(authorization)
+    await _verify_scan_ownership(scan_id, user_id, authorization)
+    try:
+        return merge_evidence_ledgers(scan_id, payload.ledgers)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
 class PhysioSample(BaseModel):
     timestamp: float
     rr_interval_ms: float
@@ -302,12 +632,101 @@ class PhysioIngestRequest(BaseModel):
     samples: List[PhysioSample] = Field(default_factory=list)
 
 
-@app.post("/api/physio/ingest")
-def ingest_physio(payload: PhysioIngestRequest):
-    if payload.session_id not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Unknown session")
-    SESSIONS[payload.session_id]["physio"].extend(payload.samples)
-    return {"received": len(payload.samples)}
+MAX_PHYSIO_INGEST_BYTES = 8 * 1024 * 1024
+
+
+def _inline_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema of ``model`` with nested models inlined, for ``openapi_extra``."""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+
+    def resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(definitions[node["$ref"].rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(value) for value in node]
+        return node
+
+    return resolve(schema)
+
+
+def _physio_batch_from_json(body: bytes) -> PhysioBatch:
+    try:
+        payload = PhysioIngestRequest.model_validate_json(body)
+    except ValidationError as exc:
+        # Same shape as FastAPI's own body validation errors.
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in exc.errors()], body=body) from exc
+    nan = float("nan")
+    columns = np.array(
+        [
+            (
+                sample.timestamp,
+                sample.rr_interval_ms,
+                nan if sample.eda_micro_siemens is None else sample.eda_micro_siemens,
+                nan if sample.breath_rate_bpm is None else sample.breath_rate_bpm,
+            )
+            for sample in payload.samples
+        ],
+        dtype=np.float64,
+    )
+    return physio_batch_from_columns(payload.session_id, columns)
+
+
+def _append_physio(batch: PhysioBatch) -> None:
+    def append(state: SessionState) -> None:
+        if len(state["physio"]) + len(batch) > MAX_PHYSIO_SAMPLES_PER_SESSION:
+            raise HTTPException(status_code=413, detail="Session physio sample limit reached")
+        state["physio"].append(
+            batch.timestamps,
+            batch.rr_intervals,
+            batch.eda,
+            batch.breath_rate,
+            phase=phase_code(state.get("current_phase")),
+        )
+        features = OnlinePhysioFeatures.from_dict(state.get("physio_features"))
+        features.update(batch.rr_intervals, batch.eda, batch.breath_rate)
+        state["physio_features"] = features.to_dict()
+
+    _update_session(batch.session_id, append)
+
+
+@app.post(
+    "/api/physio/ingest",
+    # The body is read by hand so bulk formats skip JSON parsing; the schema
+    # is declared here so every accepted media type is documented.
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _inline_schema(PhysioIngestRequest)},
+                PHYSIO_NDJSON_CONTENT_TYPE: {"schema": {"type": "string"}},
+                PHYSIO_FRAMES_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def ingest_physio(request: Request):
+    """Accept a JSON ``PhysioIngestRequest`` or a bulk frames/NDJSON body."""
+    content_type = (request.headers.get("content-type") or "application/json").split(";")[0].strip().lower()
+    body = await request.body()
+    if len(body) > MAX_PHYSIO_INGEST_BYTES:
+        raise HTTPException(status_code=413, detail="Physio ingest body too large")
+    try:
+        if content_type == PHYSIO_FRAMES_CONTENT_TYPE:
+            batch = decode_physio_frames(body)
+        elif content_type == PHYSIO_NDJSON_CONTENT_TYPE:
+            batch = decode_physio_ndjson(body)
+        elif content_type == "application/json":
+            batch = _physio_batch_from_json(body)
+        else:
+            raise HTTPException(status_code=415, detail="Unsupported physio ingest content type")
+        validate_physio_batch(batch)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    await asyncio.to_thread(_append_physio, batch)
+    return {"received": len(batch)}
 
 
 class ReactivityUpdate(BaseModel):
@@ -323,18 +742,31 @@ class ReactivityUpdate(BaseModel):
 
 @app.post("/api/reactivity", response_model=ReactivityUpdate)
 def update_reactivity(payload: ReactivityUpdate):
-    if payload.session_id not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Unknown session")
-    SESSIONS[payload.session_id]["reactivity"] = payload.dict()
+    """Legacy client-computed metrics; only used when the stored physio cannot supply them."""
+    _update_session(payload.session_id, lambda state: state.update(reactivity=payload.model_dump()))
     return payload
 
 
+@app.get("/api/reactivity/{session_id}", response_model=ReactivityUpdate)
+def derived_reactivity(session_id: str):
+    """Reactivity computed server-side from the session's phase-tagged physio."""
+    try:
+        # Only the physio is taken; derivation runs outside the store's lock.
+        physio = SESSION_STORE.read(session_id, _physio_snapshot)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Unknown session") from exc
+    metrics = derive_reactivity(physio)
+    if metrics is None:
+        raise HTTPException(status_code=409, detail="Baseline and challenge physio are required")
+    return ReactivityUpdate(session_id=session_id, **asdict(metrics))
+
+
 # ---------------------------------------------------------------------------
 # Final fusion
 # ---------------------------------------------------------------------------
 @app.post("/api/scan/finalize", response_model=CoreFrequencyResponse)
 def finalize_scan(session_id: str):
-    if session_id not in SESSIONS:
+    if session_id not in SESSION_STORE:
         raise HTTPException(status_code=404, detail="Unknown session")
     raise HTTPException(
         status_code=410,
@@ -343,63 +775,3 @@ def finalize_scan(session_id: str):
             "Use /api/acoustic/analyze and the canonical SoulScope report pipeline."
         ),
     )
-
-
-# ---------------------------------------------------------------------------
-# Helpers / mocks
-# ---------------------------------------------------------------------------
-def _build_physio(samples: Optional[List[PhysioSample]]) -> PhysioTimeSeries:
-    if samples:
-        timestamps = np.array([sample.timestamp for sample in samples])
-        rr_intervals = np.array([sample.rr_interval_ms for sample in samples])
-        eda = (
-            np.array([sample.eda_micro_siemens or 0.0 for sample in samples])
-            if any(sample.eda_micro_siemens for sample in samples)
-            else None
-        )
-        breath = (
-            np.array([sample.breath_rate_bpm or 0.0 for sample in samples])
-            if any(sample.breath_rate_bpm for sample in samples)
-            else None
-        )
-        return PhysioTimeSeries(
-            timestamps=timestamps,
-            rr_intervals=rr_intervals,
-            eda=eda,
-            breath_rate=breath,
-        )
-    duration_seconds = 8 * 60
-    timestamps = np.linspace(0, duration_seconds, duration_seconds + 1)
-    rr_intervals = 780 + 40 * np.sin(np.linspace(0, 12, timestamps.size))
-    eda = 0.25 + 0.03 * np.sin(np.linspace(0, 6, timestamps.size)) + 0.01 * np.random.default_rng(
-        42
-    ).normal(size=timestamps.size)
-    breath_rate = 12 + 1.5 * np.sin(np.linspace(0, 10, timestamps.size))
-    return PhysioTimeSeries(
-        timestamps=timestamps,
-        rr_intervals=rr_intervals,
-        eda=eda,
-        breath_rate=breath_rate,
-    )
-
-
-def _build_reactivity(payload: Optional[dict]) -> ReactivityMetrics:
-    if payload:
-        return ReactivityMetrics(
-            baseline_hrv_rmssd=payload.get("baseline_hrv_rmssd") or 56.0,
-            challenge_hrv_rmssd=payload.get("challenge_hrv_rmssd") or 34.0,
-            baseline_eda_mean=payload.get("baseline_eda_mean") or 0.28,
-            challenge_eda_mean=payload.get("challenge_eda_mean") or 0.41,
-            baseline_breath_rate=payload.get("baseline_breath_rate") or 11.5,
-            challenge_breath_rate=payload.get("challenge_breath_rate") or 17.0,
-            recovery_index=payload.get("recovery_index") or 0.62,
-        )
-    return ReactivityMetrics(
-        baseline_hrv_rmssd=56.0,
-        challenge_hrv_rmssd=34.0,
-        baseline_eda_mean=0.28,
-        challenge_eda_mean=0.41,
-        baseline_breath_rate=11.5,
-        challenge_breath_rate=17.0,
-        recovery_index=0.62,
-    )
@@ -0,0 +1,85 @@
+"""Re-extract acoustic features for retained canonical captures.
+
+Run after bumping PRAAT_EXTRACTOR_VERSION or FEATURE_VERSION to recompute
+measurements without re-uploading audio. Re-running the same command resumes
+from the checkpoint; a version bump starts a new pass automatically.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import sys
+
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from corescope.audio.backfill import BackfillSummary, checkpoint_key, run_backfill  # noqa: E402
+
+
+def report(summary: BackfillSummary, total: int) -> None:
+    processed = summary.succeeded + summary.failed
+    rate = summary.captures_per_second
+    remaining = max(0, total - processed)
+    eta = remaining / rate if rate > 0 else float("inf")
+    print(
+        f"{processed}/{total} captures ({summary.failed} failed), {rate:.2f} captures/s, eta {eta:.0f}s",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path(os.getenv("SOULSCOPE_PRIVATE_AUDIO_ROOT", "backend/.private_audio")),
+        help="Private audio root to walk (defaults to SOULSCOPE_PRIVATE_AUDIO_ROOT).",
+    )
+    parser.add_argument("--out", type=Path, required=True, help="JSONL file, or directory of Parquet parts.")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Defaults to <out>.checkpoint.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument(
+        "--capture-kind",
+        default=None,
+        help="Capture kind for legacy files without a .capture.json manifest; they are skipped otherwise.",
+    )
+    args = parser.parse_args()
+
+    print(f"backfilling at {checkpoint_key()} from {args.root}", file=sys.stderr)
+    totals = {"pending": 0}
+
+    def progress(summary: BackfillSummary) -> None:
+        if not totals["pending"]:
+            totals["pending"] = summary.discovered - summary.skipped_checkpointed - summary.skipped_unlabelled
+        report(summary, totals["pending"])
+
+    summary = run_backfill(
+        args.root,
+        args.out,
+        checkpoint=args.checkpoint,
+        output_format=args.format,
+        workers=max(1, args.workers),
+        batch_size=max(1, args.batch_size),
+        default_capture_kind=args.capture_kind,
+        report=progress,
+    )
+    print(
+        f"done: {summary.succeeded} succeeded, {summary.failed} failed, "
+        f"{summary.skipped_checkpointed} already checkpointed, {summary.skipped_unlabelled} without manifest, "
+        f"{summary.elapsed_seconds:.1f}s ({summary.captures_per_second:.2f} captures/s)",
+        file=sys.stderr,
+    )
+    if summary.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
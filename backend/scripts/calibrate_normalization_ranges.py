@@ -0,0 +1,81 @@
+"""Regenerate resonance normalization ranges from backfill output.
+
+Streams each backfill output (JSONL file or directory of Parquet parts) into
+per-feature quantile sketches, adds the physio and reactivity values of the
+live sessions in a SQLite session store when ``--sessions`` is given,
+optionally merges them into a saved sketch file, and writes the ranges derived
+from CALIBRATION_SPECS as JSON. Ranges without enough calibration data keep
+their defaults.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import Iterator, Optional, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_ROOT = ROOT / "backend"
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from corescope.core_frequency.body_resonance import extract_physio_features  # noqa: E402
+from corescope.core_frequency.calibration import (  # noqa: E402
+    MIN_CALIBRATION_COUNT,
+    CalibrationSketches,
+    ingest_backfill_output,
+    ingest_physio_sessions,
+    regenerate_ranges,
+)
+from corescope.core_frequency.models import PhysioFeatures, ReactivityMetrics  # noqa: E402
+from corescope.physio.reactivity import derive_reactivity  # noqa: E402
+from corescope.physio.sessions import SQLiteSessionStore  # noqa: E402
+
+
+def stored_sessions(path: Path) -> Iterator[Tuple[PhysioFeatures, Optional[ReactivityMetrics]]]:
+    """Physio features and derived reactivity of every live session with at least two samples."""
+    store = SQLiteSessionStore(path)
+    for session_id in store.session_ids():
+        try:
+            buffer = store.read(session_id, lambda state: state.get("physio"))
+        except KeyError:
+            continue
+        if buffer is None or len(buffer) < 2:
+            continue
+        yield extract_physio_features(buffer.series()), derive_reactivity(buffer)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", type=Path, nargs="*", help="Backfill outputs to add.")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--sessions", type=Path, default=None, help="SQLite session store to add physio values from.")
+    parser.add_argument("--sketches", type=Path, default=None, help="Sketch file to merge into and save back.")
+    parser.add_argument("--min-count", type=int, default=MIN_CALIBRATION_COUNT)
+    parser.add_argument("--out", type=Path, default=None, help="Ranges JSON; stdout when omitted.")
+    args = parser.parse_args()
+
+    sketches = CalibrationSketches.load(args.sketches) if args.sketches and args.sketches.exists() else CalibrationSketches()
+    for path in args.inputs:
+        ingest_backfill_output(path, output_format=args.format, sketches=sketches)
+        print(f"ingested {path}", file=sys.stderr)
+    if args.sessions:
+        if not args.sessions.exists():
+            parser.error(f"session store not found: {args.sessions}")
+        ingest_physio_sessions(stored_sessions(args.sessions), sketches=sketches)
+        print(f"ingested sessions from {args.sessions}", file=sys.stderr)
+    if args.sketches:
+        sketches.save(args.sketches)
+    ranges = regenerate_ranges(sketches, min_count=args.min_count)
+    text = json.dumps({name: list(bounds) for name, bounds in sorted(ranges.items())}, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
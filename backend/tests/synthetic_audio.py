@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def vowel_audio(hz=180.0, seconds=3.0, sr=16000, amplitude_modulation=0.0, noise_db=None):
+    t = np.arange(int(sr * seconds)) / sr
+    audio = np.zeros_like(t)
+    for harmonic in range(1, 80):
+        frequency = harmonic * hz
+        envelope = sum(np.exp(-0.5 * ((frequency - center) / bandwidth) ** 2) for center, bandwidth in ((500, 180), (1500, 250), (2500, 300)))
+        audio += envelope * np.sin(2 * np.pi * frequency * t) / harmonic
+    if amplitude_modulation:
+        audio *= 1 + amplitude_modulation * np.sin(2 * np.pi * 2 * t)
+    audio *= 0.25 / max(np.max(np.abs(audio)), 1e-6)
+    if noise_db is not None:
+        rng = np.random.default_rng(42)
+        noise = rng.normal(size=audio.size)
+        noise *= np.sqrt(np.mean(audio**2)) / (10 ** (noise_db / 20) * max(np.sqrt(np.mean(noise**2)), 1e-6))
+        audio += noise
+    return audio.astype(np.float32), sr
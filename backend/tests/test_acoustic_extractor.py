@@ -1,3 +1,6 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import numpy as np
@@ -12,25 +15,14 @@ from corescope.audio.acoustic_extractor import (
     analyze_upload_file,
     cleanup_expired_private_audio,
     decode_audio_to_canonical_wav,
+    load_canonical_wav,
+    reanalyze_canonical_file,
 )
-
-
-def vowel_audio(hz=180.0, seconds=3.0, sr=16000, amplitude_modulation=0.0, noise_db=None):
-    t = np.arange(int(sr * seconds)) / sr
-    audio = np.zeros_like(t)
-    for harmonic in range(1, 80):
-        frequency = harmonic * hz
-        envelope = sum(np.exp(-0.5 * ((frequency - center) / bandwidth) ** 2) for center, bandwidth in ((500, 180), (1500, 250), (2500, 300)))
-        audio += envelope * np.sin(2 * np.pi * frequency * t) / harmonic
-    if amplitude_modulation:
-        audio *= 1 + amplitude_modulation * np.sin(2 * np.pi * 2 * t)
-    audio *= 0.25 / max(np.max(np.abs(audio)), 1e-6)
-    if noise_db is not None:
-        rng = np.random.default_rng(42)
-        noise = rng.normal(size=audio.size)
-        noise *= np.sqrt(np.mean(audio**2)) / (10 ** (noise_db / 20) * max(np.sqrt(np.mean(noise**2)), 1e-6))
-        audio += noise
-    return audio.astype(np.float32), sr
+from corescope.audio.feature_plan import FEATURE_PLANS, plan_levels
+from corescope.audio.pitch_range import PitchRange, estimate_pitch_range
+from corescope.audio.retention import RetentionIndex
+from corescope.audio.voice_analysis import extract_voice_features_from_file, voice_features_from_analysis
+from synthetic_audio import vowel_audio
 
 
 def feature(response, feature_id: str):
@@ -66,6 +58,39 @@ def test_authentic_f0_and_pitch_parameters(tmp_path):
     assert feature(restricted, "voice.f0.median").value is None
 
 
+def test_adaptive_pitch_range_from_prepass_and_prior_reuse(tmp_path):
+    audio = vowel_audio(180)[0]
+    adaptive = response_for(tmp_path, audio, floor=None, ceiling=None)
+    parameters = adaptive.metadata["parameters"]
+    assert parameters["pitch_range_source"] == "adaptive"
+    assert 60 < parameters["pitch_floor_hz"] < 180 < parameters["pitch_ceiling_hz"] < 400
+    assert feature(adaptive, "voice.pitch_floor_used").value == parameters["pitch_floor_hz"]
+    assert abs(feature(adaptive, "voice.f0.median").value - 180) < 1.0
+    assert estimate_pitch_range(np.zeros(32000, dtype=np.float32), 16000) == PitchRange(60.0, 400.0, "default")
+
+    decoded = decode_audio_to_canonical_wav(tmp_path / "source-sustained_vowel.wav", None)
+    prior = analyze_canonical_audio(
+        decoded,
+        scan_id="s",
+        user_id="u",
+        source_capture_id="c",
+        capture_kind="sustained_vowel",
+        original_content_type="audio/wav",
+        storage_path=None,
+        device_metadata={},
+        prior_pitch_range=(100.0, 300.0),
+    )
+    assert prior.metadata["parameters"]["pitch_range_source"] == "prior"
+    assert feature(prior, "voice.pitch_ceiling_used").value == 300
+    # Priors obey the same limits as the ranges the pre-pass derives.
+    for invalid in ((300.0, 100.0), (100.0, 800.0)):
+        with pytest.raises(ValueError, match="pitch_range_invalid"):
+            analyze_canonical_audio(
+                decoded, scan_id="s", user_id="u", source_capture_id="c", capture_kind="sustained_vowel",
+                original_content_type="audio/wav", storage_path=None, device_metadata={}, prior_pitch_range=invalid,
+            )
+
+
 def test_jitter_shimmer_hnr_and_units(tmp_path):
     response = response_for(tmp_path, vowel_audio(180, amplitude_modulation=0.12)[0])
     expected = {
@@ -164,14 +189,36 @@ def test_original_upload_is_deleted_and_expired_canonical_files_are_cleaned(tmp_
     sf.write(source, audio, 16000, subtype="PCM_16")
     result = analyze_upload_file(source.read_bytes(), filename="capture.wav", content_type="audio/wav", private_root=tmp_path, user_id="u", scan_id="s", source_capture_id="c", capture_kind="guided_speech", device_metadata={})
     assert result.storage_path and Path(result.storage_path).exists()
-    assert not list((tmp_path / "u" / "s").glob("*.upload"))
+    assert not list(tmp_path.rglob("*.upload"))
     old = Path(result.storage_path)
-    old.touch()
-    old_mtime = old.stat().st_mtime - 48 * 60 * 60
-    import os
-    os.utime(old, (old_mtime, old_mtime))
-    assert cleanup_expired_private_audio(tmp_path, retry_hours=24) == 1
+    manifest = old.with_name(old.name.replace(".canonical.wav", ".capture.json"))
+    assert manifest.exists()
+    assert cleanup_expired_private_audio(tmp_path, retry_hours=24) == 0
+    later = datetime.now(timezone.utc) + timedelta(hours=48)
+    assert cleanup_expired_private_audio(tmp_path, now=later, retry_hours=24) == 1
     assert not old.exists()
+    assert not manifest.exists()
+    # The shard directory is permanent; only the capture's files go.
+    assert old.parent.is_dir() and not any(old.parent.iterdir())
+    assert len(RetentionIndex(tmp_path)) == 0
+
+
+def test_full_scan_cleanup_removes_unindexed_orphans_by_mtime(tmp_path):
+    audio, _ = vowel_audio(180)
+    source = tmp_path / "orphan-source.wav"
+    sf.write(source, audio, 16000, subtype="PCM_16")
+    orphan = tmp_path / "root" / "u" / "s" / "orphan-0.canonical.wav"
+    decode_audio_to_canonical_wav(source, orphan)
+    old_mtime = orphan.stat().st_mtime - 48 * 60 * 60
+    import os
+    os.utime(orphan, (old_mtime, old_mtime))
+    assert cleanup_expired_private_audio(tmp_path / "root", retry_hours=24) == 1
+    assert not orphan.exists()
+    RetentionIndex(tmp_path / "root").register("u/s/indexed.canonical.wav")
+    decode_audio_to_canonical_wav(source, orphan)
+    os.utime(orphan, (old_mtime, old_mtime))
+    assert cleanup_expired_private_audio(tmp_path / "root", retry_hours=24) == 0
+    assert cleanup_expired_private_audio(tmp_path / "root", retry_hours=24, full_scan=True) == 1
 
 
 def test_capture_kind_eligibility_keeps_cycle_measurements_null_for_speech(tmp_path):
@@ -179,3 +226,199 @@ def test_capture_kind_eligibility_keeps_cycle_measurements_null_for_speech(tmp_p
     assert feature(response, "voice.jitter.local").value is None
     assert feature(response, "voice.jitter.local").rejection_reason == "insufficient_reliable_signal"
     assert feature(response, "voice.syllable_nuclei_rate").method == "documented_energy_peak_proxy_v1"
+
+
+def test_feature_plan_skips_unplanned_stages_with_explicit_nulls(tmp_path):
+    assert plan_levels(FEATURE_PLANS["challenge_response"].stages) == [("vad", "pitch_range", "spectral"), ("pitch", "harmonicity", "syllable")]
+    audio = vowel_audio(150)[0]
+    vowel = response_for(tmp_path, audio)
+    clip = response_for(tmp_path, audio, capture_kind="challenge_response")
+    assert {item.feature_id for item in clip.features} == {item.feature_id for item in vowel.features}
+    for feature_id in ("voice.formant.f1.median", "voice.formant.f1.valid_frame_ratio", "voice.cepstral_peak_prominence_proxy"):
+        assert feature(vowel, feature_id).value is not None
+        assert feature(clip, feature_id).value is None
+    assert feature(clip, "voice.f0.median").value == feature(vowel, "voice.f0.median").value
+    assert feature(clip, "voice.spectral_centroid").value == feature(vowel, "voice.spectral_centroid").value
+    assert clip.metadata["parameters"]["feature_plan"] == ["harmonicity", "pitch", "pitch_range", "spectral", "syllable", "vad"]
+
+
+def test_segmented_extraction_skips_silence_and_reports_segment_provenance(tmp_path):
+    tone, _ = vowel_audio(170, seconds=1.0)
+    audio = np.concatenate([np.zeros(16000 // 2), tone, np.zeros(16000), tone, np.zeros(16000 // 2)])
+    source = tmp_path / "segmented-source.wav"
+    sf.write(source, audio, 16000, subtype="PCM_16")
+    decoded = decode_audio_to_canonical_wav(source, tmp_path / "segmented-canonical.wav")
+    common = dict(
+        scan_id="scan-1",
+        user_id="user-1",
+        source_capture_id="capture-1",
+        capture_kind="guided_speech",
+        original_content_type="audio/wav",
+        storage_path=None,
+        device_metadata={},
+    )
+    whole = analyze_canonical_audio(decoded, **common)
+    segmented = analyze_canonical_audio(decoded, segmented=True, **common)
+    speech = [segment for segment in segmented.vad_segments if segment.kind == "speech"]
+    assert len(speech) >= 2
+    assert segmented.metadata["parameters"]["extraction_mode"] == "vad_segments"
+    assert whole.segment_features == []
+    f0 = feature(segmented, "voice.f0.median")
+    assert abs(f0.value - 170) < 1.5
+    assert f0.segment_start_ms == speech[0].start_ms and f0.segment_end_ms == speech[-1].end_ms
+    assert feature(segmented, "voice.spectral_centroid").segment_start_ms == 0
+    per_segment = [item for item in segmented.segment_features if item.feature_id == "voice.f0.median"]
+    assert [(item.segment_start_ms, item.segment_end_ms) for item in per_segment] == [(segment.start_ms, segment.end_ms) for segment in speech]
+    assert all(abs(item.value - 170) < 1.5 for item in per_segment)
+    assert {item.feature_id for item in segmented.features} == {item.feature_id for item in whole.features}
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_concurrent_stage_execution_matches_serial_output(tmp_path, kind):
+    from corescope.audio.scheduler import build_analysis_executor
+
+    audio, _ = vowel_audio(180, amplitude_modulation=0.1)
+    source = tmp_path / "scheduler-source.wav"
+    sf.write(source, audio, 16000, subtype="PCM_16")
+    decoded = decode_audio_to_canonical_wav(source, tmp_path / "scheduler-canonical.wav")
+    common = dict(
+        scan_id="scan-1",
+        user_id="user-1",
+        source_capture_id="capture-1",
+        capture_kind="sustained_vowel",
+        original_content_type="audio/wav",
+        storage_path=None,
+        device_metadata={},
+    )
+    serial = analyze_canonical_audio(decoded, **common)
+    executor = build_analysis_executor(kind, workers=2)
+    try:
+        concurrent = analyze_canonical_audio(decoded, executor=executor, **common)
+    finally:
+        executor.shutdown()
+    assert [(item.feature_id, item.value) for item in concurrent.features] == [(item.feature_id, item.value) for item in serial.features]
+
+
+def test_shared_decoded_audio_sends_handles_not_samples_and_unlinks_after_request(tmp_path):
+    import pickle
+    from multiprocessing import shared_memory
+
+    from corescope.audio.acoustic_extractor import share_decoded_audio
+    from corescope.audio.scheduler import AnalysisStage, build_analysis_executor
+    from corescope.audio.shared_audio import shared_stage
+
+    audio, _ = vowel_audio(180)
+    source = tmp_path / "shared-source.wav"
+    sf.write(source, audio, 16000, subtype="PCM_16")
+    decoded = decode_audio_to_canonical_wav(source, tmp_path / "shared-canonical.wav")
+    executor = build_analysis_executor("process", workers=2)
+    try:
+        with share_decoded_audio(decoded) as shared:
+            name = shared.buffer.name
+            np.testing.assert_array_equal(shared.samples, decoded.samples)
+            stage = shared_stage(AnalysisStage("sum", np.sum, (shared.samples[16000:32000],)), shared.buffer)
+            assert len(pickle.dumps(stage.args)) < 512
+            assert executor.submit(stage.func, *stage.args).result() == pytest.approx(float(np.sum(decoded.samples[16000:32000])), rel=1e-5)
+            response = analyze_canonical_audio(
+                shared,
+                scan_id="scan-1",
+                user_id="user-1",
+                source_capture_id="capture-1",
+                capture_kind="sustained_vowel",
+                original_content_type="audio/wav",
+                storage_path=None,
+                device_metadata={},
+                executor=executor,
+            )
+            assert abs(feature(response, "voice.f0.median").value - 180) < 1.0
+    finally:
+        executor.shutdown()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+    assert shared.samples.size == 0
+
+    from corescope.audio.shared_audio import SharedAudioBuffer
+
+    buffer = SharedAudioBuffer(decoded.samples)
+    view, name = buffer.array[100:200][::2], buffer.name
+    with pytest.raises(BufferError):
+        buffer.close()
+    assert view.sum() == pytest.approx(float(decoded.samples[100:200:2].sum()))
+    # The name is gone at once; only the unmap waits for the view.
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+    del view
+    buffer.close()
+
+    # A view left behind by a failing request does not hide its error.
+    with pytest.raises(ValueError, match="stage_failed"):
+        with SharedAudioBuffer(decoded.samples) as buffer:
+            kept = buffer.array[::3]
+            raise ValueError("stage_failed")
+    assert kept.size and buffer.array.size == 0
+    del kept
+    buffer.close()
+
+
+def test_reanalysis_memory_maps_the_retained_canonical_wav(tmp_path):
+    audio, _ = vowel_audio(180, amplitude_modulation=0.1)
+    source = tmp_path / "retained-source.wav"
+    sf.write(source, audio, 16000, subtype="PCM_16")
+    canonical = tmp_path / "u" / "s" / "capture-1.canonical.wav"
+    decode_audio_to_canonical_wav(source, canonical)
+    loaded = load_canonical_wav(canonical)
+    expected, _ = sf.read(canonical, dtype="float32")
+    np.testing.assert_allclose(loaded.samples, expected, atol=1e-7)
+    assert loaded.duration_ms == 3000 and loaded.sample_rate == 16000
+    response = reanalyze_canonical_file(
+        canonical,
+        scan_id="scan-1",
+        user_id="u",
+        source_capture_id="capture-1",
+        capture_kind="sustained_vowel",
+        device_metadata={},
+        private_root=tmp_path,
+    )
+    assert response.storage_path == str(canonical)
+    assert abs(feature(response, "voice.f0.median").value - 180) < 1.0
+    assert feature(response, "voice.jitter.local").value is not None
+    with pytest.raises(ValueError, match="canonical_wav_path_rejected"):
+        reanalyze_canonical_file(canonical, scan_id="s", user_id="u", source_capture_id="c", capture_kind="guided_speech", device_metadata={}, private_root=tmp_path / "other")
+
+
+def test_reanalysis_rejects_non_canonical_wavs(tmp_path):
+    stereo = tmp_path / "stereo.canonical.wav"
+    sf.write(stereo, np.zeros((16000 * 3, 2)) + 0.1, 16000, subtype="PCM_16")
+    with pytest.raises(ValueError, match="canonical_wav_not_canonical_format"):
+        load_canonical_wav(stereo)
+    garbage = tmp_path / "garbage.canonical.wav"
+    garbage.write_bytes(b"not a wav file at all")
+    with pytest.raises(ValueError, match="canonical_wav_invalid_header"):
+        load_canonical_wav(garbage)
+
+
+def test_voice_features_come_from_the_canonical_analysis_without_librosa(tmp_path):
+    audio, sr = vowel_audio(180)
+    source = tmp_path / "vowel.wav"
+    sf.write(source, audio, sr, subtype="PCM_16")
+    features = extract_voice_features_from_file(source)
+    reference = voice_features_from_analysis(response_for(tmp_path, audio, floor=None, ceiling=None))
+    assert abs(features.mean_f0 - 180.0) < 3.0
+    assert features.mean_f0 == pytest.approx(reference.mean_f0, rel=1e-3)
+    assert features.spectral_centroid == pytest.approx(reference.spectral_centroid, rel=1e-3)
+    assert features.jitter_local == pytest.approx(reference.jitter_local, rel=0.05, abs=1e-4)
+    assert features.hnr == pytest.approx(reference.hnr, rel=0.02)
+    assert not list(tmp_path.glob("*.canonical.wav"))
+
+    probe = "import sys, corescope.audio.voice_analysis; print('librosa' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=Path(__file__).parents[1])
+    assert completed.stdout.strip() == "False"
+
+
+def test_voice_features_from_file_skip_the_capture_duration_limits(tmp_path):
+    audio, sr = vowel_audio(180, seconds=1.0)
+    source = tmp_path / "short.wav"
+    sf.write(source, audio, sr, subtype="PCM_16")
+    with pytest.raises(ValueError, match="audio_too_short"):
+        decode_audio_to_canonical_wav(source, None)
+    assert abs(extract_voice_features_from_file(source).mean_f0 - 180.0) < 3.0
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import shutil
+
+import soundfile as sf
+
+from corescope.audio.acoustic_extractor import analyze_upload_file, cleanup_expired_private_audio, reanalyze_stored_capture
+from corescope.audio.retention import RetentionIndex
+from corescope.audio.storage import LocalShardedStore, S3CanonicalStore
+from synthetic_audio import vowel_audio
+
+
+class FakeS3Client:
+    """Object-store stand-in with the boto3 calls the S3 store relies on."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _object(self, bucket, key):
+        return self.root / bucket / key
+
+    def upload_file(self, filename, bucket, key):
+        target = self._object(bucket, key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(filename, target)
+
+    def download_file(self, bucket, key, filename):
+        shutil.copyfile(self._object(bucket, key), filename)
+
+    def head_object(self, Bucket, Key):
+        if not self._object(Bucket, Key).exists():
+            error = Exception("Not Found")
+            error.response = {"Error": {"Code": "404"}}
+            raise error
+        return {}
+
+    def delete_object(self, Bucket, Key):
+        self._object(Bucket, Key).unlink(missing_ok=True)
+
+    def keys(self, bucket):
+        base = self.root / bucket
+        return sorted(path.relative_to(base).as_posix() for path in base.rglob("*") if path.is_file())
+
+
+def upload(tmp_path, store, source_capture_id="capture:1"):
+    audio, sr = vowel_audio(180)
+    source = tmp_path / "source.wav"
+    sf.write(source, audio, sr, subtype="PCM_16")
+    return analyze_upload_file(
+        source.read_bytes(),
+        filename="capture.wav",
+        content_type="audio/wav",
+        private_root=store.index_root,
+        store=store,
+        user_id="user-1",
+        scan_id="scan-1",
+        source_capture_id=source_capture_id,
+        capture_kind="sustained_vowel",
+        device_metadata={"fixture": "storage"},
+    )
+
+
+def test_local_store_shards_captures_into_precreated_directories(tmp_path):
+    store = LocalShardedStore(tmp_path / "private")
+    store.prepare()
+    shards = [path for path in (tmp_path / "private").iterdir() if path.is_dir()]
+    assert len(shards) == 256
+    first = store.allocate("user-1", "scan-1", "capture:1")
+    second = store.allocate("user-1", "scan-1", "capture:2")
+    other = store.allocate("user-2", "scan-9", "capture:1")
+    assert first.local_path.parent == second.local_path.parent
+    assert first.local_path.parent.parent == tmp_path / "private"
+    assert first.key != second.key
+    assert other.local_path.parent in shards
+
+    result = upload(tmp_path, store)
+    retained = Path(result.storage_path)
+    assert retained.parent.parent == tmp_path / "private"
+    later = datetime.now(timezone.utc) + timedelta(hours=48)
+    assert cleanup_expired_private_audio(tmp_path / "private", now=later, store=store) == 1
+    assert not retained.exists()
+    assert retained.parent.exists()
+
+
+def test_s3_store_round_trips_captures_through_an_object_store(tmp_path):
+    client = FakeS3Client(tmp_path / "objects")
+    store = S3CanonicalStore(client, "audio", work_root=tmp_path / "work", prefix="retained")
+    store.prepare()
+
+    result = upload(tmp_path, store)
+
+    assert result.storage_path.startswith("s3://audio/retained/")
+    objects = client.keys("audio")
+    assert len(objects) == 2
+    assert any(key.endswith(".canonical.wav") for key in objects)
+    assert any(key.endswith(".capture.json") for key in objects)
+    assert not list((tmp_path / "work" / "staging").iterdir())
+
+    (key,) = RetentionIndex(tmp_path / "work").expired(float("inf"))
+    again = reanalyze_stored_capture(store, key)
+    assert again.capture_kind == "sustained_vowel"
+    assert again.source_capture_id == "capture:1"
+    assert again.storage_path == result.storage_path == f"s3://audio/retained/{key}"
+    assert [item.value for item in again.features] == [item.value for item in result.features]
+    assert not list((tmp_path / "work" / "staging").iterdir())
+
+    later = datetime.now(timezone.utc) + timedelta(hours=48)
+    assert cleanup_expired_private_audio(tmp_path / "work", now=later, store=store) == 1
+    assert client.keys("audio") == []
+    assert store.delete(key) is False
+    assert len(RetentionIndex(tmp_path / "work")) == 0
+
+
+def test_failed_retention_sweeps_are_logged_and_retried(monkeypatch, caplog):
+    import asyncio
+
+    import main
+
+    sweeps = []
+
+    def sweep():
+        sweeps.append(len(sweeps))
+        raise OSError("store unavailable")
+
+    async def run_two_sweeps():
+        task = asyncio.create_task(main._retention_sweeper())
+        while len(sweeps) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    monkeypatch.setattr(main, "_sweep_expired", sweep)
+    monkeypatch.setattr(main, "RETENTION_SWEEP_SECONDS", 0.01)
+    asyncio.run(run_two_sweeps())
+    failures = [record for record in caplog.records if record.message == "Retention sweep failed"]
+    assert len(failures) >= 2 and failures[0].exc_info[0] is OSError
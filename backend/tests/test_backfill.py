@@ -0,0 +1,94 @@
+import json
+
+import soundfile as sf
+
+from corescope.audio.acoustic_extractor import analyze_upload_file, capture_manifest_path
+from corescope.audio.backfill import run_backfill
+from corescope.audio.scheduler import ANALYSIS_EXECUTOR_ENV, default_analysis_executor, shutdown_analysis_executor, use_serial_analysis
+from synthetic_audio import vowel_audio
+
+
+def retained_capture(tmp_path, source_capture_id, capture_kind):
+    audio, sr = vowel_audio(180)
+    source = tmp_path / f"{capture_kind}.wav"
+    sf.write(source, audio, sr, subtype="PCM_16")
+    result = analyze_upload_file(
+        source.read_bytes(),
+        filename="capture.wav",
+        content_type="audio/wav",
+        private_root=tmp_path / "private",
+        user_id="user-1",
+        scan_id="scan-1",
+        source_capture_id=source_capture_id,
+        capture_kind=capture_kind,
+        device_metadata={"fixture": "backfill"},
+    )
+    return result.storage_path
+
+
+def test_backfill_reextracts_manifested_captures_and_resumes_from_checkpoint(tmp_path):
+    vowel = retained_capture(tmp_path, "capture:vowel", "sustained_vowel")
+    speech = retained_capture(tmp_path, "capture:speech", "guided_speech")
+    legacy = tmp_path / "private" / "user-1" / "scan-1" / "legacy-0123.canonical.wav"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(open(vowel, "rb").read())
+    assert capture_manifest_path(legacy).exists() is False
+    output = tmp_path / "out" / "features.jsonl"
+    reports = []
+
+    summary = run_backfill(tmp_path / "private", output, batch_size=1, report=reports.append)
+
+    assert (summary.discovered, summary.succeeded, summary.failed, summary.skipped_unlabelled) == (3, 2, 0, 1)
+    assert len(reports) == 2
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(row["canonical_path"] for row in rows) == sorted([vowel, speech])
+    by_kind = {row["capture_kind"]: row for row in rows}
+    assert by_kind["sustained_vowel"]["source_capture_id"] == "capture:vowel"
+    jitter = next(item for item in by_kind["sustained_vowel"]["response"]["features"] if item["feature_id"] == "voice.jitter.local")
+    assert jitter["value"] is not None
+
+    resumed = run_backfill(tmp_path / "private", output, default_capture_kind="guided_speech")
+    assert (resumed.skipped_checkpointed, resumed.succeeded) == (2, 1)
+    last = json.loads(output.read_text().splitlines()[-1])
+    assert (last["canonical_path"], last["source_capture_id"], last["capture_kind"]) == (str(legacy), "legacy", "guided_speech")
+
+
+def test_failed_captures_stay_out_of_the_output_across_resumes(tmp_path):
+    vowel = retained_capture(tmp_path, "capture:vowel", "sustained_vowel")
+    broken = tmp_path / "private" / "user-1" / "scan-1" / "broken-0123.canonical.wav"
+    broken.parent.mkdir(parents=True)
+    broken.write_bytes(b"RIFF-not-a-wav")
+    output = tmp_path / "out" / "features.jsonl"
+    failures = tmp_path / "out" / "features.jsonl.failures.jsonl"
+
+    for _ in range(2):
+        summary = run_backfill(tmp_path / "private", output, default_capture_kind="guided_speech")
+        assert summary.failed == 1
+        assert [json.loads(line)["canonical_path"] for line in output.read_text().splitlines()] == [vowel]
+        (failed,) = [json.loads(line) for line in failures.read_text().splitlines()]
+        assert failed["canonical_path"] == str(broken) and failed["status"] == "failed"
+
+
+def test_rows_written_after_the_last_checkpoint_are_dropped_on_resume(tmp_path):
+    retained_capture(tmp_path, "capture:vowel", "sustained_vowel")
+    output = tmp_path / "out" / "features.jsonl"
+    checkpoint = tmp_path / "out" / "features.jsonl.checkpoint"
+    run_backfill(tmp_path / "private", output)
+    lines = checkpoint.read_text().splitlines()
+    # Crash after fsyncing a batch but before (fully) checkpointing it.
+    checkpoint.write_text("\n".join(lines[:-1]) + "\n" + lines[-1][:20])
+
+    resumed = run_backfill(tmp_path / "private", output)
+    assert (resumed.skipped_checkpointed, resumed.succeeded) == (0, 1)
+    assert [json.loads(line)["source_capture_id"] for line in output.read_text().splitlines()] == ["capture:vowel"]
+    assert run_backfill(tmp_path / "private", output).skipped_checkpointed == 1
+
+
+def test_backfill_workers_pin_stage_execution_to_serial(monkeypatch):
+    monkeypatch.setenv(ANALYSIS_EXECUTOR_ENV, "process")
+    shutdown_analysis_executor()
+    try:
+        use_serial_analysis()
+        assert default_analysis_executor() is None
+    finally:
+        shutdown_analysis_executor()
@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pytest
+
+from corescope.core_frequency.batch import VoiceFeatureBatch, compute_soul_resonance_batch
+from corescope.core_frequency.body_resonance import extract_physio_features
+from corescope.core_frequency.calibration import (
+    CalibrationSketches,
+    KllSketch,
+    ingest_backfill_output,
+    ingest_physio_sessions,
+    regenerate_ranges,
+)
+from corescope.core_frequency.models import VoiceFeatures
+from corescope.physio.buffer import PhysioBuffer
+from corescope.physio.reactivity import PHASE_CODES, derive_reactivity
+from corescope.core_frequency.ranges import DEFAULT_RANGES
+from corescope.core_frequency.voice_resonance import compute_soul_resonance
+
+
+def test_merged_sketches_stay_within_rank_error_of_exact_quantiles():
+    rng = np.random.default_rng(7)
+    data = rng.lognormal(mean=0.0, sigma=1.0, size=400_000)
+    left, right = KllSketch(), KllSketch()
+    for chunk in np.array_split(data[:200_000], 50):
+        left.update(chunk)
+    right.update(data[200_000:])
+    merged = left.merge(right)
+    assert merged.n == data.size
+    assert sum(level.size for level in merged._levels) < 1000
+    qs = [0.01, 0.1, 0.5, 0.9, 0.99]
+    ranks = [np.mean(data <= value) for value in merged.quantiles(qs)]
+    assert np.max(np.abs(np.array(ranks) - qs)) < 0.01
+    assert merged.quantile(0.0) == data.min() and merged.quantile(1.0) == data.max()
+    restored = KllSketch.from_bytes(merged.to_bytes())
+    assert np.array_equal(restored.quantiles(qs), merged.quantiles(qs))
+
+
+def test_backfill_output_is_streamed_into_ranges(tmp_path):
+    rng = np.random.default_rng(3)
+    output = tmp_path / "features.jsonl"
+    hnr = rng.normal(18.0, 3.0, size=500)
+    with output.open("w", encoding="utf-8") as handle:
+        for index, value in enumerate(hnr):
+            features = [
+                {"feature_id": "voice.hnr.mean", "value": float(value), "rejection_reason": None},
+                {"feature_id": "voice.jitter.local", "value": None, "rejection_reason": "insufficient_reliable_signal"},
+            ]
+            status = "ok" if index else "error"
+            handle.write(json.dumps({"status": status, "capture_kind": "sustained_vowel", "response": {"features": features}}) + "\n")
+
+    sketches = ingest_backfill_output(output, chunk=64)
+    assert sketches.keys() == [("sustained_vowel", "voice.hnr.mean")]
+    assert sketches.sketch("sustained_vowel", "voice.hnr.mean").n == 499
+    path = tmp_path / "calibration.kll"
+    sketches.save(path)
+    loaded = CalibrationSketches.load(path)
+
+    ranges = regenerate_ranges(loaded)
+    low, high = ranges["soul.hnr"]
+    assert low == pytest.approx(np.percentile(hnr[1:], 10), abs=0.5)
+    assert high == pytest.approx(np.percentile(hnr[1:], 90), abs=0.5)
+    assert {name: value for name, value in ranges.items() if name != "soul.hnr"} == {
+        name: value for name, value in DEFAULT_RANGES.items() if name != "soul.hnr"
+    }
+    assert regenerate_ranges(loaded, min_count=1000) == DEFAULT_RANGES
+
+    voice = VoiceFeatures(mean_f0=180.0, f0_std=20.0, spectral_centroid=2000.0, jitter_local=0.004, shimmer_local=0.03, hnr=16.0)
+    scalar = compute_soul_resonance(voice, ranges)
+    assert scalar.meta["hnr_score"] == pytest.approx((16.0 - low) / (high - low))
+    assert compute_soul_resonance_batch(VoiceFeatureBatch.from_records([voice]), ranges).component(0) == scalar
+
+
+def test_physio_sessions_move_body_and_reactivity_ranges():
+    rng = np.random.default_rng(11)
+    rmssd, drops = [], []
+    sessions = []
+    for _ in range(40):
+        buffer, start = PhysioBuffer(), 0.0
+        for phase, spread in (("baseline", rng.uniform(20, 90)), ("challenge", rng.uniform(5, 40))):
+            rr = 800.0 + spread * rng.standard_normal(150)
+            timestamps = start + np.cumsum(rr) / 1000.0
+            start = timestamps[-1]
+            buffer.append(timestamps, rr, eda=rng.uniform(0.2, 0.6, rr.size), phase=PHASE_CODES[phase])
+        features, reactivity = extract_physio_features(buffer.series()), derive_reactivity(buffer)
+        rmssd.append(features.hrv_rmssd)
+        drops.append(reactivity.baseline_hrv_rmssd - reactivity.challenge_hrv_rmssd)
+        sessions.append((features, reactivity))
+
+    sketches = ingest_physio_sessions(sessions)
+    assert sketches.sketch("physio", "physio.hrv_rmssd").n == 40
+    assert sketches.sketch("reactivity", "reactivity.eda_delta").n == 40
+    assert sketches.sketch("reactivity", "reactivity.breath_delta") is None
+    ranges = regenerate_ranges(sketches, min_count=40)
+    assert ranges["body.hrv_rmssd"] != DEFAULT_RANGES["body.hrv_rmssd"]
+    assert ranges["body.hrv_rmssd"] == pytest.approx(tuple(np.percentile(rmssd, [10, 90], method="inverted_cdf")))
+    assert ranges["heart_mind.hrv_drop"] == pytest.approx(tuple(np.percentile(drops, [10, 90], method="inverted_cdf")))
@@ -0,0 +1,79 @@
+import numpy as np
+
+from corescope.core_frequency.batch import (
+    PhysioFeatureBatch,
+    ReactivityBatch,
+    VoiceFeatureBatch,
+    normalize_array,
+    score_core_frequency_batch,
+)
+from corescope.core_frequency.body_resonance import normalize
+from corescope.core_frequency.core_frequency import score_core_frequency
+from corescope.core_frequency.models import PhysioFeatures, ReactivityMetrics, VoiceFeatures
+
+
+def maybe(rng, value):
+    return None if rng.random() < 0.2 else value
+
+
+def cohort(size, seed=11):
+    rng = np.random.default_rng(seed)
+    physio, voice, reactivity = [], [], []
+    for index in range(size):
+        ratio = [float(rng.uniform(-1.0, 10.0)), float("inf"), float("nan"), 0.0, 0.5, 3.0][index % 6]
+        physio.append(
+            PhysioFeatures(
+                hrv_rmssd=float(rng.uniform(0.0, 120.0)),
+                lf_power=float(rng.uniform(0.0, 2000.0)),
+                hf_power=float(rng.uniform(0.0, 2000.0)),
+                lf_hf_ratio=ratio,
+                mean_hr=float(rng.uniform(40.0, 110.0)),
+                eda_tonic_mean=maybe(rng, float(rng.uniform(0.0, 20.0))),
+                eda_phasic_peaks_per_min=maybe(rng, float(rng.uniform(0.0, 10.0))),
+                breath_rate_mean=maybe(rng, float(rng.uniform(6.0, 30.0))),
+            )
+        )
+        voice.append(
+            VoiceFeatures(
+                mean_f0=float(rng.uniform(80.0, 300.0)),
+                f0_std=float(rng.choice([rng.uniform(0.0, 250.0), 10.0, 80.0])),
+                spectral_centroid=float(rng.choice([rng.uniform(200.0, 7000.0), 1500.0, 3500.0])),
+                jitter_local=float(rng.uniform(0.0, 0.02)),
+                shimmer_local=float(rng.uniform(0.0, 0.2)),
+                hnr=float(rng.uniform(0.0, 35.0)),
+            )
+        )
+        reactivity.append(
+            ReactivityMetrics(
+                baseline_hrv_rmssd=float(rng.uniform(10.0, 90.0)),
+                challenge_hrv_rmssd=float(rng.uniform(10.0, 90.0)),
+                baseline_eda_mean=maybe(rng, float(rng.uniform(0.0, 15.0))),
+                challenge_eda_mean=maybe(rng, float(rng.uniform(0.0, 15.0))),
+                baseline_breath_rate=maybe(rng, float(rng.uniform(8.0, 20.0))),
+                challenge_breath_rate=maybe(rng, float(rng.uniform(8.0, 20.0))),
+                recovery_index=maybe(rng, float(rng.uniform(0.0, 1.0))),
+            )
+        )
+    return physio, voice, reactivity
+
+
+def test_batch_scores_equal_the_scalar_path_exactly():
+    physio, voice, reactivity = cohort(600)
+    batch = score_core_frequency_batch(
+        PhysioFeatureBatch.from_records(physio),
+        VoiceFeatureBatch.from_records(voice),
+        ReactivityBatch.from_records(reactivity),
+    )
+
+    assert len(batch) == 600
+    for index in range(600):
+        assert batch.result(index) == score_core_frequency(physio[index], voice[index], reactivity[index])
+    assert set(batch.qualitative_label) > {"Adaptive but Strained"}
+
+
+def test_normalize_array_matches_scalar_clamp_at_the_edges():
+    values = np.array([-np.inf, -1.0, 0.0, 0.25, 1.0, 2.0, np.inf, np.nan])
+    for invert in (False, True):
+        expected = [normalize(float(value), 0.0, 1.0, invert=invert) for value in values]
+        np.testing.assert_array_equal(normalize_array(values, 0.0, 1.0, invert=invert), expected)
+    np.testing.assert_array_equal(normalize_array(values, 2.0, 2.0), np.full(values.size, 0.5))
@@ -1,8 +1,12 @@
+import asyncio
+
+import numpy as np
 from pydantic import ValidationError
 import pytest
 
 from corescope.audio.acoustic_contract import AcousticFeatureMeasurement
-from corescope.engine.evidence import build_acoustic_evidence_ledger
+from corescope.engine.baselines import FeatureBaseline, InMemoryBaselineStore, SQLiteBaselineStore
+from corescope.engine.evidence import build_acoustic_evidence_ledger, merge_evidence_ledgers
 from corescope.engine.versions import CURRENT_ENGINE_VERSIONS
 
 
@@ -34,7 +38,7 @@ def test_evidence_ledger_is_deterministic_and_versioned():
     assert ledger.ledger_id == "scan-1:capture-1:evidence"
     assert ledger.versions == CURRENT_ENGINE_VERSIONS
     assert ledger.records[0].evidence_id == "capture-1:voice.f0.median:1.0.0"
-    assert ledger.records[0].magnitude == 180.0
+    assert ledger.records[0].magnitude is None
     assert ledger.records[0].measured_value == 180.0
     assert ledger.records[0].units == "Hz"
     assert ledger.records[0].uncertainty == 0.2
@@ -63,3 +67,149 @@ def test_evidence_records_are_immutable():
     ).records[0]
     with pytest.raises((TypeError, ValidationError)):
         record.confidence = 0.2
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_baselines_update_incrementally_and_set_evidence_direction(kind, tmp_path):
+    store = InMemoryBaselineStore() if kind == "memory" else SQLiteBaselineStore(tmp_path / "baselines.sqlite3")
+    history = [170.0, 175.0, 180.0, 185.0, 190.0]
+    for index, value in enumerate(history):
+        assert store.update("user-1", "guided_speech", f"capture-{index}", {"voice.f0.median": value})
+    # A retried analysis of a capture already folded in changes nothing.
+    assert not store.update("user-1", "guided_speech", "capture-4", {"voice.f0.median": 190.0})
+    baseline = store.get("user-1", "guided_speech")["voice.f0.median"]
+    assert baseline.count == 5
+    assert baseline.mean == pytest.approx(np.mean(history))
+    assert baseline.sd == pytest.approx(np.std(history, ddof=1))
+    assert store.get("user-1", "sustained_vowel") == {}
+    assert store.get("user-2", "guided_speech") == {}
+
+    def record(value):
+        return build_acoustic_evidence_ledger(
+            scan_id="scan-1",
+            source_capture_id="capture-1",
+            measurements=[measurement(value=value)],
+            baselines=store.get("user-1", "guided_speech"),
+        ).records[0]
+
+    elevated = record(200.0)
+    assert elevated.direction == "elevated"
+    assert elevated.magnitude == pytest.approx((200.0 - baseline.mean) / baseline.sd)
+    assert elevated.measured_value == 200.0
+    assert elevated.baseline["count"] == 5
+    assert elevated.baseline["recent_p50"] == 180.0
+    assert record(160.0).direction == "reduced"
+    assert record(181.0).direction == "stable"
+
+
+def test_in_memory_baselines_evict_the_least_recently_used_user_and_kind():
+    store = InMemoryBaselineStore(max_entries=2)
+    store.update("user-1", "guided_speech", "capture-1", {"voice.f0.median": 170.0})
+    store.update("user-2", "guided_speech", "capture-2", {"voice.f0.median": 180.0})
+    store.get("user-1", "guided_speech")
+    store.update("user-3", "guided_speech", "capture-3", {"voice.f0.median": 190.0})
+    assert store.get("user-2", "guided_speech") == {}
+    assert store.get("user-1", "guided_speech")["voice.f0.median"].count == 1
+    assert store.get("user-3", "guided_speech")["voice.f0.median"].count == 1
+
+
+def test_evidence_stays_stable_until_a_baseline_is_established():
+    baseline = FeatureBaseline().updated(170.0).updated(190.0)
+    record = build_acoustic_evidence_ledger(
+        scan_id="scan-1",
+        source_capture_id="capture-1",
+        measurements=[measurement(value=400.0)],
+        baselines={"voice.f0.median": baseline},
+    ).records[0]
+    assert record.direction == "stable"
+    assert record.magnitude is None
+    assert record.measured_value == 400.0
+    assert record.baseline is None
+
+
+def capture_ledger(source_capture_id, capture_kind, values, created_at):
+    ledger = build_acoustic_evidence_ledger(
+        scan_id="scan-1",
+        source_capture_id=source_capture_id,
+        measurements=[
+            measurement(feature_id=feature_id, value=value, source_capture_id=source_capture_id, capture_kind=capture_kind)
+            for feature_id, value in values.items()
+        ],
+    )
+    return ledger.model_copy(update={"created_at": created_at})
+
+
+def test_scan_ledgers_merge_with_index_and_newest_retry_wins():
+    vowel = capture_ledger("vowel", "sustained_vowel", {"voice.f0.median": 180.0, "voice.jitter.local": 0.004}, "2026-01-01T00:00:01+00:00")
+    speech = capture_ledger("speech", "guided_speech", {"voice.f0.median": 160.0}, "2026-01-01T00:00:02+00:00")
+    retry = capture_ledger("vowel", "sustained_vowel", {"voice.f0.median": 182.0}, "2026-01-01T00:00:03+00:00")
+
+    merged = merge_evidence_ledgers("scan-1", [retry, speech, vowel])
+
+    assert merged.ledger_id == "scan-1:evidence"
+    assert merged.source_ledger_ids == ["scan-1:vowel:evidence", "scan-1:speech:evidence"]
+    assert [record.evidence_id for record in merged.records] == [
+        "vowel:voice.f0.median:1.0.0",
+        "vowel:voice.jitter.local:1.0.0",
+        "speech:voice.f0.median:1.0.0",
+    ]
+    assert merged.record("vowel:voice.f0.median:1.0.0").measured_value == 182.0
+    assert merged.record("missing") is None
+    assert [record.measured_value for record in merged.for_feature("voice.f0.median")] == [182.0, 160.0]
+    assert [record.feature_source for record in merged.for_capture_kind("sustained_vowel")] == ["voice.f0.median", "voice.jitter.local"]
+    assert merged.versions == CURRENT_ENGINE_VERSIONS
+    assert type(merged).model_validate_json(merged.model_dump_json()) == merged
+
+    with pytest.raises(ValueError, match="evidence_ledger_scan_mismatch"):
+        merge_evidence_ledgers("scan-2", [vowel])
+    stale = vowel.model_copy(update={"versions": CURRENT_ENGINE_VERSIONS.model_copy(update={"rule_version": "0.0.1"})})
+    with pytest.raises(ValueError, match="evidence_ledger_version_mismatch"):
+        merge_evidence_ledgers("scan-1", [stale, speech])
+
+
+def test_merge_route_checks_ownership_and_rejects_foreign_ledgers(monkeypatch):
+    import main
+
+    owned = []
+
+    async def authenticate(_authorization):
+        return "user-1"
+
+    async def verify(scan_id, user_id, _authorization):
+        owned.append((scan_id, user_id))
+
+    monkeypatch.setattr(main, "_authenticate_user", authenticate)
+    monkeypatch.setattr(main, "_verify_scan_ownership", verify)
+    ledger = capture_ledger("vowel", "sustained_vowel", {"voice.f0.median": 180.0}, "2026-01-01T00:00:01+00:00")
+    merged = asyncio.run(main.merge_scan_evidence("scan-1", main.EvidenceMergeRequest(ledgers=[ledger]), authorization="Bearer t"))
+    assert owned == [("scan-1", "user-1")]
+    assert merged.index.by_feature_source == {"voice.f0.median": [0]}
+    with pytest.raises(main.HTTPException) as error:
+        asyncio.run(main.merge_scan_evidence("scan-2", main.EvidenceMergeRequest(ledgers=[ledger]), authorization="Bearer t"))
+    assert error.value.status_code == 422
+
+
+def test_evidence_query_is_cached_and_returns_ledger_records():
+    vowel = capture_ledger("vowel", "sustained_vowel", {"voice.f0.median": 180.0, "voice.f0x.mean": 1.0, "voice.jitter.local": None}, "2026-01-01T00:00:01+00:00")
+    speech = capture_ledger("speech", "guided_speech", {"voice.f0.median": 160.0, "voice.f0.range": 40.0}, "2026-01-01T00:00:02+00:00")
+    ledger = merge_evidence_ledgers("scan-1", [vowel, speech])
+    query = ledger.query
+
+    assert ledger.query is query and len(query) == 5
+    f0 = query.select(feature_prefix="voice.f0")
+    assert [record.feature_source for record in f0] == ["voice.f0.median", "voice.f0.median", "voice.f0.range"]
+    assert all(any(record is stored for stored in ledger.records) for record in f0)
+    assert query.select(feature_prefix="voice.f0.median", capture_kind="guided_speech") == (ledger.records[3],)
+    assert query.select(available=False) == (ledger.records[2],)
+    assert len(query.select(available=True, min_confidence=0.0)) == 4
+    assert query.select(min_confidence=1.01) == ()
+    assert query.select(direction="unavailable") == query.select(available=False)
+    assert query.select() == tuple(ledger.records)
+    assert query.record("speech:voice.f0.range:1.0.0") is ledger.records[4]
+
+    trimmed = ledger.model_copy(update={"records": ledger.records[:1]})
+    assert len(trimmed.query) == 1 and ledger.query is query
+    assert trimmed.index.by_evidence_id == {ledger.records[0].evidence_id: 0}
+    assert trimmed.for_feature("voice.f0.median") == [ledger.records[0]]
+    assert ledger.for_capture_kind("guided_speech") == list(ledger.records[3:])
+    assert trimmed == trimmed.model_validate_json(trimmed.model_dump_json())
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from corescope.core_frequency import body_resonance
+from corescope.core_frequency.body_resonance import estimate_lf_hf
+
+
+def beat_sampled_rr(minutes, lf_ms=30.0, hf_ms=15.0, noise_ms=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    rr, t = [], 0.0
+    while t < minutes * 60:
+        value = 800 + lf_ms * np.sin(2 * np.pi * 0.10 * t) + hf_ms * np.sin(2 * np.pi * 0.25 * t) + rng.normal(0, noise_ms)
+        rr.append(value)
+        t += value / 1000.0
+    return np.asarray(rr)
+
+
+def legacy_lf_hf(rr, fs=4.0):
+    t = np.cumsum(rr) / 1000.0
+    rr_interp = np.interp(np.arange(t[0], t[-1], 1.0 / fs), t, rr)
+    detrended = rr_interp - np.mean(rr_interp)
+    freqs = np.fft.rfftfreq(len(detrended), d=1.0 / fs)
+    psd = np.abs(np.fft.rfft(detrended)) ** 2
+    lf = psd[(freqs >= 0.04) & (freqs < 0.15)].sum()
+    hf = psd[(freqs >= 0.15) & (freqs < 0.40)].sum()
+    return lf, hf, lf / hf
+
+
+def test_default_method_is_the_original_periodogram():
+    rr = beat_sampled_rr(5, noise_ms=20)
+    assert estimate_lf_hf(rr) == legacy_lf_hf(rr)
+
+
+@pytest.mark.parametrize("minutes", [5, 30])
+def test_density_methods_recover_known_band_powers(minutes):
+    rr = beat_sampled_rr(minutes)
+    # Pure tones: LF variance 30^2/2 = 450 ms^2, HF 15^2/2 = 112.5 ms^2.
+    lf, hf, ratio = estimate_lf_hf(rr, method="lomb")
+    assert (lf, hf, ratio) == pytest.approx((450.0, 112.5, 4.0), rel=0.05)
+    # Linear resampling of beat-sampled RR attenuates HF (sinc^2 of 0.25 Hz at
+    # ~1.25 beats/s in amplitude, so sinc^4 in power), which is the bias
+    # Lomb-Scargle avoids.
+    lf, hf, _ = estimate_lf_hf(rr, method="welch")
+    assert lf == pytest.approx(450.0, rel=0.05)
+    assert hf == pytest.approx(112.5 * np.sinc(0.25 / 1.25) ** 4, rel=0.05)
+
+
+def test_lomb_scargle_is_unbiased_by_resampling_on_noisy_rr():
+    ratios = {method: np.mean([estimate_lf_hf(beat_sampled_rr(15, noise_ms=40, seed=seed), method=method)[2] for seed in range(5)]) for method in ("fft", "lomb")}
+    # Beat-rate white noise adds ~0.11 and ~0.25 Hz of density to LF and HF.
+    density = 40.0 ** 2 / 0.625
+    expected = (450 + density * 0.11) / (112.5 + density * 0.25)
+    assert abs(ratios["lomb"] - expected) < abs(ratios["fft"] - expected)
+    assert ratios["lomb"] == pytest.approx(expected, rel=0.1)
+
+
+def test_welch_windows_are_cached_and_unknown_methods_rejected():
+    body_resonance._hann_window.cache_clear()
+    estimate_lf_hf(beat_sampled_rr(5), method="welch")
+    estimate_lf_hf(beat_sampled_rr(5, seed=1), method="welch")
+    assert body_resonance._hann_window.cache_info().hits >= 1
+    with pytest.raises(ValueError):
+        estimate_lf_hf(beat_sampled_rr(1), method="multitaper")
+
+
+def test_welch_density_integrates_to_the_variance_at_nyquist():
+    # An alternating series puts all of its power in the Nyquist bin of an even segment.
+    series = np.tile([1.0, -1.0], 240)
+    freqs, psd = body_resonance._welch_psd(series, fs=4.0)
+    assert freqs[-1] == 2.0
+    assert psd.sum() * freqs[1] == pytest.approx(np.mean(series ** 2), rel=0.01)
+
+
+@pytest.mark.parametrize("method", ["fft", "welch", "lomb"])
+@pytest.mark.parametrize("rr", [[], [800.0], [800.0, 810.0]])
+def test_methods_handle_series_shorter_than_a_segment(method, rr):
+    lf, hf, ratio = estimate_lf_hf(np.asarray(rr), method=method)
+    assert lf == 0.0 and hf == 0.0 and ratio == np.inf
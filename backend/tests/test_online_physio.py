@@ -0,0 +1,78 @@
+import numpy as np
+
+import main
+from corescope.core_frequency.body_resonance import compute_hrv_rmssd, estimate_lf_hf
+from corescope.physio.buffer import PhysioBuffer
+from corescope.physio.ingest import PHYSIO_FRAMES_CONTENT_TYPE, encode_physio_frames
+from corescope.physio.online import OnlinePhysioFeatures, lf_hf_window, windowed_lf_hf
+from corescope.physio.sessions import InMemorySessionStore
+from test_physio_ingest import ingest
+
+
+def recording(seconds=600, seed=3):
+    rng = np.random.default_rng(seed)
+    rr = 800 + 40 * np.sin(np.arange(seconds) / 6.0) + rng.normal(0, 15, seconds)
+    eda = 0.3 + 0.02 * np.sin(np.arange(seconds) / 40.0)
+    eda[::7] = np.nan
+    return np.cumsum(rr) / 1000.0, rr, eda
+
+
+def test_running_features_match_whole_series_recomputation():
+    timestamps, rr, eda = recording()
+    features = OnlinePhysioFeatures()
+    for start in range(0, rr.size, 37):
+        features.update(rr[start : start + 37], eda[start : start + 37], None)
+    features = OnlinePhysioFeatures.from_dict(features.to_dict())
+
+    valid = eda[~np.isnan(eda)]
+    np.testing.assert_allclose(features.rmssd, compute_hrv_rmssd(rr))
+    np.testing.assert_allclose(features.mean_hr, 60000.0 / np.mean(rr))
+    np.testing.assert_allclose(features.eda_mean, np.mean(valid))
+    np.testing.assert_allclose(features.eda_sd, np.std(valid), atol=1e-9)
+    np.testing.assert_allclose(features.eda_drift, valid[-1] - valid[0])
+    assert features.breath_rate_mean is None
+
+
+def test_eda_sd_stays_accurate_on_a_large_tonic_level():
+    rng = np.random.default_rng(5)
+    eda = 1e6 + rng.normal(0, 1e-3, 5000)
+    features = OnlinePhysioFeatures()
+    for start in range(0, eda.size, 37):
+        features.update(np.empty(0), eda[start : start + 37], None)
+    # E[x^2] - mean^2 loses every significant digit here.
+    np.testing.assert_allclose(features.eda_sd, np.std(eda), rtol=1e-6)
+    np.testing.assert_allclose(features.eda_mean, np.mean(eda), rtol=1e-12)
+
+    legacy = {key: value for key, value in features.to_dict().items() if key not in ("eda_running_mean", "eda_m2")}
+    restored = OnlinePhysioFeatures.from_dict({**legacy, "eda_sum": 6.0, "eda_square_sum": 14.0, "eda_count": 3})
+    np.testing.assert_allclose((restored.eda_mean, restored.eda_sd), (2.0, np.std([1.0, 2.0, 3.0])))
+
+
+def test_windowed_lf_hf_uses_only_the_latest_window():
+    timestamps, rr, _ = recording()
+    buffer = PhysioBuffer()
+    buffer.append(timestamps, rr)
+    tail = rr[-150:]
+    window = tail[1:].sum() / 1000.0 + 1e-6
+    assert windowed_lf_hf(buffer, window_seconds=window) == estimate_lf_hf(tail)
+    assert windowed_lf_hf(PhysioBuffer()) is None
+
+    copied = lf_hf_window(buffer, window_seconds=window)
+    np.testing.assert_array_equal(copied, tail)
+    buffer.append(timestamps[:1], rr[:1])
+    copied[:] = 0.0
+    np.testing.assert_array_equal(buffer.series().rr_intervals[-151:-1], tail)
+
+
+def test_sensor_check_and_phase_start_read_live_values(monkeypatch):
+    monkeypatch.setattr(main, "SESSION_STORE", InMemorySessionStore())
+    session_id = main.check_sensors().session_id
+    timestamps, rr, eda = recording(seconds=180)
+    ingest(encode_physio_frames(session_id, timestamps, rr, eda=eda, value_size=8), PHYSIO_FRAMES_CONTENT_TYPE)
+
+    preview = main.check_sensors(session_id=session_id).preview
+    assert preview.heart_rate == round(60000.0 / np.mean(rr))
+    np.testing.assert_allclose(preview.hrv_rmssd, compute_hrv_rmssd(rr))
+    assert preview.lf_hf_ratio is not None and preview.lf_hf_ratio > 0
+    started = main.start_phase("challenge", main.PhaseStartRequest(session_id=session_id))
+    assert started.preview == preview
@@ -1,9 +1,17 @@
+import asyncio
+import subprocess
+import sys
+import threading
 import time
+from pathlib import Path
 
+import pytest
 import soundfile as sf
 
+import main
 from corescope.audio.acoustic_extractor import analyze_upload_file
-from test_acoustic_extractor import vowel_audio
+from corescope.audio.storage import LocalShardedStore
+from synthetic_audio import vowel_audio
 
 
 def test_three_second_analysis_completes_within_request_budget(tmp_path):
@@ -26,3 +34,64 @@ def test_three_second_analysis_completes_within_request_budget(tmp_path):
     assert result.features
     # This is a request-budget guard, not a clinical or accuracy claim.
     assert elapsed < 20.0
+
+
+# Measured ~0.5 s for ``import main`` once analysis modules are deferred; the
+# budget leaves headroom for slower CI hosts.
+IMPORT_BUDGET_SECONDS = 1.5
+DEFERRED_MODULES = {"parselmouth", "scipy", "soundfile", "webrtcvad", "librosa", "corescope.audio.acoustic_extractor"}
+
+
+def test_app_import_stays_within_cold_start_budget():
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[1],
+    )
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = (part.strip() for part in line.split("|"))
+            if total.isdigit():
+                cumulative[name] = int(total)
+    assert not DEFERRED_MODULES & set(cumulative)
+    assert cumulative["main"] / 1e6 < IMPORT_BUDGET_SECONDS
+
+
+def test_healthz_answers_before_analysis_modules_load():
+    probe = "import main, sys; print(main.healthz()['status'], 'parselmouth' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True, cwd=Path(__file__).parents[1])
+    assert completed.stdout.split() == ["ok", "False"]
+
+
+def test_worker_reports_ready_only_after_analysis_warmup(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "AUDIO_STORE", LocalShardedStore(tmp_path))
+    monkeypatch.setattr(main, "RETENTION_SWEEP_SECONDS", 0)
+    monkeypatch.setattr(main, "WARMUP_ANALYSIS", True)
+    release = threading.Event()
+    real_warm_up = main._warm_up_analysis
+
+    def gated_warm_up():
+        release.wait(10)
+        real_warm_up()
+
+    monkeypatch.setattr(main, "_warm_up_analysis", gated_warm_up)
+
+    async def scenario():
+        async with main.lifespan(main.app):
+            with pytest.raises(main.HTTPException) as error:
+                main.readyz()
+            assert error.value.status_code == 503
+            release.set()
+            for _ in range(400):
+                if main.WARMUP_STATE["ready"] or main.WARMUP_STATE["error"]:
+                    break
+                await asyncio.sleep(0.05)
+            return main.readyz(), main.metrics()
+
+    ready, exposition = asyncio.run(scenario())
+    assert ready["status"] == "ready" and ready["warmup_seconds"] > 0
+    assert "soulscope_ready 1" in exposition
+    assert f"soulscope_warmup_seconds {ready['warmup_seconds']:.6f}" in exposition
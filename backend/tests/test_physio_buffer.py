@@ -0,0 +1,52 @@
+import numpy as np
+
+from corescope.physio.buffer import PhysioBuffer
+
+
+def legacy_series(samples):
+    timestamps = np.array([sample[0] for sample in samples])
+    rr_intervals = np.array([sample[1] for sample in samples])
+    eda = np.array([sample[2] or 0.0 for sample in samples]) if any(sample[2] for sample in samples) else None
+    breath = np.array([sample[3] or 0.0 for sample in samples]) if any(sample[3] for sample in samples) else None
+    return timestamps, rr_intervals, eda, breath
+
+
+def append_rows(buffer, rows):
+    nan = float("nan")
+    columns = np.array([[nan if value is None else value for value in row] for row in rows], dtype=float)
+    buffer.append(columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3])
+
+
+def test_buffer_matches_the_legacy_list_conversion_across_growth():
+    rng = np.random.default_rng(5)
+    rows = [
+        (float(index), 780.0 + rng.normal(), None if index % 3 else 0.25 + index / 1000, None)
+        for index in range(2500)
+    ]
+    buffer = PhysioBuffer(capacity=16)
+    for start in range(0, len(rows), 97):
+        append_rows(buffer, rows[start : start + 97])
+
+    series = buffer.series()
+    timestamps, rr_intervals, eda, breath = legacy_series(rows)
+    assert len(buffer) == 2500 and buffer.capacity >= 2500
+    np.testing.assert_array_equal(series.timestamps, timestamps)
+    np.testing.assert_array_equal(series.rr_intervals, rr_intervals)
+    np.testing.assert_array_equal(series.eda, eda)
+    assert series.breath_rate is None and breath is None
+    np.testing.assert_array_equal(buffer.eda_valid, [row[2] is not None for row in rows])
+    assert np.shares_memory(series.timestamps, buffer.series().timestamps)
+
+
+def test_buffer_round_trips_through_bytes():
+    buffer = PhysioBuffer()
+    assert buffer.series() is None
+    append_rows(buffer, [(0.0, 800.0, None, 12.0), (1.0, 810.0, 0.3, None), (2.0, 790.0, 0.0, 13.0)])
+    restored = PhysioBuffer.from_bytes(buffer.to_bytes())
+    assert len(restored) == 3
+    for name in ("timestamps", "rr_intervals", "eda", "breath_rate"):
+        np.testing.assert_array_equal(getattr(restored.series(), name), getattr(buffer.series(), name))
+    np.testing.assert_array_equal(restored.eda_valid, [False, True, True])
+    np.testing.assert_array_equal(restored.breath_valid, [True, False, True])
+    append_rows(restored, [(3.0, 805.0, None, None)])
+    assert len(restored) == 4
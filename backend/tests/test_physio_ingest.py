@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request
+
+import main
+from corescope.physio.ingest import (
+    PHYSIO_FRAMES_CONTENT_TYPE,
+    PHYSIO_NDJSON_CONTENT_TYPE,
+    decode_physio_frames,
+    decode_physio_ndjson,
+    encode_physio_frames,
+    validate_physio_batch,
+)
+from corescope.physio.sessions import InMemorySessionStore
+
+
+def ingest(body, content_type):
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    request = Request({"type": "http", "method": "POST", "path": "/api/physio/ingest", "headers": [(b"content-type", content_type.encode())]}, receive)
+    return asyncio.run(main.ingest_physio(request))
+
+
+@pytest.fixture
+def session_id(monkeypatch):
+    monkeypatch.setattr(main, "SESSION_STORE", InMemorySessionStore())
+    return main.check_sensors().session_id
+
+
+def test_frames_round_trip_with_float64_timestamps_and_missing_values():
+    timestamps = 1_760_000_000.0 + np.arange(5) * 0.25
+    payload = encode_physio_frames("s", timestamps, [800, 810, 790, 805, 795], eda=[0.2, np.nan, 0.3, 0.3, 0.31])
+    batch = decode_physio_frames(payload)
+    assert batch.session_id == "s" and len(batch) == 5
+    np.testing.assert_array_equal(batch.timestamps, timestamps)
+    np.testing.assert_allclose(batch.eda, [0.2, np.nan, 0.3, 0.3, 0.31], rtol=1e-6)
+    assert np.isnan(batch.breath_rate).all()
+    with pytest.raises(ValueError, match="physio_frames_truncated"):
+        decode_physio_frames(payload[:-1])
+
+
+def test_ndjson_maps_declared_channels_and_nulls():
+    body = "\n".join(
+        [json.dumps({"session_id": "s", "channels": ["breath_rate_bpm"]}), "[0.0, 800, 12.5]", "[1.0, 805, null]"]
+    ).encode()
+    batch = decode_physio_ndjson(body)
+    np.testing.assert_array_equal(batch.rr_intervals, [800, 805])
+    np.testing.assert_array_equal(batch.breath_rate, [12.5, np.nan])
+    assert np.isnan(batch.eda).all()
+    with pytest.raises(ValueError, match="physio_ndjson_invalid"):
+        decode_physio_ndjson(body + b"\n[2.0]")
+
+
+def test_vectorized_range_checks_reject_the_whole_batch():
+    batch = decode_physio_frames(encode_physio_frames("s", [0, 1], [800, 90]))
+    with pytest.raises(ValueError, match="physio_rr_interval_out_of_range"):
+        validate_physio_batch(batch)
+    batch = decode_physio_frames(encode_physio_frames("s", [0, np.inf], [800, 800]))
+    with pytest.raises(ValueError, match="physio_timestamp_invalid"):
+        validate_physio_batch(batch)
+
+
+def test_all_ingest_formats_fill_the_same_session_buffer(session_id):
+    frames = encode_physio_frames(session_id, [0.0, 1.0], [800, 810], breath_rate=[12.0, 12.5], value_size=8)
+    ndjson = "\n".join([json.dumps({"session_id": session_id, "channels": ["breath_rate_bpm"]}), "[2.0, 790, 13.0]"]).encode()
+    body = json.dumps({"session_id": session_id, "samples": [{"timestamp": 3.0, "rr_interval_ms": 805, "eda_micro_siemens": None, "breath_rate_bpm": 12.0}]}).encode()
+    assert ingest(frames, PHYSIO_FRAMES_CONTENT_TYPE) == {"received": 2}
+    assert ingest(ndjson, PHYSIO_NDJSON_CONTENT_TYPE) == {"received": 1}
+    assert ingest(body, "application/json; charset=utf-8") == {"received": 1}
+    series = main.SESSION_STORE.get(session_id)["physio"].series()
+    np.testing.assert_array_equal(series.timestamps, [0, 1, 2, 3])
+    np.testing.assert_array_equal(series.breath_rate, [12.0, 12.5, 13.0, 12.0])
+    assert series.eda is None
+
+    with pytest.raises(main.HTTPException) as error:
+        ingest(encode_physio_frames(session_id, [4.0], [5000]), PHYSIO_FRAMES_CONTENT_TYPE)
+    assert error.value.status_code == 422
+    with pytest.raises(main.HTTPException) as error:
+        ingest(b"", "text/csv")
+    assert error.value.status_code == 415
+    with pytest.raises(RequestValidationError) as invalid:
+        ingest(json.dumps({"session_id": session_id, "samples": [{"timestamp": "soon"}]}).encode(), "application/json")
+    assert invalid.value.errors()[0]["loc"] == ("body", "samples", 0, "timestamp")
+    assert len(main.SESSION_STORE.get(session_id)["physio"]) == 4
+
+
+def test_ingest_documents_every_accepted_media_type():
+    content = main.app.openapi()["paths"]["/api/physio/ingest"]["post"]["requestBody"]["content"]
+    assert set(content) == {"application/json", PHYSIO_NDJSON_CONTENT_TYPE, PHYSIO_FRAMES_CONTENT_TYPE}
+    schema = content["application/json"]["schema"]
+    assert schema["required"] == ["session_id"]
+    assert set(schema["properties"]["samples"]["items"]["properties"]) == {"timestamp", "rr_interval_ms", "eda_micro_siemens", "breath_rate_bpm"}
@@ -0,0 +1,85 @@
+import numpy as np
+
+from corescope.core_frequency.body_resonance import extract_physio_features
+from corescope.core_frequency.models import PhysioTimeSeries
+from corescope.core_frequency.timeline import extract_physio_timeline
+from corescope.physio.buffer import PhysioBuffer
+
+
+def session(seconds, seed=3):
+    rng = np.random.default_rng(seed)
+    rr = 800.0 + 30.0 * rng.standard_normal(int(seconds * 1.25))
+    timestamps = np.cumsum(rr) / 1000.0
+    eda = 2.0 + np.cumsum(0.01 * rng.standard_normal(rr.size))
+    breath = 12.0 + rng.standard_normal(rr.size)
+    return PhysioTimeSeries(timestamps=timestamps, rr_intervals=rr, eda=eda, breath_rate=breath)
+
+
+def test_windows_match_scalar_features_and_respect_phase_boundaries():
+    ts = session(600)
+    phase_starts = [0.0, 200.0, 230.0, 420.0]
+    timeline = extract_physio_timeline(ts, window_seconds=60.0, step_seconds=15.0, phase_starts=phase_starts)
+
+    bounds = np.append(phase_starts[1:], np.inf)
+    assert np.all(timeline.window_start >= np.take(phase_starts, timeline.phase_index))
+    assert np.all(timeline.window_end <= bounds[timeline.phase_index])
+    # The 30 s phase gets one truncated window; the others tile with full windows.
+    assert np.sum(timeline.phase_index == 1) == 1
+    assert np.all(np.isnan(timeline.lf_hf_ratio[timeline.phase_index == 1]))
+
+    eda_diff = np.diff(ts.eda)
+    threshold = np.percentile(eda_diff, 90)
+    for index in range(len(timeline)):
+        inside = (ts.timestamps >= timeline.window_start[index]) & (ts.timestamps < timeline.window_end[index])
+        window = PhysioTimeSeries(
+            timestamps=ts.timestamps[inside],
+            rr_intervals=ts.rr_intervals[inside],
+            eda=ts.eda[inside],
+            breath_rate=ts.breath_rate[inside],
+        )
+        expected = extract_physio_features(window)
+        assert np.isclose(timeline.hrv_rmssd[index], expected.hrv_rmssd)
+        assert np.isclose(timeline.mean_hr[index], expected.mean_hr)
+        assert np.isclose(timeline.eda_tonic_mean[index], expected.eda_tonic_mean)
+        assert np.isclose(timeline.breath_rate_mean[index], expected.breath_rate_mean)
+        peaks = (np.diff(window.eda) > threshold).sum()
+        span_min = (window.timestamps[-1] - window.timestamps[0]) / 60.0
+        assert np.isclose(timeline.eda_phasic_peaks_per_min[index], peaks / span_min)
+
+
+def test_lf_hf_tracks_the_dominant_rhythm_per_window():
+    t = np.arange(0.0, 600.0, 0.8)
+    rhythm = np.where(t < 300.0, np.sin(2 * np.pi * 0.1 * t), np.sin(2 * np.pi * 0.25 * t))
+    ts = PhysioTimeSeries(timestamps=t, rr_intervals=800.0 + 40.0 * rhythm)
+    timeline = extract_physio_timeline(ts, window_seconds=100.0, step_seconds=50.0, phase_starts=[0.0, 300.0])
+    assert np.all(timeline.lf_hf_ratio[timeline.phase_index == 0] > 10.0)
+    assert np.all(timeline.lf_hf_ratio[timeline.phase_index == 1] < 0.1)
+    assert np.all(np.isnan(timeline.eda_tonic_mean))
+
+
+def test_hour_long_session_timeline_is_fast():
+    ts = session(3600)
+    timeline = extract_physio_timeline(ts, window_seconds=60.0, step_seconds=5.0)
+    assert len(timeline) > 700
+    assert not np.isnan(timeline.lf_hf_ratio[:-12]).any()
+
+
+def test_missing_eda_and_breath_are_skipped_not_zero_filled():
+    ts = session(300)
+    eda = ts.eda.copy()
+    eda[ts.timestamps < 70.0] = np.nan
+    breath = ts.breath_rate.copy()
+    breath[::2] = np.nan
+    buffer = PhysioBuffer()
+    buffer.append(ts.timestamps, ts.rr_intervals, eda=eda, breath_rate=breath)
+    masked = buffer.masked_series()
+    np.testing.assert_array_equal(masked.eda, eda)
+    assert buffer.series().eda[0] == 0.0
+
+    timeline = extract_physio_timeline(masked, window_seconds=60.0, step_seconds=30.0)
+    assert np.isnan(timeline.eda_tonic_mean[0]) and np.isnan(timeline.eda_phasic_peaks_per_min[0])
+    for index in range(len(timeline)):
+        inside = (ts.timestamps >= timeline.window_start[index]) & (ts.timestamps < timeline.window_end[index])
+        assert np.isclose(timeline.breath_rate_mean[index], np.nanmean(breath[inside]))
+        if index:
+            assert np.isclose(timeline.eda_tonic_mean[index], np.nanmean(eda[inside]))
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import main
+from corescope.core_frequency.body_resonance import compute_hrv_rmssd
+from corescope.physio.buffer import PhysioBuffer
+from corescope.physio.ingest import PHYSIO_FRAMES_CONTENT_TYPE, encode_physio_frames
+from corescope.physio.reactivity import PHASE_CODES, derive_reactivity
+from corescope.physio.sessions import SQLiteSessionStore
+from test_physio_ingest import ingest
+
+
+def phase_segment(rng, start, count, rr_sd, eda_level, breath_level):
+    rr = 800.0 + rng.normal(0.0, rr_sd, count)
+    timestamps = start + np.cumsum(rr) / 1000.0
+    eda = eda_level + rng.normal(0.0, 0.01, count)
+    eda[::5] = np.nan
+    breath = breath_level + rng.normal(0.0, 0.5, count)
+    return timestamps, rr, eda, breath
+
+
+def test_per_phase_reductions_match_direct_computation():
+    rng = np.random.default_rng(8)
+    buffer = PhysioBuffer(capacity=8)
+    segments = {}
+    start = 0.0
+    for phase, rr_sd, eda_level, breath_level in (
+        (None, 60.0, 9.0, 30.0),
+        ("baseline", 40.0, 0.3, 12.0),
+        ("challenge", 15.0, 0.5, 18.0),
+        ("recovery", 30.0, 0.35, 13.0),
+    ):
+        segment = phase_segment(rng, start, 150, rr_sd, eda_level, breath_level)
+        start = segment[0][-1]
+        for offset in range(0, 150, 40):
+            buffer.append(*(column[offset : offset + 40] for column in segment), phase=PHASE_CODES.get(phase, 0))
+        segments[phase] = segment
+
+    metrics = derive_reactivity(PhysioBuffer.from_bytes(buffer.to_bytes()))
+    baseline, challenge, recovery = (compute_hrv_rmssd(segments[name][1]) for name in ("baseline", "challenge", "recovery"))
+    assert metrics.baseline_hrv_rmssd == pytest.approx(baseline)
+    assert metrics.challenge_hrv_rmssd == pytest.approx(challenge)
+    assert metrics.baseline_eda_mean == pytest.approx(np.nanmean(segments["baseline"][2]))
+    assert metrics.challenge_eda_mean == pytest.approx(np.nanmean(segments["challenge"][2]))
+    assert metrics.baseline_breath_rate == pytest.approx(np.mean(segments["baseline"][3]))
+    assert metrics.challenge_breath_rate == pytest.approx(np.mean(segments["challenge"][3]))
+    assert metrics.recovery_index == pytest.approx((recovery - challenge) / (baseline - challenge))
+
+
+def test_reactivity_is_derived_from_samples_tagged_at_ingest(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "SESSION_STORE", SQLiteSessionStore(tmp_path / "sessions.sqlite3"))
+    rng = np.random.default_rng(2)
+    session_id = main.check_sensors().session_id
+    with pytest.raises(main.HTTPException) as error:
+        main.derived_reactivity(session_id)
+    assert error.value.status_code == 409
+
+    start = 0.0
+    for phase, rr_sd in (("baseline", 40.0), ("challenge", 10.0)):
+        main.start_phase(phase, main.PhaseStartRequest(session_id=session_id))
+        timestamps, rr, eda, breath = phase_segment(rng, start, 120, rr_sd, 0.3, 12.0)
+        start = timestamps[-1]
+        ingest(
+            encode_physio_frames(session_id, timestamps, rr, eda=eda, breath_rate=breath, value_size=8),
+            PHYSIO_FRAMES_CONTENT_TYPE,
+        )
+
+    derived = main.derived_reactivity(session_id)
+    assert derived.baseline_hrv_rmssd > derived.challenge_hrv_rmssd
+    assert derived.recovery_index is None
+    # Client-posted numbers no longer override what the stored series shows.
+    main.update_reactivity(main.ReactivityUpdate(session_id=session_id, baseline_hrv_rmssd=1.0, challenge_hrv_rmssd=2.0))
+    assert main.SESSION_STORE.get(session_id)["reactivity"]["baseline_hrv_rmssd"] == 1.0
+    assert main.derived_reactivity(session_id) == derived
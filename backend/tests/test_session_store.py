@@ -0,0 +1,170 @@
+import asyncio
+import sqlite3
+
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+import main
+from corescope.physio import buffer as buffer_module
+from corescope.physio.buffer import PhysioBuffer
+from corescope.physio.sessions import InMemorySessionStore, SQLiteSessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def build(**limits):
+        if request.param == "memory":
+            return InMemorySessionStore(**limits)
+        return SQLiteSessionStore(tmp_path / "sessions.sqlite3", **limits)
+
+    return build
+
+
+def test_sessions_expire_after_ttl_since_last_touch(make_store):
+    clock = Clock()
+    store = make_store(ttl_seconds=60, clock=clock)
+    store.create("a", {"physio": []})
+    clock.now += 50
+    store.update("a", lambda state: state["physio"].append({"timestamp": 1.0}))
+    clock.now += 50
+    assert store.get("a") == {"physio": [{"timestamp": 1.0}]}
+    assert store.session_ids() == ["a"]
+    clock.now += 61
+    assert "a" not in store and store.session_ids() == []
+    with pytest.raises(KeyError):
+        store.update("a", lambda state: None)
+    assert len(store) == 0
+
+
+def test_least_recently_used_session_is_evicted_at_capacity(make_store):
+    clock = Clock()
+    store = make_store(max_sessions=2, clock=clock)
+    store.create("a", {})
+    clock.now += 1
+    store.create("b", {})
+    clock.now += 1
+    store.update("a", lambda state: state.update(touched=True))
+    clock.now += 1
+    store.create("c", {})
+    assert "a" in store and "c" in store
+    assert "b" not in store
+    assert len(store) == 2
+
+
+def test_failed_mutation_leaves_state_unchanged_for_sqlite(tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+    other_worker = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+    store.create("a", {"physio": [1]})
+
+    def fail(state):
+        state["physio"].append(2)
+        raise ValueError("rejected")
+
+    with pytest.raises(ValueError):
+        store.update("a", fail)
+    other_worker.update("a", lambda state: state["physio"].append(3))
+    assert store.get("a") == {"physio": [1, 3]}
+
+
+def test_sqlite_store_appends_physio_chunks_instead_of_rewriting_the_buffer(tmp_path):
+    path = tmp_path / "sessions.sqlite3"
+    store = SQLiteSessionStore(path)
+    store.create("a", {"physio": PhysioBuffer(), "phase": None})
+    for start in (0, 3, 6):
+        store.update("a", lambda state: state["physio"].append(np.arange(start, start + 3.0), np.full(3, 800.0), phase=2))
+    store.update("a", lambda state: state.update(phase="challenge"))
+    with sqlite3.connect(path) as connection:
+        seqs = [seq for (seq,) in connection.execute("SELECT seq FROM physio_chunks WHERE session_id = 'a' ORDER BY seq")]
+    assert seqs == [0, 3, 6]
+
+    state = store.get("a")
+    assert state["phase"] == "challenge"
+    np.testing.assert_array_equal(state["physio"].series().timestamps, np.arange(9.0))
+    assert set(state["physio"].phases.tolist()) == {2}
+
+    store.update("a", lambda state: state.update(physio=PhysioBuffer()))
+    assert len(store.get("a")["physio"]) == 0
+    store.delete("a")
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM physio_chunks").fetchone() == (0,)
+
+
+def test_sqlite_ingest_updates_do_not_decode_stored_chunks(monkeypatch, tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.sqlite3")
+    store.create("a", {"physio": PhysioBuffer()})
+    decoded = []
+    real_decode = buffer_module._decode
+    monkeypatch.setattr(buffer_module, "_decode", lambda payload: decoded.append(payload) or real_decode(payload))
+
+    def ingest(start):
+        def append(state):
+            assert len(state["physio"]) == start
+            state["physio"].append(np.arange(start, start + 2.0), np.full(2, 800.0))
+
+        return append
+
+    per_update = []
+    for start in range(0, 400, 2):
+        before = len(decoded)
+        store.update("a", ingest(start))
+        per_update.append(len(decoded) - before)
+    # Cost per update stays flat however many chunks the session holds.
+    assert set(per_update) == {0}
+
+    def append_then_read(state):
+        state["physio"].append([400.0], [800.0])
+        return state["physio"].series().timestamps.size
+
+    # Reading the series loads the stored chunks once, plus this update's samples.
+    assert store.update("a", append_then_read) == 401
+    store.update("a", lambda state: state["physio"].append([401.0], [800.0]))
+    np.testing.assert_array_equal(store.get("a")["physio"].series().timestamps, np.arange(402.0))
+
+
+def test_read_views_state_without_copying(make_store):
+    store = make_store()
+    store.create("a", {"values": [1, 2]})
+    assert store.read("a", lambda state: sum(state["values"])) == 3
+    with pytest.raises(KeyError):
+        store.read("missing", len)
+    if isinstance(store, InMemorySessionStore):
+        seen = []
+        store.read("a", seen.append)
+        assert seen[0] is store._sessions["a"][1]
+
+
+def physio_request(payload):
+    body = payload.model_dump_json().encode()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request({"type": "http", "method": "POST", "path": "/api/physio/ingest", "headers": [(b"content-type", b"application/json")]}, receive)
+
+
+def test_routes_share_the_session_store_and_cap_physio_samples(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "SESSION_STORE", SQLiteSessionStore(tmp_path / "sessions.sqlite3"))
+    monkeypatch.setattr(main, "MAX_PHYSIO_SAMPLES_PER_SESSION", 3)
+    session_id = main.check_sensors().session_id
+    main.start_phase("baseline", main.PhaseStartRequest(session_id=session_id))
+    sample = main.PhysioSample(timestamp=0.0, rr_interval_ms=800.0, eda_micro_siemens=None, breath_rate_bpm=12.0)
+    payload = main.PhysioIngestRequest(session_id=session_id, samples=[sample, sample])
+    assert asyncio.run(main.ingest_physio(physio_request(payload))) == {"received": 2}
+    with pytest.raises(main.HTTPException) as error:
+        asyncio.run(main.ingest_physio(physio_request(payload)))
+    assert error.value.status_code == 413
+    state = main.SESSION_STORE.get(session_id)
+    assert state["current_phase"] == "baseline"
+    assert len(state["physio"]) == 2
+    with pytest.raises(main.HTTPException) as error:
+        main.start_phase("baseline", main.PhaseStartRequest(session_id="missing"))
+    assert error.value.status_code == 404
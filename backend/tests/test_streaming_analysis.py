@@ -0,0 +1,130 @@
+import asyncio
+import io
+
+import numpy as np
+import pytest
+from fastapi import UploadFile
+
+import main
+from corescope.audio.acoustic_extractor import _run_vad
+from corescope.audio.storage import CaptureLocation, LocalShardedStore
+from corescope.audio.stream_registry import AcousticStreamRegistry
+from corescope.audio.streaming import IncrementalVad, StreamingAnalysisSession
+from synthetic_audio import vowel_audio
+
+
+def pcm_bytes(audio):
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def stream_session(tmp_path, **overrides):
+    values = {
+        "stream_id": "stream-1",
+        "location": CaptureLocation("stream.canonical.wav", tmp_path / "stream.canonical.wav"),
+        "scan_id": "scan-1",
+        "user_id": "user-1",
+        "source_capture_id": "capture-1",
+        "capture_kind": "guided_speech",
+        "device_metadata": {"fixture": "stream"},
+    }
+    values.update(overrides)
+    return StreamingAnalysisSession(**values)
+
+
+def test_incremental_vad_matches_batch_vad_for_odd_chunk_sizes():
+    tone, _ = vowel_audio(170, seconds=1.0)
+    audio = np.concatenate([np.zeros(8000), tone, np.zeros(16000), tone, np.zeros(8000)]).astype(np.float32)
+    vad = IncrementalVad()
+    for end in range(1237, audio.size + 1237, 1237):
+        vad.consume(audio, min(end, audio.size))
+    segments, stats = vad.finish(audio)
+    expected_segments, expected_stats = _run_vad(audio, 16000)
+    assert segments == expected_segments
+    assert stats == expected_stats
+
+
+def test_stream_emits_provisional_snapshots_and_canonical_final_result(tmp_path):
+    audio, _ = vowel_audio(180, seconds=4.0)
+    session = stream_session(tmp_path, capture_kind="sustained_vowel")
+    payload = pcm_bytes(audio)
+    snapshots = []
+    for start in range(0, len(payload), 3201):
+        snapshot = session.append_pcm(payload[start : start + 3201])
+        if snapshot is not None:
+            snapshots.append(snapshot)
+    assert len(snapshots) == 1
+    assert snapshots[0].provisional is True
+    assert snapshots[0].received_ms >= 3000
+    assert abs(snapshots[0].features["voice.f0.median"] - 180) < 2.0
+    result = session.finish()
+    assert result.duration_ms == 4000
+    assert result.storage_path == str(tmp_path / "stream.canonical.wav")
+    f0 = next(item for item in result.features if item.feature_id == "voice.f0.median")
+    assert abs(f0.value - 180) < 1.0
+    # No bounds were given, so the final analysis ran the pitch pre-pass.
+    assert result.metadata["parameters"]["pitch_range_source"] == "adaptive"
+    with pytest.raises(ValueError, match="stream_already_finished"):
+        session.append_pcm(payload[:320])
+
+
+def test_stream_forwards_a_prior_pitch_range_to_the_final_analysis(tmp_path):
+    audio, _ = vowel_audio(180, seconds=2.0)
+    session = stream_session(tmp_path, capture_kind="sustained_vowel", prior_pitch_range=(120.0, 300.0))
+    session.append_pcm(pcm_bytes(audio))
+    assert abs(session.snapshot().features["voice.f0.median"] - 180) < 2.0
+    parameters = session.finish().metadata["parameters"]
+    assert parameters["pitch_range_source"] == "prior"
+    assert (parameters["pitch_floor_hz"], parameters["pitch_ceiling_hz"]) == (120.0, 300.0)
+
+
+def test_stream_rejects_audio_past_the_duration_limit(tmp_path):
+    session = stream_session(tmp_path)
+    with pytest.raises(ValueError, match="audio_too_long"):
+        session.append_pcm(b"\x00\x00" * (91 * 16000))
+
+
+def test_stream_routes_are_scoped_to_the_authenticated_user(monkeypatch, tmp_path):
+    async def authenticate(authorization):
+        return "owner" if authorization == "Bearer owner" else "someone-else"
+
+    async def ownership(scan_id, user_id, authorization):
+        return None
+
+    monkeypatch.setattr(main, "_authenticate_user", authenticate)
+    monkeypatch.setattr(main, "_verify_scan_ownership", ownership)
+    monkeypatch.setattr(main, "AUDIO_STORE", LocalShardedStore(tmp_path))
+    monkeypatch.setattr(main, "ACOUSTIC_STREAMING", True)
+    started = asyncio.run(main.start_acoustic_stream(scan_id="scan-1", source_capture_id="capture-1", capture_kind="guided_speech", device_metadata="{}", prior_pitch_floor_hz=None, prior_pitch_ceiling_hz=None, authorization="Bearer owner"))
+    chunk = UploadFile(file=io.BytesIO(b"\x00\x00" * 160), filename="chunk.pcm")
+    with pytest.raises(main.HTTPException) as error:
+        asyncio.run(main.append_acoustic_stream_chunk(started.stream_id, chunk=chunk, authorization="Bearer intruder"))
+    assert error.value.status_code == 404
+    accepted = asyncio.run(main.append_acoustic_stream_chunk(started.stream_id, chunk=chunk, authorization="Bearer owner"))
+    assert accepted.received_ms == 10
+    assert accepted.snapshot is None
+    main.ACOUSTIC_STREAMS.pop(started.stream_id)
+
+
+def test_registry_abandons_idle_and_overflowing_streams(tmp_path):
+    now = [0.0]
+    registry = AcousticStreamRegistry(idle_ttl_seconds=60, max_streams=2, clock=lambda: now[0])
+    streams = {}
+    for name in ("a", "b", "c"):
+        location = CaptureLocation(f"{name}.canonical.wav", tmp_path / f"{name}.canonical.wav")
+        location.local_path.write_bytes(b"partial")
+        streams[name] = stream_session(tmp_path, stream_id=name, location=location)
+        streams[name].append_pcm(b"\x00\x00" * 160)
+        registry.add(name, streams[name])
+        now[0] += 10
+
+    # "a" was least recently used when "c" arrived.
+    assert registry.get("a") is None and len(registry) == 2
+    assert streams["a"].finished and not (tmp_path / "a.canonical.wav").exists()
+    with pytest.raises(ValueError, match="stream_already_finished"):
+        streams["a"].append_pcm(b"\x00\x00")
+
+    assert registry.get("c") is streams["c"]
+    now[0] += 55
+    assert registry.purge_expired() == 1
+    assert streams["b"].finished and not (tmp_path / "b.canonical.wav").exists()
+    assert registry.pop("c") is streams["c"] and not streams["c"].finished